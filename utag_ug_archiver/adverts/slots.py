@@ -0,0 +1,22 @@
+from adverts.models import Ad
+from website.cache import ADS, Section, get_sections
+
+# Scheduled start/end times are checked per render, so the candidates can
+# be cached; the TTL only bounds how stale a missed invalidation can be
+SLOT_CACHE_TIMEOUT = 5 * 60
+
+
+def _slot_candidates(slot_key):
+    """Active ads for the slot, highest priority first."""
+    return list(
+        Ad.objects.filter(slot__key=slot_key, active=True)
+        .select_related('slot')
+        .order_by('-priority', '-created_at')
+    )
+
+
+def live_ad(slot_key):
+    """The highest priority ad of the slot that is live now, or None."""
+    section = Section(f'ads:{slot_key}', lambda: _slot_candidates(slot_key), (ADS,), SLOT_CACHE_TIMEOUT)
+    ads = get_sections([section])[section.name]
+    return next((a for a in ads if a.is_live()), None)
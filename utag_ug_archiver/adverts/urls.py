@@ -6,4 +6,5 @@ app_name = 'adverts'
 urlpatterns = [
     path('click/<int:pk>/', views.ad_click_redirect, name='click'),
     path('impression/<int:pk>/', views.ad_impression_ping, name='impression'),
+    path('slot/<slug:slot_key>/', views.ad_slot, name='slot'),
 ]
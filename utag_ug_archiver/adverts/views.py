@@ -1,10 +1,12 @@
 from django.shortcuts import get_object_or_404, redirect, render
-from django.http import HttpResponseBadRequest
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
 from django.views.decorators.http import require_GET
 from django.views.decorators.csrf import csrf_exempt
 from django.core.cache import cache
 from .models import Ad
+from .slots import live_ad
 
 
 @require_GET
@@ -21,6 +23,24 @@ def ad_click_redirect(request, pk):
 	return redirect(ad.target_url)
 
 
+@require_GET
+@never_cache
+def ad_slot(request, slot_key):
+	"""Render the live ad of a slot, recording an impression.
+
+	Usage: /adverts/slot/<slot_key>/ (fetched by the {% render_ad_slot %} placeholder)
+	"""
+	ad = live_ad(slot_key)
+	if ad is None:
+		return HttpResponse(status=204)
+	try:
+		ad.impression()
+	except Exception:
+		# don't break the page if the DB update fails
+		pass
+	return render(request, 'adverts/ad_snippet.html', {'ad': ad, 'request': request})
+
+
 @csrf_exempt
 def ad_impression_ping(request, pk):
 	"""POST endpoint to record an impression for an ad; debounced by session/IP."""
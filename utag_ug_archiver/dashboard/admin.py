@@ -5,7 +5,8 @@ admin.site.site_title = "UTAG-UG Archiver Admin Portal"
 admin.site.index_title = "Welcome to UTAG-UG Archiver Portal"
 
 # Register your models here.
-from .models import Event, News, File, Document, Announcement, Tag, CarouselSlide, AttachedDocument, Citation, Notification
+from .models import Event, EventRegistration, EventReminder, News, File, Document, Announcement, Tag, CarouselSlide, AttachedDocument, Citation, Notification
+from .registrations import cancel
 admin.site.register(Announcement)
 admin.site.register(Event)
 admin.site.register(News)
@@ -18,3 +19,22 @@ admin.site.register(Citation)
 admin.site.register(Notification)
 
 
+@admin.register(EventRegistration)
+class EventRegistrationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'email', 'event', 'status', 'created_at')
+    list_filter = ('status', 'event')
+    search_fields = ('name', 'email', 'department')
+    readonly_fields = ('status',)
+    actions = ['cancel_registrations']
+
+    @admin.action(description='Cancel selected registrations (promotes the waitlist)')
+    def cancel_registrations(self, request, queryset):
+        promoted = sum(1 for registration in queryset.exclude(status='cancelled') if cancel(registration))
+        self.message_user(request, f"Registrations cancelled, {promoted} promoted from the waitlist.")
+
+
+@admin.register(EventReminder)
+class EventReminderAdmin(admin.ModelAdmin):
+    list_display = ('event', 'offset', 'audience', 'send_at', 'sent_count', 'sent_at')
+    list_filter = ('audience',)
+    readonly_fields = ('send_at', 'last_recipient_id', 'sent_count', 'sent_at')
@@ -0,0 +1,206 @@
+"""Bulk import of archived News and Event records from CSV or JSON.
+
+Rows are processed in batches. Each batch costs one prefix query for its
+slugs, one ``bulk_create`` for the rows, a few queries for tags and their
+through rows, and parallel image uploads through the storage API.
+``bulk_create`` skips ``save()``, so whatever ``save()`` would have derived
+(event schedule and status, excerpts, tag slugs) is filled in here instead.
+"""
+import csv
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+
+from django.core.exceptions import ValidationError
+from django.core.files import File as DjangoFile
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from dashboard.models import Event, News, Tag
+from utag_ug_archiver.utils.slugs import allocate_slugs
+
+logger = logging.getLogger(__name__)
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on'}
+
+
+def read_rows(path):
+    """Yield dicts from a ``.csv`` file or a ``.json`` list of objects."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.json':
+        with open(path, encoding='utf-8') as fh:
+            data = json.load(fh)
+        if not isinstance(data, list):
+            raise ValueError('JSON import files must contain a list of objects')
+        yield from data
+    elif ext == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as fh:
+            yield from csv.DictReader(fh)
+    else:
+        raise ValueError(f'Unsupported import format: {ext or path}')
+
+
+def _text(row, key, default=''):
+    value = row.get(key)
+    return default if value is None else str(value).strip()
+
+
+def _bool(row, key):
+    value = row.get(key)
+    return value if isinstance(value, bool) else _text(row, key).lower() in TRUE_VALUES
+
+
+def _date(row, key):
+    value = _text(row, key)
+    return date.fromisoformat(value) if value else None
+
+
+def _time(row, key):
+    value = _text(row, key)
+    return time.fromisoformat(value) if value else None
+
+
+def _datetime(row, key):
+    value = _text(row, key)
+    if not value:
+        return None
+    parsed = parse_datetime(value) or datetime.combine(date.fromisoformat(value), time.min)
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _tags(row):
+    value = row.get('tags') or []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(name).strip() for name in value if str(name).strip()]
+
+
+def build_news(row, user):
+    news = News(
+        title=_text(row, 'title')[:150],
+        content=_text(row, 'content'),
+        author=user,
+        is_published=_bool(row, 'is_published'),
+    )
+    news.refresh_summary()
+    return news
+
+
+def build_event(row, user):
+    event = Event(
+        title=_text(row, 'title')[:100],
+        short_description=_text(row, 'short_description')[:200],
+        description=_text(row, 'description'),
+        start_date=_date(row, 'start_date'),
+        end_date=_date(row, 'end_date'),
+        start_time=_time(row, 'start_time'),
+        end_time=_time(row, 'end_time'),
+        venue=_text(row, 'venue')[:100],
+        is_online=_bool(row, 'is_online'),
+        online_link=_text(row, 'online_link'),
+        event_type=_text(row, 'event_type', 'meeting') or 'meeting',
+        status=_text(row, 'status', 'upcoming') or 'upcoming',
+        is_published=_bool(row, 'is_published'),
+        created_by=user,
+    )
+    if event.start_date is None:
+        raise ValidationError('start_date is required')
+    event.clean()
+    event.refresh_schedule()
+    event.refresh_summary()
+    return event
+
+
+BUILDERS = {
+    'news': (News, 'news_slug', build_news),
+    'event': (Event, 'event_slug', build_event),
+}
+
+
+def _resolve_tags(names):
+    """Map tag names to ``Tag`` rows, creating missing ones in one statement."""
+    names = set(names)
+    if not names:
+        return {}
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing_names = sorted(names - set(tags))
+    # Names like "C" and "C++" share a slugify() result, so slugs are allocated
+    slugs = allocate_slugs(Tag, 'slug', missing_names, fallback='tag')
+    missing = [Tag(name=name, slug=slug) for name, slug in zip(missing_names, slugs)]
+    if missing:
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        tags.update({tag.name: tag for tag in Tag.objects.filter(name__in=names - set(tags))})
+    return tags
+
+
+def _store_image(instance, source_path):
+    field = instance._meta.get_field('featured_image')
+    with open(source_path, 'rb') as fh:
+        name = field.generate_filename(instance, os.path.basename(source_path))
+        return field.storage.save(name, DjangoFile(fh), max_length=field.max_length)
+
+
+def _store_images(items, images_dir, workers):
+    """Upload the rows' images in parallel and point the instances at them."""
+    jobs = []
+    for instance, row in items:
+        image = _text(row, 'featured_image')
+        if image:
+            jobs.append((instance, os.path.join(images_dir, image) if images_dir else image))
+    if not jobs:
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [(instance, path, pool.submit(_store_image, instance, path)) for instance, path in jobs]
+        for instance, path, future in futures:
+            try:
+                instance.featured_image.name = future.result()
+            except OSError as e:
+                logger.warning(f"Import: cannot store image {path}: {e}")
+
+
+def import_batch(kind, rows, user, images_dir=None, workers=8):
+    """Create one batch of rows; returns the created instances."""
+    model, slug_field, build = BUILDERS[kind]
+    items = []
+    for row in rows:
+        try:
+            instance = build(row, user)
+            instance._archived_at = _datetime(row, 'created_at')
+            items.append((instance, row))
+        except (ValueError, ValidationError) as e:
+            logger.warning(f"Import: skipping {kind} {_text(row, 'title')!r}: {e}")
+    if not items:
+        return []
+
+    for (instance, _), slug in zip(items, allocate_slugs(model, slug_field, [i.title for i, _ in items])):
+        setattr(instance, slug_field, slug)
+    _store_images(items, images_dir, workers)
+
+    instances = [instance for instance, _ in items]
+    with transaction.atomic():
+        model.objects.bulk_create(instances)
+
+        # auto_now_add overwrote created_at; restore archive dates where given
+        dated = []
+        for instance in instances:
+            if instance._archived_at:
+                instance.created_at = instance._archived_at
+                dated.append(instance)
+        if dated:
+            model.objects.bulk_update(dated, ['created_at'])
+
+        tags = _resolve_tags(name for _, row in items for name in _tags(row))
+        through = model.tags.through
+        links = {
+            (instance.pk, tags[name].pk)
+            for instance, row in items for name in _tags(row) if name in tags
+        }
+        owner = f'{model._meta.model_name}_id'
+        through.objects.bulk_create(
+            [through(**{owner: instance_id, 'tag_id': tag_id}) for instance_id, tag_id in links],
+            ignore_conflicts=True,
+        )
+    return instances
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.models import Event, News
+from website import cache as website_cache
+
+# model -> (HTML body field, public page dependency)
+MODELS = {
+    News: ('content', website_cache.NEWS),
+    Event: ('description', website_cache.EVENTS),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compute the stored excerpt and reading time of News and Event rows. Only rows without an excerpt are processed unless --all is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recompute every row, not only those without an excerpt')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk update')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model, (body_field, dependency) in MODELS.items():
+            rows = model.objects.only('pk', body_field).order_by('pk')
+            if not options['all']:
+                rows = rows.filter(excerpt='')
+
+            updated = 0
+            last_pk = 0
+            while True:
+                # Walk by primary key so each batch is an index range scan
+                batch = list(rows.filter(pk__gt=last_pk)[:batch_size])
+                if not batch:
+                    break
+                for instance in batch:
+                    instance.refresh_summary()
+                model.objects.bulk_update(batch, ['excerpt', 'reading_time'])
+                updated += len(batch)
+                last_pk = batch[-1].pk
+
+            if updated:
+                # bulk_update sends no post_save, so invalidate cached public pages here
+                website_cache.bump(dependency)
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {updated} rows updated")
+        self.stdout.write(self.style.SUCCESS("Done."))
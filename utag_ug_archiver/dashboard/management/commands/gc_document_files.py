@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from dashboard.models import Document, File, hash_file
+
+
+class Command(BaseCommand):
+    help = (
+        'Hash legacy document files, merge duplicates, recount references and delete '
+        'unreferenced blobs older than the grace period. Use --dry-run to preview changes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Print changes without saving or deleting')
+        parser.add_argument('--grace-hours', type=int, default=24,
+                            help='Keep unreferenced files younger than this (pending uploads)')
+        parser.add_argument('--scan-storage', action='store_true',
+                            help='Also delete blobs under files/ that no File row points at')
+
+    def handle(self, *args, **options):
+        self.dry_run = options.get('dry_run', False)
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+
+        merged = self.backfill_hashes()
+        if not self.dry_run:
+            File.objects.refresh_ref_counts(File.objects.values('pk'))
+        deleted = self.delete_orphans(cutoff)
+        swept = self.sweep_storage(cutoff) if options.get('scan_storage') else 0
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. Merged {merged} duplicate files, deleted {deleted} orphaned files, "
+            f"swept {swept} untracked blobs{' (dry-run)' if self.dry_run else ''}."
+        ))
+
+    def backfill_hashes(self):
+        """Hash files stored before the content index existed and fold duplicates."""
+        merged = 0
+        for file_obj in File.objects.filter(sha256__isnull=True).iterator():
+            try:
+                with file_obj.file.open('rb'):
+                    digest = hash_file(file_obj.file)
+            except (FileNotFoundError, OSError) as e:
+                self.stderr.write(f"{file_obj.file.name}: cannot read ({e})")
+                continue
+
+            original = File.objects.filter(sha256=digest).first()
+            if original is None:
+                if not self.dry_run:
+                    File.objects.filter(pk=file_obj.pk).update(sha256=digest)
+                continue
+
+            self.stdout.write(f"{file_obj.file.name}: duplicate of {original.file.name}")
+            merged += 1
+            if self.dry_run:
+                continue
+            with transaction.atomic():
+                for document in Document.objects.filter(files=file_obj):
+                    document.files.add(original)
+                    document.files.remove(file_obj)
+        return merged
+
+    def delete_orphans(self, cutoff):
+        orphans = File.objects.filter(ref_count=0, created_at__lt=cutoff)
+        deleted = 0
+        for file_obj in orphans.iterator():
+            self.stdout.write(f"{file_obj.file.name}: unreferenced{' (dry-run)' if self.dry_run else ''}")
+            deleted += 1
+            if self.dry_run:
+                continue
+            with transaction.atomic():
+                # Re-check under lock in case it was attached since the scan
+                locked = File.objects.select_for_update().filter(pk=file_obj.pk, ref_count=0).first()
+                if locked is None or locked.document_set.exists():
+                    deleted -= 1
+                    continue
+                name, storage = locked.file.name, locked.file.storage
+                locked.delete()
+            if name and not File.objects.filter(file=name).exists():
+                storage.delete(name)
+        return deleted
+
+    def sweep_storage(self, cutoff):
+        storage = File._meta.get_field('file').storage
+        known = set(File.objects.values_list('file', flat=True))
+        swept = 0
+        pending = ['files']
+        while pending:
+            directory = pending.pop()
+            try:
+                subdirs, names = storage.listdir(directory)
+            except FileNotFoundError:
+                continue
+            pending.extend(f'{directory}/{subdir}' for subdir in subdirs)
+            for name in names:
+                path = f'{directory}/{name}'
+                if path in known or storage.get_modified_time(path) >= cutoff:
+                    continue
+                self.stdout.write(f"{path}: untracked blob{' (dry-run)' if self.dry_run else ''}")
+                swept += 1
+                if not self.dry_run:
+                    storage.delete(path)
+        return swept
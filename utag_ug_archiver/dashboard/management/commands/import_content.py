@@ -0,0 +1,75 @@
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import User
+from dashboard import imports, related
+from dashboard.reminders import schedule_reminders
+from website import cache as website_cache, search
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk import News or Event records from a CSV or JSON file. Columns match the model '
+        'fields; "tags" is a comma separated list and "featured_image" a path relative to --images-dir.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file to import')
+        parser.add_argument('--model', choices=sorted(imports.BUILDERS), required=True)
+        parser.add_argument('--user', required=True, help='Email of the author/creator of the imported rows')
+        parser.add_argument('--images-dir', default='', help='Directory that featured_image paths are relative to')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=8, help='Parallel image uploads')
+        parser.add_argument('--dry-run', action='store_true', help='Parse and validate without saving')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options['user']).first()
+        if user is None:
+            raise CommandError(f"No user with email {options['user']}")
+
+        try:
+            rows = imports.read_rows(options['path'])
+            if options.get('dry_run'):
+                _, _, build = imports.BUILDERS[options['model']]
+                valid = 0
+                for row in rows:
+                    try:
+                        build(row, user)
+                        valid += 1
+                    except (ValueError, ValidationError) as e:
+                        self.stderr.write(f"{row.get('title')!r}: {e}")
+                self.stdout.write(self.style.SUCCESS(f"Done. {valid} valid rows (dry-run)."))
+                return
+
+            created = 0
+            now = timezone.now()
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                instances = imports.import_batch(
+                    options['model'], batch, user,
+                    images_dir=options['images_dir'], workers=options['workers'],
+                )
+                if options['model'] == 'event':
+                    # bulk_create skips post_save, so schedule reminders for future events here
+                    for event in instances:
+                        if event.starts_at and event.starts_at > now:
+                            schedule_reminders(event)
+                # Likewise index the published rows for the site search
+                for instance in instances:
+                    search.index_item(options['model'], instance.pk)
+                created += len(instances)
+                self.stdout.write(f"Imported {created} rows...")
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if created:
+            # Tags were linked in bulk without m2m_changed, so rank related items here
+            related.rebuild_all(options['model'])
+            # bulk_create sends no post_save, so invalidate cached public pages here
+            website_cache.bump(website_cache.NEWS if options['model'] == 'news' else website_cache.EVENTS)
+        self.stdout.write(self.style.SUCCESS(f"Done. Imported {created} {options['model']} rows."))
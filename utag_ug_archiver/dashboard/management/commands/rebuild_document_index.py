@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import search
+from dashboard.models import Document, File
+
+
+class Command(BaseCommand):
+    help = 'Extract text from document files and rebuild the document search index. Use --missing-only to skip files already extracted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing-only', action='store_true', help='Only extract files that have never been processed')
+
+    def handle(self, *args, **options):
+        files = File.objects.filter(document__isnull=False).distinct()
+        if options.get('missing_only'):
+            files = files.filter(text_extracted_at__isnull=True)
+
+        extracted = 0
+        for file_obj in files.iterator():
+            search.extract_file_text(file_obj)
+            extracted += 1
+
+        indexed = 0
+        for document in Document.objects.iterator():
+            search.index_document(document)
+            indexed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Extracted {extracted} files, indexed {indexed} documents."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import related
+from website import cache as website_cache
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed related News and Event lists from their tags.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=sorted(related.KINDS), help='Only rebuild this kind (default: all)')
+
+    def handle(self, *args, **options):
+        kinds = [options['model']] if options.get('model') else sorted(related.KINDS)
+        for kind in kinds:
+            count = related.rebuild_all(kind)
+            self.stdout.write(f"{kind}: {count} lists rebuilt")
+        website_cache.bump(*(website_cache.NEWS if kind == 'news' else website_cache.EVENTS for kind in kinds))
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import previews
+from dashboard.models import File
+
+
+class Command(BaseCommand):
+    help = 'Render preview images for document files. Use --missing-only to skip files already rendered.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing-only', action='store_true', help='Only render files that have never been processed')
+
+    def handle(self, *args, **options):
+        files = File.objects.filter(document__isnull=False).distinct()
+        if options.get('missing_only'):
+            files = files.filter(previews_rendered_at__isnull=True)
+
+        rendered = 0
+        pages = 0
+        for file_obj in files.iterator():
+            if not previews.is_previewable(file_obj.file):
+                continue
+            pages += previews.render_previews(file_obj)
+            rendered += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Rendered {pages} pages for {rendered} files."))
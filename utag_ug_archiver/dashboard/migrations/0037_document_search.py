@@ -0,0 +1,60 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:12
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    """GIN index on PostgreSQL, FTS5 mirror table on SQLite, nothing elsewhere."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS dashboard_document_search_gin "
+            "ON dashboard_document USING GIN (search_vector)"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS dashboard_document_fts "
+            "USING fts5(title, sender, receiver, description, body, tokenize='porter unicode61')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS dashboard_document_search_gin")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS dashboard_document_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0036_delete_advertplan"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="search_text",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="file",
+            name="extracted_text",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="file",
+            name="text_extracted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_references(apps, schema_editor):
+    File = apps.get_model("dashboard", "File")
+    Document = apps.get_model("dashboard", "Document")
+    references = (
+        Document.files.through.objects.filter(file_id=OuterRef("pk"))
+        .values("file_id")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    File.objects.update(ref_count=Coalesce(Subquery(references), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0038_uploadsession"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="file",
+            name="ref_count",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="file",
+            name="sha256",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True, unique=True
+            ),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0039_file_content_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="file",
+            name="preview_pages",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="file",
+            name="previews_rendered_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:22
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_event_window(apps, schema_editor):
+    Event = apps.get_model("dashboard", "Event")
+    for event in Event.objects.only("start_date", "end_date", "start_time", "end_time").iterator():
+        start = datetime.datetime.combine(event.start_date, event.start_time or datetime.time(0, 0, 0))
+        end = datetime.datetime.combine(
+            event.end_date or event.start_date, event.end_time or datetime.time(23, 59, 59)
+        )
+        Event.objects.filter(pk=event.pk).update(
+            starts_at=timezone.make_aware(start), ends_at=timezone.make_aware(end)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0040_file_previews"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="ends_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="starts_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(fill_event_window, migrations.RunPython.noop),
+    ]
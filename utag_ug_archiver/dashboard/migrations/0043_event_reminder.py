@@ -0,0 +1,82 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0042_event_registration"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventReminder",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "offset",
+                    models.DurationField(
+                        help_text="How long before the event starts to send the reminder"
+                    ),
+                ),
+                (
+                    "audience",
+                    models.CharField(
+                        choices=[
+                            ("registrants", "Confirmed registrants"),
+                            ("members", "All members"),
+                        ],
+                        default="members",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "send_at",
+                    models.DateTimeField(blank=True, editable=False, null=True),
+                ),
+                (
+                    "last_recipient_id",
+                    models.PositiveBigIntegerField(default=0, editable=False),
+                ),
+                ("sent_count", models.PositiveIntegerField(default=0, editable=False)),
+                (
+                    "sent_at",
+                    models.DateTimeField(blank=True, editable=False, null=True),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reminders",
+                        to="dashboard.event",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["send_at"],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("sent_at__isnull", True)),
+                        fields=["send_at"],
+                        name="dashboard_reminder_due_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="eventreminder",
+            constraint=models.UniqueConstraint(
+                fields=("event", "offset"), name="unique_event_reminder_offset"
+            ),
+        ),
+    ]
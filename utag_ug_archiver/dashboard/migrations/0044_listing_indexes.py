@@ -0,0 +1,27 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0043_event_reminder"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["is_published", "created_at", "id"],
+                name="dashboard_event_listing_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="news",
+            index=models.Index(
+                fields=["is_published", "created_at", "id"],
+                name="dashboard_news_listing_idx",
+            ),
+        ),
+    ]
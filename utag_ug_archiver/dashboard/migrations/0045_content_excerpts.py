@@ -0,0 +1,37 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0044_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="reading_time",
+            field=models.PositiveSmallIntegerField(
+                default=0, editable=False, help_text="Minutes"
+            ),
+        ),
+        migrations.AddField(
+            model_name="news",
+            name="excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name="news",
+            name="reading_time",
+            field=models.PositiveSmallIntegerField(
+                default=0, editable=False, help_text="Minutes"
+            ),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0045_content_excerpts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedNews",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shared_tags", models.PositiveSmallIntegerField()),
+                (
+                    "source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_links",
+                        to="dashboard.news",
+                    ),
+                ),
+                (
+                    "target",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="dashboard.news",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RelatedEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shared_tags", models.PositiveSmallIntegerField()),
+                (
+                    "source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_links",
+                        to="dashboard.event",
+                    ),
+                ),
+                (
+                    "target",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="dashboard.event",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="relatednews",
+            constraint=models.UniqueConstraint(
+                fields=("source", "target"), name="dashboard_relatednews_unique"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="relatedevent",
+            constraint=models.UniqueConstraint(
+                fields=("source", "target"), name="dashboard_relatedevent_unique"
+            ),
+        ),
+    ]
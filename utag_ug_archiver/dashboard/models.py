@@ -1,11 +1,18 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import Group
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 from tinymce.models import HTMLField
+from utag_ug_archiver.utils.excerpts import EXCERPT_LENGTH, summarize
+from utag_ug_archiver.utils.slugs import unique_slug
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 import datetime
+import hashlib
+import uuid
 
 
 class EventSpeaker(models.Model):
@@ -62,6 +69,44 @@ class EventImage(models.Model):
     def __str__(self):
         return f"Image for {self.event.title}"
 
+def _as_date(value):
+    # Fields may still hold strings during form processing
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value) if value else None
+    return value
+
+
+def _as_time(value):
+    if isinstance(value, str):
+        return datetime.time.fromisoformat(value) if value else None
+    return value
+
+
+class EventQuerySet(models.QuerySet):
+    """Time-based filters over the denormalized ``starts_at``/``ends_at`` columns."""
+
+    def upcoming(self, now=None):
+        return self.filter(starts_at__gt=now or timezone.now())
+
+    def ongoing(self, now=None):
+        now = now or timezone.now()
+        return self.filter(starts_at__lte=now, ends_at__gte=now)
+
+    def past(self, now=None):
+        return self.filter(ends_at__lt=now or timezone.now())
+
+    def refresh_statuses(self, now=None):
+        """Move started and finished events along in two UPDATEs.
+
+        Returns ``(started, completed)`` row counts. Cancelled and postponed
+        events are left alone.
+        """
+        now = now or timezone.now()
+        started = self.filter(status='upcoming', starts_at__lte=now, ends_at__gte=now).update(status='ongoing')
+        completed = self.filter(status__in=['upcoming', 'ongoing'], ends_at__lt=now).update(status='completed')
+        return started, completed
+
+
 class Event(models.Model):
     """Enhanced Event model with support for online events"""
     EVENT_STATUS_CHOICES = (
@@ -88,6 +133,9 @@ class Event(models.Model):
     event_slug = models.SlugField(max_length=100, unique=True, blank=True)
     short_description = models.TextField(help_text="Brief description for listings (max 200 chars)", max_length=200)
     description = HTMLField(help_text="Full event description")
+    # Plain-text card summary, derived from description on save
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False, help_text='Minutes')
     
     # Featured image
     featured_image = models.ImageField(upload_to='event_images/')
@@ -98,6 +146,9 @@ class Event(models.Model):
     start_time = models.TimeField(blank=True, null=True)
     end_time = models.TimeField(blank=True, null=True)
     registration_deadline = models.DateTimeField(blank=True, null=True)
+    # Combined from the fields above on save so status and listings can filter in SQL
+    starts_at = models.DateTimeField(blank=True, null=True, db_index=True, editable=False)
+    ends_at = models.DateTimeField(blank=True, null=True, db_index=True, editable=False)
     
     # Location
     venue = models.CharField(max_length=100, blank=True, help_text="Leave blank for online events")
@@ -123,6 +174,8 @@ class Event(models.Model):
     registration_url = models.URLField(blank=True, help_text="External registration link if applicable")
     max_participants = models.PositiveIntegerField(default=0, blank=True, 
                                                 help_text="0 means unlimited")
+    # Confirmed registrations, claimed with a conditional UPDATE (dashboard.registrations)
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
     
     # Organizing information
     organizer_name = models.CharField(max_length=100, blank=True)
@@ -141,11 +194,17 @@ class Event(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EventQuerySet.as_manager()
     
     class Meta:
         ordering = ['-start_date', '-start_time']
         verbose_name = "Event"
         verbose_name_plural = "Events"
+        indexes = [
+            # Keyset pagination of the public events listing
+            models.Index(fields=['is_published', 'created_at', 'id'], name='dashboard_event_listing_idx'),
+        ]
     
     def get_featured_image_url(self):
         return self.featured_image.url if self.featured_image else None
@@ -174,60 +233,44 @@ class Event(models.Model):
             start_date = date.fromisoformat(start_date)
         return start_date > timezone.now().date()
     
-    def get_status_display(self):
-        now = timezone.now()
-
-        # Handle case where fields might be strings (during form processing)
-        start_date = self.start_date
-        if isinstance(start_date, str):
-            from datetime import date
-            start_date = date.fromisoformat(start_date)
-        start_time = self.start_time
-        if isinstance(start_time, str):
-            from datetime import time
-            start_time = time.fromisoformat(start_time) if start_time else None
+    @property
+    def seats_left(self):
+        if not self.max_participants:
+            return None
+        return max(self.max_participants - self.seats_taken, 0)
+
+    def get_event_window(self):
+        """Return ``(starts_at, ends_at)``; all-day events span the whole day."""
+        start_date = _as_date(self.start_date)
+        if start_date is None:
+            return None, None
+        start_time = _as_time(self.start_time) or datetime.time(0, 0, 0)
+        end_date = _as_date(self.end_date) or start_date
+        end_time = _as_time(self.end_time) or datetime.time(23, 59, 59)
+        return (
+            timezone.make_aware(datetime.datetime.combine(start_date, start_time)),
+            timezone.make_aware(datetime.datetime.combine(end_date, end_time)),
+        )
+
+    def refresh_schedule(self, now=None):
+        """Sync ``starts_at``/``ends_at`` and the time-based status (not saved)."""
+        self.starts_at, self.ends_at = self.get_event_window()
+        now = now or timezone.now()
+        if self.status not in ['cancelled', 'postponed'] and self.starts_at:
+            if self.starts_at > now:
+                self.status = 'upcoming'
+            elif self.ends_at < now:
+                self.status = 'completed'
+            else:
+                self.status = 'ongoing'
 
-        end_date = self.end_date
-        if isinstance(end_date, str):
-            from datetime import date
-            end_date = date.fromisoformat(end_date) if end_date else None
-        end_time = self.end_time
-        if isinstance(end_time, str):
-            from datetime import time
-            end_time = time.fromisoformat(end_time) if end_time else None
+    def refresh_summary(self):
+        self.excerpt, self.reading_time = summarize(self.description)
 
-        # Create datetime objects for start and end by combining date and time
-        if start_time:
-            start_datetime = timezone.make_aware(
-                datetime.datetime.combine(start_date, start_time)
-            )
-        else:
-            # For all-day events, start at beginning of start_date
-            start_datetime = timezone.make_aware(
-                datetime.datetime.combine(start_date, datetime.time(0, 0, 0))
-            )
-
-        end_date = end_date or start_date
-        if end_time:
-            end_datetime = timezone.make_aware(
-                datetime.datetime.combine(end_date, end_time)
-            )
-        else:
-            # For all-day events, end at end of end_date
-            end_datetime = timezone.make_aware(
-                datetime.datetime.combine(end_date, datetime.time(23, 59, 59))
-            )
-
-        # Determine status based on datetime comparisons
+    def get_status_display(self):
         if self.is_past_due():
             return 'Past Due'
-        if self.status == 'upcoming' and start_datetime and start_datetime > now:
-            return 'Upcoming'
-        if self.status == 'ongoing' and start_datetime and start_datetime <= now <= (end_datetime or start_datetime):
-            return 'Ongoing'
-        if self.status == 'completed' and end_datetime and end_datetime < now:
-            return 'Completed'
-        return self.status
+        return dict(self.EVENT_STATUS_CHOICES).get(self.status, self.status)
     
     def clean(self):
         start_date = self.start_date
@@ -257,46 +300,91 @@ class Event(models.Model):
     def save(self, *args, **kwargs):
         # Auto-generate slug
         if not self.event_slug:
-            self.event_slug = slugify(self.title)
-            unique_slug = self.event_slug
-            num = 1
-            while Event.objects.filter(event_slug=unique_slug).exists():
-                unique_slug = f"{self.event_slug}-{num}"
-                num += 1
-            self.event_slug = unique_slug
+            self.event_slug = unique_slug(Event, 'event_slug', self.title)
             
-        # Auto-update status based on dates AND times
-        now = timezone.now()
-        
-        # Create datetime objects for start and end by combining date and time
-        start_datetime = timezone.make_aware(
-            datetime.datetime.combine(self.start_date, self.start_time)
-        ) if self.start_date and self.start_time else None
-        
-        # For end datetime, use end_date if provided, otherwise use start_date
-        end_date = self.end_date or self.start_date
-        end_time = self.end_time or datetime.time(23, 59, 59)  # Default to end of day if no end_time
-        end_datetime = timezone.make_aware(
-            datetime.datetime.combine(end_date, end_time)
-        ) if end_date and end_time else None
-        
-        # Update status based on datetime comparison
-        if self.status not in ['cancelled', 'postponed']:
-            if start_datetime and start_datetime > now:
-                self.status = 'upcoming'
-            elif end_datetime and end_datetime < now:
-                self.status = 'completed'
-            elif start_datetime and start_datetime <= now and (not end_datetime or end_datetime >= now):
-                self.status = 'ongoing'
+        self.refresh_schedule()
+        self.refresh_summary()
                 
         # Run validation
         self.clean()
+        if not self._state.adding and not args and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            # seats_taken moves only through the conditional UPDATEs in
+            # dashboard.registrations; a stale copy must not overwrite it
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'seats_taken'
+            ]
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
     
 
+class EventRegistration(models.Model):
+    STATUS_CHOICES = (
+        ('confirmed', 'Confirmed'),
+        ('waitlisted', 'Waitlisted'),
+        ('cancelled', 'Cancelled'),
+    )
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='registrations')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    name = models.CharField(max_length=150)
+    # Stored lowercased; one registration per address makes resubmits idempotent
+    email = models.EmailField()
+    department = models.CharField(max_length=150, blank=True)
+    special_requests = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waitlisted')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'email'], name='unique_event_registration_email'),
+        ]
+        indexes = [
+            # Waitlist promotion picks the oldest waitlisted registration
+            models.Index(fields=['event', 'status', 'created_at'], name='dashboard_eventreg_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.event}"
+
+
+class EventReminder(models.Model):
+    AUDIENCE_CHOICES = (
+        ('registrants', 'Confirmed registrants'),
+        ('members', 'All members'),
+    )
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='reminders')
+    offset = models.DurationField(help_text="How long before the event starts to send the reminder")
+    audience = models.CharField(max_length=20, choices=AUDIENCE_CHOICES, default='members')
+    send_at = models.DateTimeField(blank=True, null=True, editable=False)
+    # Delivery progress: recipients are sent in primary key order (dashboard.reminders)
+    last_recipient_id = models.PositiveBigIntegerField(default=0, editable=False)
+    sent_count = models.PositiveIntegerField(default=0, editable=False)
+    sent_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    class Meta:
+        ordering = ['send_at']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'offset'], name='unique_event_reminder_offset'),
+        ]
+        indexes = [
+            # The beat sweep only ever looks at unsent reminders
+            models.Index(fields=['send_at'], condition=Q(sent_at__isnull=True), name='dashboard_reminder_due_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        starts_at = self.event.starts_at
+        self.send_at = starts_at - self.offset if starts_at else None
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.event} - {self.offset} before"
+
+
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=50, unique=True, blank=True)
@@ -338,28 +426,65 @@ class News(models.Model):
     title = models.CharField(max_length=150)
     news_slug = models.SlugField(max_length=150, unique=True, blank=True)
     content = HTMLField()
+    # Plain-text card summary, derived from content on save
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False, help_text='Minutes')
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='author')
     tags = models.ManyToManyField('Tag', blank=True)
     is_published = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the public news listing
+            models.Index(fields=['is_published', 'created_at', 'id'], name='dashboard_news_listing_idx'),
+        ]
+
     def get_featured_image_url(self):
         return self.featured_image.url if self.featured_image else None
 
+    def refresh_summary(self):
+        self.excerpt, self.reading_time = summarize(self.content)
+
     def save(self, *args, **kwargs):
         if not self.news_slug:
-            self.news_slug = slugify(self.title)
-            unique_slug = self.news_slug
-            num = 1
-            while News.objects.filter(news_slug=unique_slug).exists():
-                unique_slug = f"{self.news_slug}-{num}"
-                num += 1
-            self.news_slug = unique_slug
+            self.news_slug = unique_slug(News, 'news_slug', self.title)
+        self.refresh_summary()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
+
+
+class RelatedNews(models.Model):
+    """Precomputed "related posts" for a news item (see ``dashboard.related``)."""
+    source = models.ForeignKey(News, on_delete=models.CASCADE, related_name='related_links')
+    target = models.ForeignKey(News, on_delete=models.CASCADE, related_name='+')
+    shared_tags = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'target'], name='dashboard_relatednews_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.source_id} -> {self.target_id} ({self.shared_tags})"
+
+
+class RelatedEvent(models.Model):
+    """Precomputed related events for an event (see ``dashboard.related``)."""
+    source = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='related_links')
+    target = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    shared_tags = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'target'], name='dashboard_relatedevent_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.source_id} -> {self.target_id} ({self.shared_tags})"
     
 
     
@@ -401,13 +526,71 @@ class Notification(models.Model):
         return f'{self.user} - {self.announcement.title}'
     
 
+def hash_file(content):
+    """SHA-256 hex digest of an uploaded/Django file, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileManager(models.Manager):
+    def from_upload(self, content, sha256=None):
+        """Return ``(file, created)`` for ``content``, storing the blob only if it is new.
+
+        A known upload costs one hash and one indexed lookup.
+        """
+        sha256 = sha256 or hash_file(content)
+        existing = self.filter(sha256=sha256).first()
+        if existing is not None:
+            return existing, False
+
+        new_file = self.model(sha256=sha256)
+        new_file.file.save(content.name, content, save=False)
+        try:
+            with transaction.atomic():
+                new_file.save()
+        except IntegrityError:
+            # The same content was stored concurrently; keep theirs
+            new_file.file.delete(save=False)
+            return self.get(sha256=sha256), False
+        return new_file, True
+
+    def refresh_ref_counts(self, file_ids):
+        """Recount, in one UPDATE, how many documents reference each file."""
+        through = self.model.document_set.through
+        references = (
+            through.objects.filter(file_id=OuterRef('pk'))
+            .values('file_id')
+            .annotate(total=Count('*'))
+            .values('total')
+        )
+        return self.filter(pk__in=file_ids).update(ref_count=Coalesce(Subquery(references), Value(0)))
+
+
 class File(models.Model):
     file = models.FileField(upload_to='files/')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Content index: identical uploads share one row and one stored blob
+    sha256 = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+    # Number of documents attached to this file, kept by dashboard.signals
+    ref_count = models.PositiveIntegerField(default=0, db_index=True, editable=False)
+    # Filled in by the text extraction task for document search
+    extracted_text = models.TextField(blank=True, default='', editable=False)
+    text_extracted_at = models.DateTimeField(blank=True, null=True, editable=False)
+    # Page images rendered by the preview task, see dashboard.previews
+    preview_pages = models.PositiveSmallIntegerField(default=0, editable=False)
+    previews_rendered_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    objects = FileManager()
 
     def __str__(self):
         return str(self.file)
 
+    @property
+    def preview_page_numbers(self):
+        return range(1, self.preview_pages + 1)
+
 
 class Document(models.Model):
     CATEGORY_CHOICES = (
@@ -435,6 +618,9 @@ class Document(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     visibility = models.CharField(max_length=20, choices=VISIBILITY_CHOICES, default='everyone')
     visible_to_groups = models.ManyToManyField(Group, blank=True)
+    # Search data maintained by dashboard.search.index_document
+    search_text = models.TextField(blank=True, default='', editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
     
 
     def __str__(self):
@@ -457,6 +643,51 @@ class Document(models.Model):
         return full_name or self.uploaded_by.get_username() or str(self.uploaded_by)
 
 
+class UploadSession(models.Model):
+    """A resumable, chunked upload of one document file.
+
+    Chunks are stored as separate parts under ``parts_dir`` and assembled
+    into a ``File`` by a background task once ``offset`` reaches ``size``.
+    """
+    STATUS_CHOICES = (
+        ('uploading', 'Uploading'),
+        ('assembling', 'Assembling'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, null=True, blank=True, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    # Optional SHA-256 (hex) of the whole file, checked after assembly
+    checksum = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    file = models.ForeignKey(File, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
+
+    @property
+    def parts_dir(self):
+        return f'uploads/{self.id}'
+
+    def part_name(self, offset):
+        return f'{self.parts_dir}/{offset:012d}.part'
+
+    @property
+    def is_finished(self):
+        return self.offset >= self.size
+
+
 class CarouselSlide(models.Model):
     title = models.CharField(max_length=255, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
@@ -0,0 +1,107 @@
+"""Page previews for document files.
+
+The first ``DOCUMENT_PREVIEW_PAGES`` pages of a PDF are rendered with
+PyMuPDF to WebP images under ``previews/<file id>/``. A ``File`` never
+changes content (identical uploads share one row), so a rendered page can be
+served with a year-long cache lifetime. PyMuPDF reads the PDF from disk, so
+large bundles are never loaded into memory whole; files on remote storage are
+spooled to a temporary file first. PyMuPDF is optional: without it no
+previews are rendered and the documents page falls back to download links.
+"""
+import contextlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from dashboard.models import File
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_DIR = 'previews'
+PREVIEWABLE_EXTS = {'.pdf'}
+WEBP_QUALITY = 80
+
+
+def is_previewable(file_field):
+    return os.path.splitext(file_field.name or '')[1].lower() in PREVIEWABLE_EXTS
+
+
+def preview_name(file_id, page):
+    return f'{PREVIEW_DIR}/{file_id}/{page}.webp'
+
+
+def delete_previews(file_id):
+    directory = f'{PREVIEW_DIR}/{file_id}'
+    try:
+        _, names = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in names:
+        default_storage.delete(f'{directory}/{name}')
+
+
+@contextlib.contextmanager
+def _local_path(file_field):
+    """Yield a filesystem path holding the contents of ``file_field``."""
+    try:
+        path = file_field.path
+    except NotImplementedError:
+        path = None  # Remote storage has no local path
+    if path is not None:
+        yield path
+        return
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(file_field.name)[1]) as spool:
+        with file_field.open('rb') as fh:
+            shutil.copyfileobj(fh, spool)
+        spool.flush()
+        yield spool.name
+
+
+def _render_pages(path, max_pages, width):
+    """Yield WebP bytes for the first ``max_pages`` pages of the PDF at ``path``."""
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    doc = fitz.open(path, filetype='pdf')
+    try:
+        for index in range(min(doc.page_count, max_pages)):
+            page = doc.load_page(index)
+            zoom = width / page.rect.width if page.rect.width else 1
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+            output = io.BytesIO()
+            image.save(output, format='WEBP', quality=WEBP_QUALITY, method=4)
+            yield output.getvalue()
+    finally:
+        doc.close()
+
+
+def render_previews(file_obj):
+    """Render and store the preview pages of a ``File``; returns the page count."""
+    if not is_previewable(file_obj.file):
+        return 0
+    try:
+        import fitz  # noqa: F401
+    except ImportError:
+        return 0
+
+    delete_previews(file_obj.pk)
+    pages = 0
+    try:
+        with _local_path(file_obj.file) as path:
+            for page, webp in enumerate(_render_pages(path, settings.DOCUMENT_PREVIEW_PAGES,
+                                                      settings.DOCUMENT_PREVIEW_WIDTH), start=1):
+                default_storage.save(preview_name(file_obj.pk, page), ContentFile(webp))
+                pages = page
+    except Exception as e:
+        logger.warning(f"Preview rendering failed for file {file_obj.id}: {e}")
+
+    File.objects.filter(pk=file_obj.pk).update(preview_pages=pages, previews_rendered_at=timezone.now())
+    return pages
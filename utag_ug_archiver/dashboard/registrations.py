@@ -0,0 +1,145 @@
+"""Native event registration with atomic capacity enforcement.
+
+A seat is claimed with one conditional UPDATE on ``Event.seats_taken``::
+
+    UPDATE event SET seats_taken = seats_taken + 1
+    WHERE id = %s AND (max_participants = 0 OR seats_taken < max_participants)
+
+The database applies it atomically, so concurrent sign-ups can never push
+the counter past capacity. A sign-up that loses the race is waitlisted. The
+registration row is inserted first and the UPDATE is the last statement
+before commit, so the event row stays locked only for the length of that
+UPDATE and the commit. ``Event.save()`` leaves the counter out of its own
+UPDATE, so saving an event loaded before a sign-up cannot undo the claim.
+Resubmitting the same address returns the existing registration (unique
+``event``/``email``); a cancelled one is reactivated and goes through the
+same seat claim. Raising ``max_participants`` promotes waitlisted
+registrations into the new seats.
+"""
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from dashboard.models import Event, EventRegistration
+
+logger = logging.getLogger(__name__)
+
+
+class RegistrationClosed(Exception):
+    pass
+
+
+def _claim_seat(event_id):
+    has_room = Q(max_participants=0) | Q(seats_taken__lt=F('max_participants'))
+    return Event.objects.filter(has_room, pk=event_id).update(seats_taken=F('seats_taken') + 1) == 1
+
+
+def register(event, name, email, department='', special_requests='', user=None):
+    """Register ``email`` for ``event``; returns ``(registration, created)``.
+
+    The registration is ``confirmed`` when a seat was free and ``waitlisted``
+    otherwise. A cancelled registration for the same address is reactivated
+    and joins the back of the queue. Raises ``RegistrationClosed`` when the
+    event does not accept registrations.
+    """
+    if not (event.is_published and event.registration_required and event.is_registration_open()):
+        raise RegistrationClosed('Registration is closed for this event')
+
+    email = email.strip().lower()
+    existing = EventRegistration.objects.filter(event=event, email=email).first()
+    if existing is not None and existing.status != 'cancelled':
+        return existing, False
+
+    fields = {
+        'user': user if user is not None and user.is_authenticated else None,
+        'name': name.strip()[:150],
+        'department': department.strip()[:150],
+        'special_requests': special_requests.strip(),
+    }
+    try:
+        with transaction.atomic():
+            if existing is None:
+                registration = EventRegistration.objects.create(
+                    event=event, email=email, status='waitlisted', **fields
+                )
+            else:
+                # Only one concurrent resubmission gets to reactivate the row
+                now = timezone.now()
+                reactivated = EventRegistration.objects.filter(pk=existing.pk, status='cancelled').update(
+                    status='waitlisted', created_at=now, updated_at=now, **fields
+                )
+                if not reactivated:
+                    existing.refresh_from_db()
+                    return existing, False
+                registration = existing
+                for field, value in fields.items():
+                    setattr(registration, field, value)
+                registration.status = 'waitlisted'
+                registration.created_at = registration.updated_at = now
+            if _claim_seat(event.pk):
+                EventRegistration.objects.filter(pk=registration.pk).update(status='confirmed')
+                registration.status = 'confirmed'
+    except IntegrityError:
+        # A concurrent submission for the same address won
+        return EventRegistration.objects.get(event=event, email=email), False
+    return registration, True
+
+
+def cancel(registration):
+    """Cancel a registration and hand a freed seat to the oldest waitlisted one.
+
+    Returns the promoted registration, if any.
+    """
+    with transaction.atomic():
+        was_confirmed = EventRegistration.objects.filter(
+            pk=registration.pk, status='confirmed'
+        ).update(status='cancelled')
+        if not was_confirmed:
+            EventRegistration.objects.filter(pk=registration.pk).update(status='cancelled')
+            registration.status = 'cancelled'
+            return None
+        registration.status = 'cancelled'
+
+        # skip_locked lets concurrent cancellations promote different people
+        promoted = (
+            EventRegistration.objects.select_for_update(skip_locked=True)
+            .filter(event_id=registration.event_id, status='waitlisted')
+            .order_by('created_at', 'pk')
+            .first()
+        )
+        if promoted is None:
+            Event.objects.filter(pk=registration.event_id, seats_taken__gt=0).update(
+                seats_taken=F('seats_taken') - 1
+            )
+            return None
+        # The seat moves from one registration to the other; the count stays
+        EventRegistration.objects.filter(pk=promoted.pk).update(status='confirmed')
+        promoted.status = 'confirmed'
+    logger.info(f"Registration {promoted.pk} promoted from the waitlist for event {registration.event_id}")
+    return promoted
+
+
+def promote_waitlisted(event_id):
+    """Confirm waitlisted registrations, oldest first, while seats are free.
+
+    Called after an event is saved, since raising ``max_participants`` frees
+    seats without any cancellation. Returns the promoted registrations.
+    """
+    promoted = []
+    with transaction.atomic():
+        waiting = (
+            EventRegistration.objects.select_for_update(skip_locked=True)
+            .filter(event_id=event_id, status='waitlisted')
+            .order_by('created_at', 'pk')
+        )
+        for registration in waiting:
+            if not _claim_seat(event_id):
+                break
+            EventRegistration.objects.filter(pk=registration.pk).update(status='confirmed')
+            registration.status = 'confirmed'
+            promoted.append(registration)
+    if promoted:
+        logger.info(f"{len(promoted)} registration(s) promoted from the waitlist for event {event_id}")
+    return promoted
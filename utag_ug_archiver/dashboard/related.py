@@ -0,0 +1,90 @@
+"""Related News and Events ranked by shared tags, then recency.
+
+Each item keeps its top ``RELATED_LIMIT`` neighbours in ``RelatedNews`` /
+``RelatedEvent``, so a detail page reads them with one indexed lookup.
+When an item's tags change, ``refresh`` rebuilds its list and the list of
+every item that either shares a tag with it now or listed it before. That
+covers every list the change can affect, and nothing else. Unpublished
+targets are kept and filtered out at read time, so publishing or
+unpublishing an item needs no rebuild.
+"""
+from django.db import transaction
+from django.db.models import Count
+
+from dashboard.models import Event, News, RelatedEvent, RelatedNews
+
+# More than a page shows, so unpublished targets do not leave it short
+RELATED_LIMIT = 6
+
+# kind -> (model, link model, heavy HTML field to skip when reading)
+KINDS = {
+    'news': (News, RelatedNews, 'content'),
+    'event': (Event, RelatedEvent, 'description'),
+}
+
+
+def kind_of(model):
+    return next(kind for kind, (item_model, _, _) in KINDS.items() if item_model is model)
+
+
+def _tag_ids(model, pk):
+    owner = f'{model._meta.model_name}_id'
+    return list(model.tags.through.objects.filter(**{owner: pk}).values_list('tag_id', flat=True))
+
+
+def _sharing(model, tag_ids, pk):
+    return model.objects.filter(tags__in=tag_ids).exclude(pk=pk)
+
+
+def rebuild(kind, pk):
+    """Recompute one item's related list."""
+    model, link_model, _ = KINDS[kind]
+    tag_ids = _tag_ids(model, pk)
+    ranked = []
+    if tag_ids:
+        ranked = (
+            _sharing(model, tag_ids, pk)
+            .annotate(shared=Count('tags'))
+            .order_by('-shared', '-created_at', '-pk')
+            .values_list('pk', 'shared')[:RELATED_LIMIT]
+        )
+    with transaction.atomic():
+        link_model.objects.filter(source_id=pk).delete()
+        link_model.objects.bulk_create(
+            [link_model(source_id=pk, target_id=target, shared_tags=shared) for target, shared in ranked]
+        )
+
+
+def refresh(kind, pk):
+    """Rebuild the lists a tag change on ``pk`` can affect; returns how many."""
+    model, link_model, _ = KINDS[kind]
+    affected = set(link_model.objects.filter(target_id=pk).values_list('source_id', flat=True))
+    if model.objects.filter(pk=pk).exists():
+        affected.add(pk)
+        tag_ids = _tag_ids(model, pk)
+        if tag_ids:
+            affected.update(_sharing(model, tag_ids, pk).order_by().values_list('pk', flat=True).distinct())
+    for item_id in affected:
+        rebuild(kind, item_id)
+    return len(affected)
+
+
+def rebuild_all(kind):
+    """Rebuild every item's list; returns how many were rebuilt."""
+    model, _, _ = KINDS[kind]
+    item_ids = list(model.objects.values_list('pk', flat=True))
+    for item_id in item_ids:
+        rebuild(kind, item_id)
+    return len(item_ids)
+
+
+def related_to(instance, limit=3):
+    """Published items related to ``instance``, best match first."""
+    _, link_model, body_field = KINDS[kind_of(type(instance))]
+    links = (
+        link_model.objects.filter(source_id=instance.pk, target__is_published=True)
+        .select_related('target')
+        .defer(f'target__{body_field}')
+        .order_by('-shared_tags', '-target__created_at')[:limit]
+    )
+    return [link.target for link in links]
@@ -0,0 +1,142 @@
+"""Event reminder emails.
+
+Every event gets the default schedule from ``EVENT_REMINDER_OFFSETS_HOURS``
+(more can be added in the admin). A beat task picks unsent reminders whose
+``send_at`` has passed through a partial index and sends each one in
+batches of ``EVENT_REMINDER_BATCH_SIZE`` over a single SMTP connection.
+
+Recipients are walked in primary key order. Before a batch is sent, a
+conditional UPDATE advances ``last_recipient_id`` past it, so a batch is
+claimed by exactly one worker. A retry resumes after the last claimed
+batch and never mails the same recipient twice. The trade-off is that a
+batch whose SMTP send fails is logged rather than retried.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from dashboard.models import EventRegistration, EventReminder
+
+logger = logging.getLogger(__name__)
+
+
+def default_offsets():
+    return [timedelta(hours=hours) for hours in settings.EVENT_REMINDER_OFFSETS_HOURS]
+
+
+def schedule_reminders(event):
+    """Create the default reminders and move pending ones to the event's start."""
+    audience = 'registrants' if event.registration_required and not event.registration_url else 'members'
+    existing = {reminder.offset: reminder for reminder in event.reminders.all()}
+    EventReminder.objects.bulk_create(
+        [
+            EventReminder(event=event, offset=offset, audience=audience,
+                          send_at=event.starts_at - offset if event.starts_at else None)
+            for offset in default_offsets() if offset not in existing
+        ],
+        ignore_conflicts=True,
+    )
+
+    now = timezone.now()
+    for reminder in existing.values():
+        send_at = event.starts_at - reminder.offset if event.starts_at else None
+        if send_at == reminder.send_at:
+            continue
+        reminder.send_at = send_at
+        fields = ['send_at']
+        if reminder.sent_at and send_at and send_at > now:
+            # Rescheduled to a later date: remind everyone again
+            reminder.sent_at, reminder.last_recipient_id, reminder.sent_count = None, 0, 0
+            fields += ['sent_at', 'last_recipient_id', 'sent_count']
+        EventReminder.objects.filter(pk=reminder.pk).update(**{f: getattr(reminder, f) for f in fields})
+
+
+def due_reminders(now=None):
+    return EventReminder.objects.filter(sent_at__isnull=True, send_at__lte=now or timezone.now())
+
+
+def recipients(reminder):
+    """``(pk, email)`` rows for the reminder's audience, in primary key order."""
+    if reminder.audience == 'registrants':
+        rows = EventRegistration.objects.filter(event_id=reminder.event_id, status='confirmed')
+    else:
+        # Deactivated accounts are the ones that can no longer log in
+        rows = User.objects.exclude(password__startswith=UNUSABLE_PASSWORD_PREFIX)
+    return rows.exclude(email='').order_by('pk').values_list('pk', 'email')
+
+
+def _finish(reminder):
+    EventReminder.objects.filter(pk=reminder.pk, sent_at__isnull=True).update(sent_at=timezone.now())
+
+
+def _should_skip(event, now):
+    return (
+        not event.is_published
+        or event.status in ('cancelled', 'postponed')
+        or event.starts_at is None
+        or event.starts_at <= now
+    )
+
+
+def build_message(reminder, body, email):
+    event = reminder.event
+    message = EmailMessage(
+        f"Reminder: {event.title}",
+        body,
+        settings.DEFAULT_FROM_EMAIL,
+        [email],
+    )
+    message.content_subtype = 'html'
+    return message
+
+
+def send_reminder(reminder_id, batch_size=None):
+    """Send one reminder to its audience; returns the number of emails sent."""
+    batch_size = batch_size or settings.EVENT_REMINDER_BATCH_SIZE
+    reminder = EventReminder.objects.select_related('event').filter(pk=reminder_id, sent_at__isnull=True).first()
+    if reminder is None:
+        return 0
+
+    event = reminder.event
+    if _should_skip(event, timezone.now()):
+        # Too late or no longer relevant; close it so the sweep stops picking it
+        _finish(reminder)
+        return 0
+
+    event_url = settings.SITE_URL + reverse('website:events_detail', kwargs={'slug': event.event_slug})
+    # The body has no per-recipient content, so it is rendered once
+    body = render_to_string('emails/event_reminder.html', {'event': event, 'event_url': event_url})
+
+    sent = 0
+    cursor = reminder.last_recipient_id
+    connection = get_connection()
+    connection.open()
+    try:
+        while True:
+            batch = list(recipients(reminder).filter(pk__gt=cursor)[:batch_size])
+            if not batch:
+                _finish(reminder)
+                break
+            next_cursor = batch[-1][0]
+            claimed = EventReminder.objects.filter(
+                pk=reminder.pk, last_recipient_id=cursor, sent_at__isnull=True
+            ).update(last_recipient_id=next_cursor, sent_count=F('sent_count') + len(batch))
+            if not claimed:
+                # Another worker is sending this reminder
+                break
+            cursor = next_cursor
+            try:
+                sent += connection.send_messages([build_message(reminder, body, email) for _, email in batch]) or 0
+            except Exception as e:
+                logger.error(f"Reminder {reminder.pk}: batch ending at recipient {cursor} failed: {e}")
+    finally:
+        connection.close()
+    return sent
@@ -0,0 +1,216 @@
+"""Full-text search over archived documents.
+
+PostgreSQL keeps a weighted ``tsvector`` in ``Document.search_vector`` (GIN
+indexed), SQLite keeps a mirror row in the ``dashboard_document_fts`` FTS5
+table. Any other backend falls back to plain ``icontains`` lookups.
+"""
+import logging
+import os
+import zipfile
+
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+from dashboard.models import Document, File
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'dashboard_document_fts'
+# Upper bound on text kept per file; scanned bundles can be enormous
+MAX_EXTRACTED_CHARS = 1_000_000
+
+# Sentinels wrapped around matches by the database, swapped for <mark> after escaping
+MARK_START = '\x02'
+MARK_STOP = '\x03'
+
+OFFICE_TEXT_PARTS = {
+    '.docx': ('word/document.xml',),
+    '.pptx': ('ppt/slides/',),
+    '.xlsx': ('xl/sharedStrings.xml',),
+}
+PLAIN_TEXT_EXTS = {'.txt', '.csv', '.md'}
+
+
+def _extract_pdf(fh):
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return ''
+    doc = fitz.open(stream=fh.read(), filetype='pdf')
+    try:
+        return '\n'.join(page.get_text() for page in doc)
+    finally:
+        doc.close()
+
+
+def _extract_office(fh, prefixes):
+    from defusedxml import ElementTree
+
+    chunks = []
+    with zipfile.ZipFile(fh) as archive:
+        for name in sorted(archive.namelist()):
+            if not name.endswith('.xml') or not name.startswith(prefixes):
+                continue
+            root = ElementTree.fromstring(archive.read(name))
+            # Text runs are <w:t>, <a:t> and <t> depending on the format
+            chunks.extend(
+                node.text for node in root.iter()
+                if node.tag.rsplit('}', 1)[-1] == 't' and node.text
+            )
+    return ' '.join(chunks)
+
+
+def extract_text(file_field):
+    """Return the plain text of a stored file, or '' for unsupported types."""
+    ext = os.path.splitext(file_field.name)[1].lower()
+    file_field.open('rb')
+    try:
+        if ext == '.pdf':
+            text = _extract_pdf(file_field)
+        elif ext in OFFICE_TEXT_PARTS:
+            text = _extract_office(file_field, OFFICE_TEXT_PARTS[ext])
+        elif ext in PLAIN_TEXT_EXTS:
+            text = file_field.read(MAX_EXTRACTED_CHARS * 4).decode('utf-8', errors='ignore')
+        else:
+            text = ''
+    finally:
+        file_field.close()
+    return ' '.join(text.split())[:MAX_EXTRACTED_CHARS]
+
+
+def extract_file_text(file_obj):
+    """Extract and store the text of a ``File``; errors leave it empty."""
+    try:
+        text = extract_text(file_obj.file)
+    except Exception as e:
+        logger.warning(f"Text extraction failed for file {file_obj.id}: {e}")
+        text = ''
+    File.objects.filter(pk=file_obj.pk).update(extracted_text=text, text_extracted_at=timezone.now())
+    return text
+
+
+def fts_available():
+    return connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+
+
+def index_document(document):
+    """Refresh the search data of one document from its fields and files."""
+    body = '\n'.join(t for t in document.files.values_list('extracted_text', flat=True) if t)
+    queryset = Document.objects.filter(pk=document.pk)
+    queryset.update(search_text=body)
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchVector
+
+        queryset.update(search_vector=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('sender', 'receiver', weight='B', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+            + SearchVector('search_text', weight='D', config=SEARCH_CONFIG)
+        ))
+    elif fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [document.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, sender, receiver, description, body) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                [document.pk, document.title, document.sender, document.receiver,
+                 strip_tags(document.description or ''), body],
+            )
+
+
+def unindex_document(document_id):
+    if fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [document_id])
+
+
+def render_highlight(text):
+    """Escape a database snippet and turn the match sentinels into <mark> tags."""
+    if not text:
+        return ''
+    html = escape(text).replace(MARK_START, '<mark>').replace(MARK_STOP, '</mark>')
+    return mark_safe(html)
+
+
+def fts_query(query):
+    # Quote each term so user input can never be parsed as FTS5 syntax
+    return ' '.join('"%s"' % term.replace('"', '""') for term in query.split())
+
+
+def _search_postgres(visible, query, limit):
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    documents = list(
+        Document.objects.filter(pk__in=visible.values('pk'), search_vector=search_query)
+        .annotate(
+            search_rank=SearchRank(F('search_vector'), search_query),
+            search_highlight=SearchHeadline(
+                'search_text', search_query, config=SEARCH_CONFIG,
+                start_sel=MARK_START, stop_sel=MARK_STOP, max_fragments=2,
+            ),
+        )
+        .order_by('-search_rank', '-date')[:limit]
+    )
+    for document in documents:
+        document.search_highlight = render_highlight(document.search_highlight)
+    return documents
+
+
+def _search_sqlite(visible, query, limit):
+    visible_sql, visible_params = visible.values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, bm25({FTS_TABLE}, 10.0, 4.0, 4.0, 2.0, 1.0) AS rank, '
+            f"snippet({FTS_TABLE}, -1, %s, %s, '…', 24) "
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({visible_sql}) '
+            'ORDER BY rank LIMIT %s',
+            [MARK_START, MARK_STOP, fts_query(query), *visible_params, limit],
+        )
+        rows = cursor.fetchall()
+
+    by_id = Document.objects.in_bulk([row[0] for row in rows])
+    documents = []
+    for pk, rank, snippet in rows:
+        document = by_id.get(pk)
+        if document is None:
+            continue
+        # bm25() is lower-is-better; flip it so callers can treat rank uniformly
+        document.search_rank = -rank
+        document.search_highlight = render_highlight(snippet)
+        documents.append(document)
+    return documents
+
+
+def _search_fallback(visible, query, limit):
+    lookup = Q()
+    for field in ('title', 'sender', 'receiver', 'description', 'search_text'):
+        lookup |= Q(**{f'{field}__icontains': query})
+    documents = list(
+        Document.objects.filter(pk__in=visible.values('pk')).filter(lookup).order_by('-date')[:limit]
+    )
+    for document in documents:
+        document.search_rank = 0
+        document.search_highlight = ''
+    return documents
+
+
+def search_documents(visible, query, limit=100):
+    """Rank documents in ``visible`` against ``query``.
+
+    ``visible`` must already apply the caller's visibility rules. Each returned
+    document carries ``search_rank`` and a safe ``search_highlight`` snippet.
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+    if connection.vendor == 'postgresql':
+        return _search_postgres(visible, query, limit)
+    if fts_available():
+        return _search_sqlite(visible, query, limit)
+    return _search_fallback(visible, query, limit)
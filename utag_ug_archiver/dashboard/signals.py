@@ -1,8 +1,15 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
-from dashboard.models import Announcement, Notification
+from dashboard.models import Announcement, Document, Event, File, News, Notification
 from accounts.models import User
+from dashboard.previews import delete_previews
+from dashboard.registrations import promote_waitlisted
+from dashboard.reminders import schedule_reminders
+from dashboard.tasks import extract_file_text, index_document, refresh_related_items, render_file_previews
+from utag_ug_archiver.utils.signals import m2m_changed_ids
+from utag_ug_archiver.utils.tasks import enqueue
 
 @receiver(post_save, sender=Announcement)
 def create_notifications(sender, instance, **kwargs):
@@ -18,3 +25,90 @@ def create_notifications(sender, instance, **kwargs):
             user=user,
             announcement=instance
         )
+
+
+@receiver(post_save, sender=Document)
+def reindex_document(sender, instance, **kwargs):
+    enqueue(index_document, instance.pk)
+
+
+@receiver(m2m_changed, sender=Document.files.through)
+def extract_document_files(sender, instance, action, pk_set, reverse, **kwargs):
+    if reverse:
+        return
+    if action == 'post_add':
+        # Text extraction reindexes every document that holds the file
+        for file_id in pk_set:
+            enqueue(extract_file_text, file_id)
+        # Shared files keep the previews they already have
+        for file_id in File.objects.filter(pk__in=pk_set, previews_rendered_at__isnull=True).values_list('pk', flat=True):
+            enqueue(render_file_previews, file_id)
+    elif action in ('post_remove', 'post_clear'):
+        enqueue(index_document, instance.pk)
+
+
+@receiver(post_delete, sender=Document)
+def unindex_document(sender, instance, **kwargs):
+    enqueue(index_document, instance.pk)
+
+
+@receiver(m2m_changed, sender=Document.files.through)
+def count_file_references(sender, instance, action, pk_set, reverse, **kwargs):
+    if reverse:
+        # file.document_set changed: only this file's count moves
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            File.objects.refresh_ref_counts([instance.pk])
+        return
+    if action == 'pre_clear':
+        instance._cleared_file_ids = list(instance.files.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        File.objects.refresh_ref_counts(instance.__dict__.pop('_cleared_file_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        File.objects.refresh_ref_counts(pk_set)
+
+
+@receiver(pre_delete, sender=Document)
+def remember_document_files(sender, instance, **kwargs):
+    # The through rows are cascade-deleted without m2m_changed
+    instance._deleted_file_ids = list(instance.files.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Document)
+def release_document_files(sender, instance, **kwargs):
+    File.objects.refresh_ref_counts(instance.__dict__.pop('_deleted_file_ids', []))
+
+
+@receiver(post_delete, sender=File)
+def remove_file_previews(sender, instance, **kwargs):
+    delete_previews(instance.pk)
+
+
+@receiver(post_save, sender=Event)
+def schedule_event_reminders(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_reminders(instance)
+
+
+@receiver(post_save, sender=Event)
+def fill_freed_seats(sender, instance, created, raw=False, **kwargs):
+    # A raised max_participants frees seats without any cancellation
+    if not (raw or created) and instance.registration_required:
+        promote_waitlisted(instance.pk)
+
+
+@receiver(m2m_changed, sender=Event.tags.through)
+def touch_event_on_tag_change(sender, instance, action, pk_set, reverse, **kwargs):
+    # Calendar feeds are validated on updated_at, which m2m changes do not touch
+    event_ids = m2m_changed_ids(instance, action, pk_set, reverse, 'event_set', '_cleared_event_ids')
+    if event_ids:
+        Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+def refresh_related_on_tag_change(sender, instance, action, pk_set, reverse, **kwargs):
+    kind = 'news' if sender is News.tags.through else 'event'
+    for item_id in m2m_changed_ids(instance, action, pk_set, reverse, f'{kind}_set', '_cleared_related_ids'):
+        enqueue(refresh_related_items, kind, item_id)
+
+
+m2m_changed.connect(refresh_related_on_tag_change, sender=News.tags.through, dispatch_uid='related_news_tags')
+m2m_changed.connect(refresh_related_on_tag_change, sender=Event.tags.through, dispatch_uid='related_event_tags')
@@ -1,35 +1,36 @@
 from celery import shared_task
-from datetime import datetime
+from datetime import timedelta
+from django.conf import settings
 from django.utils import timezone
-from dashboard.models import Event
+from dashboard.models import Document, Event, File, UploadSession
+from dashboard import previews, related, reminders, search, uploads
+from utag_ug_archiver.utils.tasks import enqueue
 from adverts.models import Ad
+from website import cache as website_cache
 
 @shared_task
 def update_event_statuses():
     """Update event statuses based on current date/time"""
     now = timezone.now()
-    
-    # Update upcoming events that have started
-    Event.objects.filter(
-        status='upcoming',
-        start_date__lte=now.date(),
-        start_time__lte=now.time()
-    ).update(status='ongoing')
-    
-    # Update ongoing events that have ended
-    for event in Event.objects.filter(status='ongoing'):
-        end_date = event.end_date or event.start_date
-        end_time = event.end_time or datetime.time(23, 59, 59)
-        
-        end_datetime = timezone.make_aware(
-            datetime.datetime.combine(end_date, end_time)
-        )
-        
-        if now > end_datetime:
-            event.status = 'completed'
-            event.save()
-    
-    return f"Event statuses updated at {now}"
+    started, completed = Event.objects.refresh_statuses(now)
+    if started or completed:
+        # Bulk updates send no signals; refresh cached public pages here
+        website_cache.bump(website_cache.EVENTS)
+    return f"Event statuses updated at {now}: {started} started, {completed} completed"
+
+@shared_task
+def send_due_reminders():
+    """Queue every event reminder whose send time has passed"""
+    reminder_ids = list(reminders.due_reminders().values_list('pk', flat=True))
+    for reminder_id in reminder_ids:
+        enqueue(send_event_reminder, reminder_id)
+    return f"{len(reminder_ids)} reminders queued"
+
+@shared_task
+def send_event_reminder(reminder_id):
+    """Email one event reminder to its audience in batches"""
+    sent = reminders.send_reminder(reminder_id)
+    return f"Reminder {reminder_id}: {sent} emails sent"
 
 @shared_task
 def update_advert_statuses():
@@ -40,5 +41,70 @@ def update_advert_statuses():
     expired_ads = Ad.objects.filter(active=True, end__isnull=False, end__lt=now)
     count = expired_ads.count()
     expired_ads.update(active=False)
+    if count:
+        website_cache.bump(website_cache.ADS)
+
+    return f"{count} adverts deactivated"
+
+@shared_task
+def extract_file_text(file_id):
+    """Extract searchable text from a document file and reindex its documents"""
+    file_obj = File.objects.filter(pk=file_id).first()
+    if file_obj is None:
+        return f"File {file_id} no longer exists"
+
+    text = search.extract_file_text(file_obj)
+    for document in file_obj.document_set.all():
+        search.index_document(document)
+    return f"Extracted {len(text)} characters from file {file_id}"
+
+@shared_task
+def render_file_previews(file_id):
+    """Render the first pages of a document file to cached preview images"""
+    file_obj = File.objects.filter(pk=file_id).first()
+    if file_obj is None:
+        return f"File {file_id} no longer exists"
 
-    return f"{count} adverts deactivated"
\ No newline at end of file
+    pages = previews.render_previews(file_obj)
+    return f"Rendered {pages} preview pages for file {file_id}"
+
+@shared_task
+def index_document(document_id):
+    """Refresh the full-text search data of a document"""
+    document = Document.objects.filter(pk=document_id).first()
+    if document is None:
+        search.unindex_document(document_id)
+        return f"Document {document_id} removed from search index"
+
+    search.index_document(document)
+    return f"Document {document_id} indexed"
+
+@shared_task
+def refresh_related_items(kind, item_id):
+    """Rebuild the related-items lists affected by a tag change"""
+    rebuilt = related.refresh(kind, item_id)
+    if rebuilt:
+        website_cache.bump(website_cache.NEWS if kind == 'news' else website_cache.EVENTS)
+    return f"{rebuilt} related {kind} lists rebuilt for {kind} {item_id}"
+
+@shared_task
+def assemble_upload(session_id):
+    """Assemble the parts of a finished chunked upload into a document File"""
+    session = UploadSession.objects.filter(pk=session_id, status='assembling').first()
+    if session is None:
+        return f"Upload {session_id} is not waiting for assembly"
+
+    try:
+        new_file = uploads.assemble(session)
+    except Exception as e:
+        UploadSession.objects.filter(pk=session_id).update(status='failed', error=str(e)[:255])
+        uploads.delete_parts(session)
+        raise
+    return f"Upload {session_id} assembled into file {new_file.id}"
+
+@shared_task
+def expire_upload_sessions():
+    """Remove chunked uploads that were abandoned before completion"""
+    max_age = timedelta(hours=settings.DOCUMENT_UPLOAD_EXPIRY_HOURS)
+    count = uploads.expire_sessions(max_age)
+    return f"{count} stale uploads removed"
@@ -1,3 +1,736 @@
-from django.test import TestCase
+import base64
+import datetime
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard import previews, registrations, related, reminders, search, tasks, uploads
+from dashboard.models import Document, Event, EventRegistration, EventReminder, File, News, Tag, UploadSession
+from utag_ug_archiver.utils import zipstream
+from utag_ug_archiver.utils.slugs import allocate_slugs
+from utag_ug_archiver.utils.testing import LOCMEM_CACHE, create_editor
+
+
+class DocumentSearchTests(TestCase):
+    def setUp(self):
+        self.member_group = Group.objects.create(name='Member')
+        self.member = get_user_model().objects.create_user(
+            email='member@example.com',
+            password='testpass123',
+            title='Dr.',
+            other_name='Ama',
+            surname='Mensah',
+            gender='Female',
+        )
+        self.member.groups.add(self.member_group)
+
+    def _document(self, **kwargs):
+        defaults = {'category': 'internal', 'sender': 'Registrar', 'receiver': 'UTAG', 'visibility': 'everyone'}
+        defaults.update(kwargs)
+        document = Document.objects.create(**defaults)
+        search.index_document(document)
+        return document
+
+    def test_ranks_title_matches_first_and_highlights(self):
+        body_match = self._document(title='Memo', description='<p>Salary arrears for lecturers</p>')
+        title_match = self._document(title='Salary review', description='<p>Annual review</p>')
+
+        results = search.search_documents(Document.objects.all(), 'salary')
+
+        self.assertEqual([d.pk for d in results], [title_match.pk, body_match.pk])
+        self.assertIn('<mark>Salary</mark>', results[1].search_highlight)
+
+    def test_respects_visibility_queryset(self):
+        hidden = self._document(title='Strike notice', visibility='selected_groups')
+        shown = self._document(title='Strike notice', visibility='selected_groups')
+        shown.visible_to_groups.add(self.member_group)
+
+        visible = Document.objects.filter(visibility='selected_groups', visible_to_groups__in=self.member.groups.all())
+        results = search.search_documents(visible, 'strike')
+
+        self.assertEqual([d.pk for d in results], [shown.pk])
+        self.assertNotIn(hidden.pk, [d.pk for d in results])
+
+    def test_query_syntax_is_escaped(self):
+        self._document(title='Budget "draft" 2024')
+        self.assertEqual(len(search.search_documents(Document.objects.all(), 'budget" OR (')), 0)
+        self.assertEqual(len(search.search_documents(Document.objects.all(), '"draft"')), 1)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), DOCUMENT_UPLOAD_CHUNK_SIZE=4)
+class ResumableUploadTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email='secretary@example.com',
+            password='testpass123',
+            title='Dr.',
+            other_name='Kofi',
+            surname='Boateng',
+            gender='Male',
+        )
+        self.client.login(email='secretary@example.com', password='testpass123')
+        self.document = Document.objects.create(
+            category='internal', title='Bundle', sender='A', receiver='B', uploaded_by=self.user
+        )
+
+    def _patch(self, location, offset, data, **headers):
+        return self.client.generic(
+            'PATCH', location, data, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset), **headers,
+        )
+
+    def test_chunked_upload_resumes_and_attaches_file(self):
+        payload = b'0123456789'
+        response = self.client.post(
+            reverse('dashboard:create_document_upload'),
+            HTTP_UPLOAD_LENGTH=str(len(payload)),
+            HTTP_UPLOAD_METADATA=f'filename {base64.b64encode(b"scan.pdf").decode()},'
+                                 f'document_id {base64.b64encode(str(self.document.pk).encode()).decode()}',
+        )
+        self.assertEqual(response.status_code, 201)
+        location = response['Location']
+
+        self.assertEqual(self._patch(location, 0, payload[:4])['Upload-Offset'], '4')
+        # A retried chunk with a stale offset is rejected, HEAD reports where to continue
+        self.assertEqual(self._patch(location, 0, payload[:4]).status_code, 409)
+        self.assertEqual(self.client.head(location)['Upload-Offset'], '4')
+
+        bad_checksum = 'sha256 ' + base64.b64encode(hashlib.sha256(b'nope').digest()).decode()
+        self.assertEqual(self._patch(location, 4, payload[4:8], HTTP_UPLOAD_CHECKSUM=bad_checksum).status_code, 460)
+
+        good_checksum = 'sha256 ' + base64.b64encode(hashlib.sha256(payload[4:8]).digest()).decode()
+        self.assertEqual(self._patch(location, 4, payload[4:8], HTTP_UPLOAD_CHECKSUM=good_checksum).status_code, 204)
+        self.assertEqual(self._patch(location, 8, payload[8:]).status_code, 204)
+
+        session = UploadSession.objects.get()
+        self.assertEqual(session.status, 'assembling')
+        tasks.assemble_upload(str(session.pk))
+
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'complete')
+        attached = self.document.files.get()
+        self.assertEqual(attached, session.file)
+        with attached.file.open('rb') as fh:
+            self.assertEqual(fh.read(), payload)
+
+    def test_chunk_is_received_before_the_session_is_locked(self):
+        session = uploads.create_session(self.user, 'scan.pdf', 8)
+
+        class RacedStream(io.BytesIO):
+            # The same chunk lands through another request while this body arrives
+            def read(self, size=-1):
+                UploadSession.objects.filter(pk=session.pk).update(offset=4)
+                return super().read(size)
+
+        with self.assertRaises(uploads.UploadError) as raised:
+            uploads.write_chunk(session.pk, 0, RacedStream(b'0123'), 4)
+        self.assertEqual(raised.exception.status, 409)
+        self.assertFalse(default_storage.exists(session.part_name(0)))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class DocumentZipDownloadTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.member = user_model.objects.create_user(
+            email='member@example.com', password='testpass123',
+            title='Mr.', other_name='Yaw', surname='Asante', gender='Male',
+        )
+        self.member.groups.add(Group.objects.create(name='Member'))
+        self.client.login(email='member@example.com', password='testpass123')
+
+    def _document_with_files(self, visibility):
+        document = Document.objects.create(
+            category='internal', title='Minutes 2024', sender='A', receiver='B', visibility=visibility
+        )
+        for name, content in (('minutes.pdf', b'%PDF-1.4 minutes'), ('minutes.pdf', b'second copy')):
+            document.files.add(File.objects.create(file=SimpleUploadedFile(name, content)))
+        return document
+
+    def test_streams_zip_with_exact_length(self):
+        document = self._document_with_files('selected_groups')
+        document.visible_to_groups.add(*self.member.groups.all())
+
+        response = self.client.get(reverse('dashboard:download_document', args=[document.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(body))
+        archive = zipfile.ZipFile(io.BytesIO(body))
+        self.assertEqual(
+            sorted(archive.read(name) for name in archive.namelist()),
+            [b'%PDF-1.4 minutes', b'second copy'],
+        )
+        self.assertIsNone(archive.testzip())
+
+    def test_no_length_for_members_zipfile_writes_as_zip64(self):
+        def entry(size):
+            return zipstream.ZipEntry(name='scan.pdf', storage=default_storage, path='scan.pdf', size=size)
+
+        self.assertIsNotNone(zipstream.content_length([entry(1024 ** 3)]))
+        # Below ZIP64_LIMIT, but zipfile already adds zip64 extras
+        self.assertIsNone(zipstream.content_length([entry(zipfile.ZIP64_LIMIT - 1024 ** 2)]))
+
+    def test_hidden_document_is_not_downloadable(self):
+        document = self._document_with_files('selected_groups')
+        response = self.client.get(reverse('dashboard:download_document', args=[document.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class FileDeduplicationTests(TestCase):
+    def _document(self, title):
+        return Document.objects.create(category='internal', title=title, sender='A', receiver='B')
+
+    def test_repeat_upload_reuses_blob_and_counts_references(self):
+        first, created_first = File.objects.from_upload(SimpleUploadedFile('memo.pdf', b'same memo'))
+        second, created_second = File.objects.from_upload(SimpleUploadedFile('memo-copy.pdf', b'same memo'))
+
+        self.assertTrue(created_first)
+        self.assertFalse(created_second)
+        self.assertEqual(first.pk, second.pk)
+
+        memo_a, memo_b = self._document('A'), self._document('B')
+        memo_a.files.add(first)
+        memo_b.files.add(second)
+        first.refresh_from_db()
+        self.assertEqual(first.ref_count, 2)
+
+        memo_a.files.remove(first)
+        memo_b.delete()
+        first.refresh_from_db()
+        self.assertEqual(first.ref_count, 0)
+
+    def test_gc_deletes_unreferenced_blobs_only(self):
+        kept, _ = File.objects.from_upload(SimpleUploadedFile('kept.pdf', b'kept'))
+        orphan, _ = File.objects.from_upload(SimpleUploadedFile('orphan.pdf', b'orphan'))
+        self._document('Kept').files.add(kept)
+        orphan_path = orphan.file.path
+
+        call_command('gc_document_files', grace_hours=0, stdout=io.StringIO())
+
+        self.assertTrue(File.objects.filter(pk=kept.pk).exists())
+        self.assertFalse(File.objects.filter(pk=orphan.pk).exists())
+        self.assertFalse(os.path.exists(orphan_path))
+
+    def test_removing_a_file_detaches_it_from_one_document_only(self):
+        shared, _ = File.objects.from_upload(SimpleUploadedFile('memo.pdf', b'same memo'))
+        memo_a, memo_b = self._document('A'), self._document('B')
+        memo_a.files.add(shared)
+        memo_b.files.add(shared)
+        url = reverse('dashboard:delete_file')
+
+        get_user_model().objects.create_user(
+            email='member@example.com', password='testpass123',
+            title='Mr.', other_name='Yaw', surname='Asante', gender='Male',
+        )
+        self.client.login(email='member@example.com', password='testpass123')
+        self.assertEqual(self.client.post(url, {'file_id': shared.pk, 'document_id': memo_a.pk}).status_code, 403)
+
+        secretary = get_user_model().objects.create_user(
+            email='secretary@example.com', password='testpass123',
+            title='Dr.', other_name='Kofi', surname='Boateng', gender='Male', executive_position='Secretary',
+        )
+        self.client.force_login(secretary)
+        self.assertEqual(self.client.post(url, {'file_id': shared.pk}).status_code, 400)
+        self.assertTrue(self.client.post(url, {'file_id': shared.pk, 'document_id': memo_a.pk}).json()['success'])
+        self.assertFalse(memo_a.files.exists())
+        self.assertEqual(list(memo_b.files.all()), [shared])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class DocumentPreviewTests(TestCase):
+    def setUp(self):
+        self.member = get_user_model().objects.create_user(
+            email='member@example.com', password='testpass123',
+            title='Mrs.', other_name='Efua', surname='Boateng', gender='Female',
+        )
+        self.member.groups.add(Group.objects.create(name='Member'))
+        self.client.login(email='member@example.com', password='testpass123')
+
+    def _rendered_file(self, visibility='selected_groups'):
+        document = Document.objects.create(
+            category='internal', title='Circular', sender='A', receiver='B', visibility=visibility
+        )
+        file_obj = File.objects.create(file=SimpleUploadedFile('circular.pdf', b'%PDF-1.4 circular'))
+        document.files.add(file_obj)
+        default_storage.save(previews.preview_name(file_obj.pk, 1), ContentFile(b'RIFF....WEBP'))
+        File.objects.filter(pk=file_obj.pk).update(preview_pages=1)
+        return document, file_obj
+
+    def test_serves_rendered_page_with_long_cache(self):
+        document, file_obj = self._rendered_file()
+        document.visible_to_groups.add(*self.member.groups.all())
+
+        response = self.client.get(reverse('dashboard:document_file_preview', args=[document.pk, file_obj.pk, 1]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content), b'RIFF....WEBP')
+
+    def test_missing_page_and_hidden_document_are_404(self):
+        document, file_obj = self._rendered_file()
+        url = reverse('dashboard:document_file_preview', args=[document.pk, file_obj.pk, 1])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        document.visible_to_groups.add(*self.member.groups.all())
+        url = reverse('dashboard:document_file_preview', args=[document.pk, file_obj.pk, 2])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_deleting_file_removes_previews(self):
+        _, file_obj = self._rendered_file()
+        name = previews.preview_name(file_obj.pk, 1)
+        self.assertTrue(default_storage.exists(name))
+        file_obj.delete()
+        self.assertFalse(default_storage.exists(name))
+
+    def test_pdf_is_rendered_from_a_path_not_memory(self):
+        _, file_obj = self._rendered_file()
+        with previews._local_path(file_obj.file) as path:
+            self.assertEqual(path, file_obj.file.path)
+
+        # Storage without local paths is spooled to a temporary file
+        no_path = mock.PropertyMock(side_effect=NotImplementedError)
+        with mock.patch.object(type(file_obj.file), 'path', no_path):
+            with previews._local_path(file_obj.file) as path:
+                self.assertNotEqual(path, file_obj.file.name)
+                with open(path, 'rb') as fh:
+                    self.assertEqual(fh.read(), b'%PDF-1.4 circular')
+        self.assertFalse(os.path.exists(path))
+
+
+class EventStatusTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='secretary@example.com', password='testpass123',
+            title='Prof.', other_name='Kofi', surname='Owusu', gender='Male',
+        )
+        self.now = timezone.now()
+
+    def _event(self, start, end, **kwargs):
+        return Event.objects.create(
+            title='Congress', short_description='Annual congress', description='<p>Congress</p>',
+            created_by=self.user, start_date=start.date(), start_time=start.time(),
+            end_date=end.date(), end_time=end.time(), **kwargs
+        )
+
+    def test_window_is_stored_on_save(self):
+        event = Event.objects.create(
+            title='Retreat', short_description='Retreat', description='<p>Retreat</p>',
+            created_by=self.user, start_date=datetime.date(2030, 5, 1),
+        )
+        self.assertEqual(event.starts_at, timezone.make_aware(datetime.datetime(2030, 5, 1, 0, 0)))
+        self.assertEqual(event.ends_at, timezone.make_aware(datetime.datetime(2030, 5, 1, 23, 59, 59)))
+        self.assertEqual(event.status, 'upcoming')
+
+    def test_refresh_statuses_uses_bulk_updates(self):
+        hour = datetime.timedelta(hours=1)
+        starting = self._event(self.now + hour, self.now + 3 * hour)
+        finishing = self._event(self.now + hour, self.now + 2 * hour)
+        cancelled = self._event(self.now + hour, self.now + 2 * hour, status='cancelled')
+
+        later = self.now + 2.5 * hour
+        with self.assertNumQueries(2):
+            started, completed = Event.objects.refresh_statuses(later)
+
+        self.assertEqual((started, completed), (1, 1))
+        statuses = dict(Event.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[starting.pk], 'ongoing')
+        self.assertEqual(statuses[finishing.pk], 'completed')
+        self.assertEqual(statuses[cancelled.pk], 'cancelled')
+
+    def test_period_filters(self):
+        day = datetime.timedelta(days=1)
+        past = self._event(self.now - 3 * day, self.now - 2 * day)
+        ongoing = self._event(self.now - day, self.now + day)
+        upcoming = self._event(self.now + day, self.now + 2 * day)
+
+        self.assertEqual(list(Event.objects.past().values_list('pk', flat=True)), [past.pk])
+        self.assertEqual(list(Event.objects.ongoing().values_list('pk', flat=True)), [ongoing.pk])
+        self.assertEqual(list(Event.objects.upcoming().values_list('pk', flat=True)), [upcoming.pk])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class EventCalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='pro@example.com', password='testpass123',
+            title='Dr.', other_name='Akua', surname='Darko', gender='Female',
+        )
+        self.tag = Tag.objects.create(name='Congress')
+
+    def _event(self, title, day, **kwargs):
+        return Event.objects.create(
+            title=title, short_description='Details; see site', description='<p>x</p>',
+            created_by=self.user, start_date=day, is_published=True, **kwargs
+        )
+
+    def test_range_returns_overlapping_events_only(self):
+        inside = self._event('Inside', datetime.date(2031, 3, 10), start_time=datetime.time(9, 0))
+        self._event('Outside', datetime.date(2031, 5, 1))
+
+        response = self.client.get(reverse('website:events_calendar'), {'start': '2031-03-01', 'end': '2031-04-01'})
+
+        self.assertEqual(response.status_code, 200)
+        events = response.json()['events']
+        self.assertEqual([e['id'] for e in events], [inside.pk])
+        self.assertFalse(events[0]['allDay'])
+        self.assertEqual(self.client.get(reverse('website:events_calendar'), {'start': 'x'}).status_code, 400)
+
+    def test_feed_answers_304_until_events_change(self):
+        event = self._event('Congress, 2031', datetime.date(2031, 3, 10))
+        event.tags.add(self.tag)
+        url = reverse('website:events_tag_feed', args=[self.tag.slug])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('SUMMARY:Congress\\, 2031', body)
+        self.assertIn('DTSTART;VALUE=DATE:20310310', body)
+        self.assertIn('DTEND;VALUE=DATE:20310311', body)
+
+        # The tag lookup and the feed aggregate
+        with self.assertNumQueries(2):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        event.tags.remove(self.tag)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+        missing = reverse('website:events_tag_feed', args=['no-such-tag'])
+        self.assertEqual(self.client.get(missing, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 404)
+
+    def test_feed_last_modified_moves_when_an_event_is_deleted(self):
+        event = self._event('Retreat', datetime.date(2031, 3, 10))
+        url = reverse('website:events_feed')
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        # Last-Modified has one-second resolution
+        with mock.patch('time.time_ns', return_value=time.time_ns() + 2 * 10 ** 9):
+            event.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Retreat', response.content.decode())
+
+
+class EventRegistrationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='organiser@example.com', password='testpass123',
+            title='Dr.', other_name='Yaa', surname='Asantewaa', gender='Female',
+        )
+        self.event = Event.objects.create(
+            title='Delegates Congress', short_description='Congress', description='<p>Congress</p>',
+            created_by=self.user, start_date=timezone.now().date() + datetime.timedelta(days=30),
+            is_published=True, registration_required=True, max_participants=2,
+        )
+
+    def test_capacity_is_enforced_and_overflow_waitlisted(self):
+        statuses = [
+            registrations.register(self.event, f'Member {i}', f'm{i}@example.com')[0].status
+            for i in range(3)
+        ]
+        self.assertEqual(statuses, ['confirmed', 'confirmed', 'waitlisted'])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 2)
+        self.assertEqual(self.event.seats_left, 0)
+
+    def test_resubmission_is_idempotent(self):
+        first, created = registrations.register(self.event, 'Kwame', 'Kwame@Example.com')
+        again, created_again = registrations.register(self.event, 'Kwame', 'kwame@example.com ')
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(first.pk, again.pk)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_cancel_promotes_oldest_waitlisted(self):
+        confirmed = [registrations.register(self.event, 'A', f'a{i}@example.com')[0] for i in range(2)]
+        waiting, _ = registrations.register(self.event, 'B', 'b@example.com')
+
+        promoted = registrations.cancel(confirmed[0])
+
+        self.assertEqual(promoted.pk, waiting.pk)
+        self.assertEqual(EventRegistration.objects.get(pk=waiting.pk).status, 'confirmed')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 2)
+
+        registrations.cancel(confirmed[1])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_cancelled_attendee_can_register_again(self):
+        first, _ = registrations.register(self.event, 'Kwame', 'kwame@example.com')
+        registrations.cancel(first)
+
+        again, created = registrations.register(self.event, 'Kwame Mensah', 'kwame@example.com')
+
+        self.assertTrue(created)
+        self.assertEqual(again.pk, first.pk)
+        self.assertEqual(again.status, 'confirmed')
+        self.assertEqual(EventRegistration.objects.get(pk=first.pk).name, 'Kwame Mensah')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_raising_capacity_promotes_the_waitlist(self):
+        for i in range(4):
+            registrations.register(self.event, 'A', f'a{i}@example.com')
+
+        # self.event still holds seats_taken=0 from before the sign-ups
+        self.event.max_participants = 3
+        self.event.save()
+
+        statuses = list(
+            EventRegistration.objects.filter(event=self.event).order_by('created_at', 'pk').values_list('status', flat=True)
+        )
+        self.assertEqual(statuses, ['confirmed', 'confirmed', 'confirmed', 'waitlisted'])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 3)
+
+    def test_saving_a_stale_event_keeps_the_claimed_seats(self):
+        stale = Event.objects.get(pk=self.event.pk)
+        for i in range(3):
+            registrations.register(self.event, 'A', f'a{i}@example.com')
+
+        stale.title = 'Delegates Congress 2026'
+        stale.save()
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.title, 'Delegates Congress 2026')
+        self.assertEqual(stale.seats_taken, 2)
+        self.assertEqual(EventRegistration.objects.filter(event=self.event, status='confirmed').count(), 2)
+        self.assertEqual(registrations.register(self.event, 'B', 'b@example.com')[0].status, 'waitlisted')
+
+    def test_registration_view(self):
+        url = reverse('website:event_register', kwargs={'slug': self.event.event_slug})
+        response = self.client.post(url, {'name': 'Esi', 'email': 'esi@example.com', 'department': 'Physics'})
+        self.assertRedirects(
+            response, reverse('website:events_detail', kwargs={'slug': self.event.event_slug}),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(EventRegistration.objects.get(email='esi@example.com').status, 'confirmed')
+
+        self.event.registration_required = False
+        self.event.save()
+        with self.assertRaises(registrations.RegistrationClosed):
+            registrations.register(self.event, 'Late', 'late@example.com')
+
+
+class EventReminderTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.members = [
+            user_model.objects.create_user(
+                email=f'member{i}@example.com', password='testpass123',
+                title='Dr.', other_name=f'Member{i}', surname='Tetteh', gender='Male',
+            )
+            for i in range(5)
+        ]
+        starts = timezone.now() + datetime.timedelta(hours=12)
+        self.event = Event.objects.create(
+            title='General Meeting', short_description='Meeting', description='<p>Meeting</p>',
+            created_by=self.members[0], start_date=starts.date(), start_time=starts.time(),
+            is_published=True,
+        )
+
+    def test_default_schedule_follows_event_start(self):
+        offsets = sorted(r.offset for r in self.event.reminders.all())
+        self.assertEqual(offsets, [datetime.timedelta(hours=1), datetime.timedelta(hours=24)])
+
+        self.event.start_date += datetime.timedelta(days=7)
+        self.event.save()
+        reminder = self.event.reminders.get(offset=datetime.timedelta(hours=1))
+        self.assertEqual(reminder.send_at, self.event.starts_at - datetime.timedelta(hours=1))
+
+    def test_sends_in_batches_once(self):
+        due = list(reminders.due_reminders())
+        self.assertEqual([r.offset for r in due], [datetime.timedelta(hours=24)])
+
+        sent = reminders.send_reminder(due[0].pk, batch_size=2)
+
+        self.assertEqual(sent, 5)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(u.email for u in self.members))
+        reminder = EventReminder.objects.get(pk=due[0].pk)
+        self.assertIsNotNone(reminder.sent_at)
+        self.assertEqual(reminder.sent_count, 5)
+
+        # A retry or a second sweep never mails anyone again
+        self.assertEqual(reminders.send_reminder(due[0].pk, batch_size=2), 0)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(reminders.due_reminders().exists())
+
+    def test_deactivated_members_are_not_reminded(self):
+        self.members[1].set_unusable_password()
+        self.members[1].save()
+        reminder = self.event.reminders.get(offset=datetime.timedelta(hours=24))
+        self.assertNotIn(self.members[1].email, [email for _, email in reminders.recipients(reminder)])
+
+    def test_resumes_after_claimed_batches(self):
+        reminder = self.event.reminders.get(offset=datetime.timedelta(hours=24))
+        EventReminder.objects.filter(pk=reminder.pk).update(last_recipient_id=self.members[2].pk)
+
+        self.assertEqual(reminders.send_reminder(reminder.pk), 2)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['member3@example.com', 'member4@example.com'])
+
+    def test_cancelled_event_is_skipped(self):
+        self.event.status = 'cancelled'
+        self.event.save()
+        reminder = self.event.reminders.get(offset=datetime.timedelta(hours=24))
+        self.assertEqual(reminders.send_reminder(reminder.pk), 0)
+        self.assertEqual(mail.outbox, [])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ContentImportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='archivist@example.com', password='testpass123',
+            title='Mr.', other_name='Kojo', surname='Annan', gender='Male',
+        )
+
+    def test_slugs_allocated_in_one_query(self):
+        News.objects.create(title='General Meeting', content='x', author=self.user)
+        News.objects.create(title='General Meeting', content='x', author=self.user)
+
+        with self.assertNumQueries(1):
+            slugs = allocate_slugs(News, 'news_slug', ['General Meeting', 'General Meeting', 'Budget'])
+
+        self.assertEqual(slugs, ['general-meeting-2', 'general-meeting-3', 'budget'])
+
+    def test_imports_csv_with_tags_images_and_dates(self):
+        workdir = tempfile.mkdtemp()
+        with open(os.path.join(workdir, 'cover.jpg'), 'wb') as fh:
+            fh.write(b'jpeg bytes')
+        path = os.path.join(workdir, 'news.csv')
+        with open(path, 'w', newline='') as fh:
+            fh.write('title,content,tags,is_published,created_at,featured_image\n')
+            fh.write('Strike called off,<p>Done</p>,"Strike, Welfare",yes,2019-03-01,cover.jpg\n')
+            fh.write('Strike called off,<p>Again</p>,Strike,no,,\n')
+
+        call_command('import_content', path, model='news', user=self.user.email,
+                     images_dir=workdir, stdout=io.StringIO())
+
+        first, second = News.objects.order_by('pk')
+        self.assertEqual((first.news_slug, second.news_slug), ('strike-called-off', 'strike-called-off-1'))
+        self.assertEqual(first.created_at.date(), datetime.date(2019, 3, 1))
+        self.assertTrue(first.is_published)
+        self.assertEqual(sorted(first.tags.values_list('slug', flat=True)), ['strike', 'welfare'])
+        self.assertEqual(list(second.tags.values_list('name', flat=True)), ['Strike'])
+        with first.featured_image.open('rb') as fh:
+            self.assertEqual(fh.read(), b'jpeg bytes')
+
+    def test_new_tags_with_colliding_slugs_are_kept(self):
+        Tag.objects.create(name='C')
+        path = os.path.join(tempfile.mkdtemp(), 'news.json')
+        with open(path, 'w') as fh:
+            json.dump([{'title': 'Languages', 'content': '<p>x</p>', 'tags': ['C', 'C++', 'C#']}], fh)
+
+        call_command('import_content', path, model='news', user=self.user.email, stdout=io.StringIO())
+
+        tags = News.objects.get().tags.order_by('slug')
+        self.assertEqual(list(tags.values_list('name', 'slug')), [('C', 'c'), ('C#', 'c-1'), ('C++', 'c-2')])
+
+    def test_imports_events_with_schedule(self):
+        path = os.path.join(tempfile.mkdtemp(), 'events.json')
+        with open(path, 'w') as fh:
+            json.dump([{'title': 'Congress', 'short_description': 'Annual', 'description': '<p>x</p>',
+                        'start_date': '2018-06-01', 'start_time': '09:00', 'is_published': True}], fh)
+
+        call_command('import_content', path, model='event', user=self.user.email, stdout=io.StringIO())
+
+        event = Event.objects.get()
+        self.assertEqual(event.status, 'completed')
+        self.assertEqual(event.starts_at, timezone.make_aware(datetime.datetime(2018, 6, 1, 9, 0)))
+
+
+class ContentExcerptTests(TestCase):
+    def setUp(self):
+        self.user = create_editor()
+
+    def test_excerpt_and_reading_time_computed_on_save(self):
+        body = '<h2>Budget</h2><p>Fees &amp; levies</p>' + '<p>word</p>' * 400
+        news = News.objects.create(title='Budget', content=body, author=self.user)
+
+        self.assertTrue(news.excerpt.startswith('Budget Fees & levies word'))
+        self.assertLessEqual(len(news.excerpt), 300)
+        self.assertEqual(news.reading_time, 3)
+
+    def test_backfill_fills_rows_without_excerpt(self):
+        News.objects.bulk_create([
+            News(title='Old', news_slug='old', content='<p>Archived <b>story</b></p>', author=self.user),
+        ])
+
+        call_command('backfill_excerpts', stdout=io.StringIO())
+
+        self.assertEqual(News.objects.get().excerpt, 'Archived story')
+
+
+class RelatedItemsTests(TestCase):
+    def setUp(self):
+        self.user = create_editor()
+        self.strike, self.welfare, self.fees = (
+            Tag.objects.create(name=name) for name in ('Strike', 'Welfare', 'Fees')
+        )
+
+    def news(self, title, *tags):
+        item = News.objects.create(title=title, content='<p>x</p>', author=self.user, is_published=True)
+        with self.captureOnCommitCallbacks():
+            item.tags.set(tags)
+        return item
+
+    def test_ranked_by_shared_tags_then_recency(self):
+        source = self.news('Strike update', self.strike, self.welfare)
+        older_two = self.news('Welfare strike', self.strike, self.welfare)
+        one = self.news('Strike notice', self.strike)
+        newer_one = self.news('Welfare fund', self.welfare)
+        self.news('Fee review', self.fees)
+        related.rebuild_all('news')
+
+        with self.assertNumQueries(1):
+            items = related.related_to(source)
+        self.assertEqual(items, [older_two, newer_one, one])
+
+    def test_tag_change_refreshes_affected_lists(self):
+        source = self.news('Strike update', self.strike)
+        other = self.news('Fee review', self.fees)
+        related.rebuild_all('news')
+        self.assertEqual(related.related_to(source), [])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            other.tags.add(self.strike)
+        # One refresh of the related lists, one of the search entry
+        self.assertEqual(len(callbacks), 2)
+        related.refresh('news', other.pk)
+        self.assertEqual(related.related_to(source), [other])
+
+        other.tags.remove(self.strike)
+        related.refresh('news', other.pk)
+        self.assertEqual(related.related_to(source), [])
+
+    def test_unpublished_targets_are_hidden(self):
+        source = self.news('Strike update', self.strike)
+        hidden = self.news('Draft', self.strike)
+        related.rebuild_all('news')
+        News.objects.filter(pk=hidden.pk).update(is_published=False)
+        self.assertEqual(related.related_to(source), [])
@@ -0,0 +1,212 @@
+"""Resumable chunked uploads for document files.
+
+The protocol follows tus (https://tus.io) closely: a client creates an
+upload with its total length, sends the bytes in ``PATCH`` requests that
+carry ``Upload-Offset`` and an optional ``Upload-Checksum``, and can ask for
+the current offset with ``HEAD`` after a dropped connection. Every chunk is
+written to storage as its own part so any storage backend works; the parts
+are concatenated by a Celery task once the last byte has arrived.
+"""
+import base64
+import hashlib
+import logging
+import tempfile
+
+from django.conf import settings
+from django.core.files import File as DjangoFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from dashboard.models import Document, File, UploadSession
+from utag_ug_archiver.utils.tasks import enqueue
+
+logger = logging.getLogger(__name__)
+
+TUS_VERSION = '1.0.0'
+READ_BLOCK_SIZE = 64 * 1024
+# Keep chunks in memory up to this size before spooling them to disk
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+
+class UploadError(Exception):
+    """Raised for a rejected chunk; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_metadata(header):
+    """Decode a tus ``Upload-Metadata`` header into a dict of strings."""
+    metadata = {}
+    for pair in (header or '').split(','):
+        pair = pair.strip()
+        if not pair:
+            continue
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value).decode('utf-8') if value else ''
+        except (ValueError, UnicodeDecodeError):
+            raise UploadError(f'Invalid metadata value for {key}')
+    return metadata
+
+
+def parse_checksum(header):
+    """Return the expected SHA-256 digest from ``Upload-Checksum: sha256 <b64>``."""
+    if not header:
+        return None
+    algorithm, _, value = header.strip().partition(' ')
+    if algorithm.lower() != 'sha256':
+        raise UploadError('Unsupported checksum algorithm', status=400)
+    try:
+        return base64.b64decode(value)
+    except ValueError:
+        raise UploadError('Invalid checksum value')
+
+
+def create_session(user, filename, size, document=None, checksum=''):
+    max_size = settings.DOCUMENT_UPLOAD_MAX_SIZE
+    if size <= 0:
+        raise UploadError('Upload-Length must be positive')
+    if size > max_size:
+        raise UploadError(f'File too large. Maximum size is {max_size // (1024 * 1024)}MB.', status=413)
+    return UploadSession.objects.create(
+        created_by=user,
+        document=document,
+        filename=filename[:255] or 'upload',
+        size=size,
+        checksum=(checksum or '').lower(),
+    )
+
+
+def _check_offset(session, offset, length):
+    if session.status != 'uploading':
+        raise UploadError('Upload is already finished', status=409)
+    if offset != session.offset:
+        raise UploadError('Upload-Offset does not match the current offset', status=409)
+    if offset + length > session.size:
+        raise UploadError('Chunk exceeds Upload-Length', status=413)
+
+
+def write_chunk(session_id, offset, stream, length, expected_digest=None):
+    """Store one chunk read from ``stream`` and advance the session offset.
+
+    The chunk is received into a local buffer first; the session row is only
+    locked afterwards, to re-check the offset, store the part and advance it,
+    so a slow client never holds a transaction open. Two retries of the same
+    chunk still cannot both advance the offset.
+    """
+    if length > settings.DOCUMENT_UPLOAD_CHUNK_SIZE:
+        raise UploadError('Chunk too large', status=413)
+    # Reject a stale offset before reading the body
+    _check_offset(UploadSession.objects.get(pk=session_id), offset, length)
+
+    digest = hashlib.sha256()
+    received = 0
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buffer:
+        while received < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - received))
+            if not block:
+                break
+            digest.update(block)
+            buffer.write(block)
+            received += len(block)
+
+        if received != length:
+            raise UploadError('Connection closed before the chunk was complete', status=400)
+        if expected_digest is not None and digest.digest() != expected_digest:
+            # tus "Checksum Mismatch"
+            raise UploadError('Checksum mismatch', status=460)
+
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session_id)
+            # Another request may have stored this chunk while we were receiving it
+            _check_offset(session, offset, length)
+
+            part_name = session.part_name(offset)
+            if default_storage.exists(part_name):
+                # Left over from an attempt that never advanced the offset
+                default_storage.delete(part_name)
+            buffer.seek(0)
+            default_storage.save(part_name, DjangoFile(buffer))
+
+            session.offset = offset + received
+            if session.is_finished:
+                session.status = 'assembling'
+            session.save(update_fields=['offset', 'status', 'updated_at'])
+
+    if session.status == 'assembling':
+        from dashboard.tasks import assemble_upload
+        enqueue(assemble_upload, str(session.pk))
+    return session
+
+
+def _part_names(session):
+    try:
+        _, files = default_storage.listdir(session.parts_dir)
+    except FileNotFoundError:
+        return []
+    return [f'{session.parts_dir}/{name}' for name in sorted(files) if name.endswith('.part')]
+
+
+def delete_parts(session):
+    for name in _part_names(session):
+        default_storage.delete(name)
+
+
+def assemble(session):
+    """Concatenate the stored parts into a ``File`` and attach it to the document."""
+    digest = hashlib.sha256()
+    with tempfile.TemporaryFile() as assembled:
+        for name in _part_names(session):
+            with default_storage.open(name, 'rb') as part:
+                for block in iter(lambda: part.read(READ_BLOCK_SIZE), b''):
+                    digest.update(block)
+                    assembled.write(block)
+
+        if assembled.tell() != session.size:
+            raise UploadError(f'Assembled {assembled.tell()} bytes, expected {session.size}')
+        if session.checksum and digest.hexdigest() != session.checksum:
+            raise UploadError('Checksum mismatch for the assembled file', status=460)
+
+        assembled.seek(0)
+        new_file, _ = File.objects.from_upload(
+            DjangoFile(assembled, name=session.filename), sha256=digest.hexdigest()
+        )
+
+    UploadSession.objects.filter(pk=session.pk).update(
+        file=new_file, status='complete', error='', updated_at=timezone.now()
+    )
+    delete_parts(session)
+
+    # The document may have been linked while we were assembling
+    document_id = UploadSession.objects.filter(pk=session.pk).values_list('document_id', flat=True).first()
+    if document_id:
+        Document.objects.get(pk=document_id).files.add(new_file)
+    return new_file
+
+
+def attach_uploads(document, upload_ids, user):
+    """Link the user's uploads to ``document``; finished ones are attached now."""
+    if not upload_ids:
+        return
+    sessions = UploadSession.objects.filter(pk__in=upload_ids, created_by=user)
+    sessions.filter(document__isnull=True).update(document=document)
+    finished = File.objects.filter(
+        pk__in=sessions.filter(document=document, file__isnull=False).values('file_id')
+    )
+    if finished:
+        document.files.add(*finished)
+
+
+def expire_sessions(max_age):
+    """Delete unfinished uploads untouched for longer than ``max_age``."""
+    cutoff = timezone.now() - max_age
+    stale = UploadSession.objects.filter(updated_at__lt=cutoff).exclude(status='complete')
+    count = 0
+    for session in stale.iterator():
+        delete_parts(session)
+        session.delete()
+        count += 1
+    return count
@@ -54,19 +54,27 @@ urlpatterns += [
     path('galleries/', views.GalleryListView.as_view(), name='gallery'),
     path('galleries/add/', views.GalleryCreateView.as_view(), name='gallery_add'),
     path('galleries/upload-images/', views.ImageUploadView.as_view(), name='gallery_upload_images'),
+    path('galleries/bulk-upload/', views.BulkImageUploadView.as_view(), name='gallery_bulk_upload'),
+    path('galleries/bulk-upload/<uuid:upload_id>/', views.BulkUploadStatusView.as_view(), name='gallery_bulk_upload_status'),
     path('galleries/delete/<int:gallery_id>/', views.DeleteGalleryView.as_view(), name='gallery_delete'),
     path('galleries/edit/<int:gallery_id>/', views.EditGalleryView.as_view(), name='gallery_edit'),
     path('galleries/view/<int:gallery_id>/', views.ViewGalleryDetails.as_view(), name='gallery_view'),
+    path('galleries/download/<int:gallery_id>/', views.GalleryDownloadView.as_view(), name='gallery_download'),
     path('images/delete/<int:image_id>/', views.DeleteImageView.as_view(), name='image_delete'),
 ]
 
 #For Document management
 urlpatterns += [
     path('documents/',views.DocumentsView.as_view(), name='documents'),
+    path('documents/search/',views.DocumentSearchView.as_view(), name='search_documents'),
     path('documents/create',views.DocumentCreateUpdateView.as_view(), name='create_document'),
     path('documents/update/<int:document_id>',views.DocumentCreateUpdateView.as_view(), name='update_document'),
     path('documents/delete_file/',views.DeleteFileView.as_view(), name='delete_file'),
     path('documents/delete/<int:document_id>',views.DeleteDocumentView.as_view(), name='delete_document'),
+    path('documents/download/<int:document_id>',views.DocumentDownloadAllView.as_view(), name='download_document'),
+    path('documents/<int:document_id>/files/<int:file_id>/preview/<int:page>',views.DocumentFilePreviewView.as_view(), name='document_file_preview'),
+    path('documents/uploads/',views.DocumentUploadCreateView.as_view(), name='create_document_upload'),
+    path('documents/uploads/<uuid:upload_id>',views.DocumentUploadView.as_view(), name='document_upload'),
    
 ]
 
@@ -5,6 +5,7 @@ from .dashboard import *
 from .events import *
 from .executives import *
 from .files import *
+from .uploads import *
 from .news import *
 from .gallery import *
 from .profile import *
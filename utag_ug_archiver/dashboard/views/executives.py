@@ -11,10 +11,9 @@ from django.http import HttpResponseRedirect
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from accounts.models import User, School, College, Department
 from dashboard.models import Announcement, Notification
-from utag_ug_archiver.utils.constants import executive_committee_members_position_order
-from utag_ug_archiver.utils.functions import executive_members_custom_order
 from django.contrib.auth.models import Group
 from utag_ug_archiver.utils.decorators import MustLogin
+from website.executives import committee_members
 
 
 def _parse_date(value):
@@ -34,10 +33,8 @@ class ExecutiveMembersView(PermissionRequiredMixin,View):
     permission_required = 'accounts.view_dashboard'
     @method_decorator(MustLogin)
     def get(self, request):
-        # Get all executive officers
-        executive_officers = User.objects.filter(executive_position__in=executive_committee_members_position_order, is_active_executive=True)
-        # Sort the executive officers based on the custom order
-        executive_officers = sorted(executive_officers, key=lambda x: executive_committee_members_position_order.index(x.executive_position) if x.executive_position in executive_committee_members_position_order else len(executive_committee_members_position_order))
+        # Get all executive officers, in position order (cached roster)
+        executive_officers = committee_members()
 
         # Get all members
         members = User.objects.all()
@@ -1,22 +1,23 @@
 from django.contrib.auth.hashers import make_password
+from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.contrib import messages
-from django.http import HttpResponseRedirect, JsonResponse
+from django.http import FileResponse, Http404, HttpResponseRedirect, JsonResponse
 from django.contrib.auth.models import Group
 from django.db.models import Q
-from django.core.cache import cache
-import os
-
-# use requests if available for quick HEAD checks, otherwise fall back to urllib
-try:
-    import requests
-except Exception:
-    requests = None
+from django.conf import settings
+from django.core.files.storage import default_storage
+
 from dashboard.models import Announcement, Document, File, Notification
+from dashboard.previews import preview_name
+from dashboard.search import search_documents
+from dashboard.uploads import attach_uploads
+from dashboard.views.uploads import valid_upload_ids
 
 from utag_ug_archiver.utils.decorators import MustLogin
+from utag_ug_archiver.utils.zipstream import entry_for, zip_response
 
 #For File Management
 class DocumentsView(View):
@@ -25,7 +26,7 @@ class DocumentsView(View):
     @method_decorator(MustLogin)
     def get(self, request):
         # Get documents based on user role/group and public visibility
-        documents = self.get_documents(request.user)
+        documents = self.get_documents(request.user).prefetch_related('files')
         
         # Get notifications
         notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:5]
@@ -39,66 +40,6 @@ class DocumentsView(View):
             'has_change_permission': request.user.has_perm('dashboard.change_document') or request.user.executive_position=="Secretary",
             'has_delete_permission': request.user.has_perm('dashboard.delete_document') or request.user.executive_position=="Secretary",
         }
-        # Ensure each File has an absolute URL attribute for previewers
-        PREVIEW_CACHE_TTL = 60 * 60  # 1 hour
-        PREVIEWABLE_EXTS = {'.pdf', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx'}
-
-        def check_url_previewable(url, file_id):
-            """Check whether a given absolute file URL appears publicly previewable.
-
-            Uses a cached result (1 hour TTL) and performs a HEAD request with a
-            very short timeout to avoid slowing page renders. Falls back to
-            urllib if requests isn't available.
-            """
-            cache_key = f"file_previewable:{file_id}"
-            cached = cache.get(cache_key)
-            if cached is not None:
-                return cached
-
-            # Quick safety checks
-            if not url or not url.lower().startswith(('http://', 'https://')):
-                cache.set(cache_key, False, PREVIEW_CACHE_TTL)
-                return False
-
-            try:
-                if requests is not None:
-                    # perform a light HEAD request with short timeout
-                    r = requests.head(url, allow_redirects=True, timeout=2)
-                    ok = (r.status_code >= 200 and r.status_code < 400)
-                else:
-                    # fallback to urllib
-                    from urllib.request import Request, urlopen
-                    req = Request(url, method='HEAD')
-                    resp = urlopen(req, timeout=2)
-                    ok = (200 <= resp.getcode() < 400)
-            except Exception:
-                ok = False
-
-            cache.set(cache_key, ok, PREVIEW_CACHE_TTL)
-            return ok
-
-        for doc in documents:
-            # documents could be a queryset; iterate files for each document
-            for f in getattr(doc, 'files').all():
-                try:
-                    f.absolute_url = request.build_absolute_uri(f.file.url)
-                except Exception:
-                    # If file URL is invalid for any reason, set to relative URL
-                    f.absolute_url = f.file.url if hasattr(f, 'file') else ''
-
-                # Only attempt preview checks for known previewable extensions
-                try:
-                    _, ext = os.path.splitext(getattr(f, 'file').name)
-                    ext = (ext or '').lower()
-                except Exception:
-                    ext = ''
-
-                if ext in PREVIEWABLE_EXTS:
-                    # check and attach boolean flag used by template
-                    f.previewable = check_url_previewable(f.absolute_url, f.id)
-                else:
-                    f.previewable = False
-
         # Explicitly pass request into context to guarantee availability in templates
         context['request'] = request
         return render(request, self.template_name, context)
@@ -114,16 +55,86 @@ class DocumentsView(View):
             return Document.objects.filter(visibility='everyone')
     
     
-class DeleteFileView(View):
+class DocumentSearchView(DocumentsView):
+    template_name = 'dashboard_pages/document_search.html'
+
+    @method_decorator(MustLogin)
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        # Same visibility rules as the documents list
+        results = search_documents(self.get_documents(request.user), query)
+
+        notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:5]
+        notification_count = Notification.objects.filter(user=request.user, status='UNREAD').count()
+
+        context = {
+            'query': query,
+            'results': results,
+            'notifications': notifications,
+            'notification_count': notification_count,
+        }
+        return render(request, self.template_name, context)
+
+
+class DocumentDownloadAllView(DocumentsView):
+    """Stream every file of a document as one ZIP archive."""
+
+    @method_decorator(MustLogin)
+    def get(self, request, document_id):
+        visible = Document.objects.filter(pk__in=self.get_documents(request.user).values('pk'))
+        document = get_object_or_404(visible, pk=document_id)
+        entries = [entry_for(f.file, modified=f.created_at) for f in document.files.all() if f.file]
+        if not entries:
+            messages.warning(request, 'This document has no files to download')
+            return redirect('dashboard:documents')
+        return zip_response(entries, document.title)
+
+
+class DocumentFilePreviewView(DocumentsView):
+    """Serve a rendered preview page of a document file."""
+
+    @method_decorator(MustLogin)
+    def get(self, request, document_id, file_id, page):
+        visible = Document.objects.filter(pk__in=self.get_documents(request.user).values('pk'))
+        document = get_object_or_404(visible, pk=document_id)
+        file_obj = get_object_or_404(document.files.all(), pk=file_id)
+        if not 1 <= page <= file_obj.preview_pages:
+            raise Http404('Preview page not rendered')
+        try:
+            image = default_storage.open(preview_name(file_obj.pk, page), 'rb')
+        except FileNotFoundError:
+            raise Http404('Preview page not rendered')
+
+        response = FileResponse(image, content_type='image/webp')
+        # Files never change content and the URL carries the render time
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        return response
+
+
+class DeleteFileView(PermissionRequiredMixin, View):
+    permission_required = 'dashboard.change_document'
+
+    def has_permission(self):
+        # Secretaries manage documents without the model permission, as in DocumentsView
+        return super().has_permission() or getattr(self.request.user, 'executive_position', None) == "Secretary"
+
+    @method_decorator(MustLogin)
     def post(self, request):
         file_id = request.POST.get('file_id')
+        document_id = request.POST.get('document_id')
+        if not document_id:
+            return JsonResponse({'success': False, 'error': 'Document ID is required'}, status=400)
         try:
-            file_to_delete = File.objects.get(pk=file_id)
-            file_to_delete.delete()
-            return JsonResponse({'success': True})
-        except File.DoesNotExist:
+            document = Document.objects.get(pk=document_id)
+            file_to_delete = document.files.get(pk=file_id)
+        except (Document.DoesNotExist, File.DoesNotExist, ValueError):
             return JsonResponse({'success': False, 'error': 'File not found'})
-        
+
+        # Files are shared between documents with the same content, so only
+        # detach it from this one; unreferenced blobs are removed by gc_document_files
+        document.files.remove(file_to_delete)
+        return JsonResponse({'success': True})
+
 class DeleteDocumentView(View):
     def get(self, request, document_id):
         document = Document.objects.get(pk=document_id)
@@ -145,7 +156,8 @@ class DocumentCreateUpdateView(View):
             'CATEGORY_CHOICES': Document.CATEGORY_CHOICES,
             'DOCUMENT_STATUS_CHOICES': Document.DOCUMENT_STATUS_CHOICES,
             'VISIBILITY_CHOICES': Document.VISIBILITY_CHOICES,
-            'all_groups': Group.objects.all()
+            'all_groups': Group.objects.all(),
+            'upload_chunk_size': settings.DOCUMENT_UPLOAD_CHUNK_SIZE,
         }
         return render(request, self.template_name, context)
 
@@ -174,9 +186,11 @@ class DocumentCreateUpdateView(View):
         files = request.FILES.getlist('files')
         if files:
             for file in files:
-                new_file = File(file=file)
-                new_file.save()
+                # Re-uploads of a known file reuse the stored blob
+                new_file, _ = File.objects.from_upload(file)
                 document.files.add(new_file)
+        # Large files arrive through the resumable upload endpoint instead
+        attach_uploads(document, valid_upload_ids(request.POST.getlist('upload_ids')), request.user)
 
         # Handle visibility and groups
         if document.visibility == 'selected_groups':
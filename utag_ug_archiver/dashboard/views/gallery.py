@@ -1,17 +1,23 @@
 from django.shortcuts import  get_object_or_404, redirect
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.views.generic import ListView, CreateView, DeleteView, View
 from django.utils.decorators import method_decorator
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib import messages
 from django.db.models import Max
-from gallery.models import Gallery, Image
+from gallery import bulk
+from gallery.models import BulkUpload, Gallery, Image
+from gallery.tasks import process_bulk_upload
 from gallery.forms import GalleryForm, ImageUploadForm
 from dashboard.models import Notification
 from utag_ug_archiver.utils.decorators import MustLogin
+from utag_ug_archiver.utils.tasks import enqueue
+from utag_ug_archiver.utils.zipstream import entry_for, zip_response
 import logging
+import os
+import zipfile
 
 logger = logging.getLogger(__name__)
 
@@ -90,12 +96,13 @@ class ImageUploadView(PermissionRequiredMixin, CreateView):
                 image.order = max_order + 1
                 image.save()
                 
-                # Thumbnail and optimization are handled in model's save() method
+                # Thumbnail and optimization run in the background (gallery.tasks)
                 logger.info(f'Image {image.id} uploaded to gallery {gallery.id}')
                 
                 return JsonResponse({
-                    'message': 'Image uploaded and optimized successfully!',
+                    'message': 'Image uploaded successfully! It will be optimized shortly.',
                     'image_id': image.id,
+                    'status': image.status,
                     'thumbnail_url': image.get_thumbnail_url(),
                     'image_url': image.get_absolute_url()
                 }, status=201)
@@ -105,6 +112,55 @@ class ImageUploadView(PermissionRequiredMixin, CreateView):
         else:
             return JsonResponse({'errors': form.errors}, status=400)
 
+class BulkImageUploadView(PermissionRequiredMixin, View):
+    """Accept many images or a ZIP archive at once; rendering runs in the background."""
+    permission_required = 'gallery.add_image'
+
+    @method_decorator(MustLogin)
+    def post(self, request):
+        gallery_id = request.POST.get('gallery_id')
+        if not gallery_id:
+            return JsonResponse({'errors': {'gallery_id': ['Gallery ID is required']}}, status=400)
+        gallery = get_object_or_404(Gallery, id=gallery_id)
+        files = request.FILES.getlist('images')
+        archive = request.FILES.get('archive')
+        if not files and archive is None:
+            return JsonResponse({'errors': {'images': ['Choose images or a ZIP archive to upload']}}, status=400)
+
+        try:
+            upload, image_ids = bulk.ingest(gallery, request.user, bulk.entries(files, archive))
+        except zipfile.BadZipFile:
+            return JsonResponse({'errors': {'archive': ['The archive is not a valid ZIP file']}}, status=400)
+        if image_ids:
+            enqueue(process_bulk_upload, str(upload.pk), image_ids)
+        else:
+            BulkUpload.objects.filter(pk=upload.pk).update(status=BulkUpload.COMPLETE)
+        logger.info(f'Bulk upload {upload.pk}: {len(image_ids)} images for gallery {gallery.id}')
+        return JsonResponse({
+            'message': f'{len(image_ids)} image{"s" if len(image_ids) != 1 else ""} uploaded; optimizing in the background.',
+            'upload_id': str(upload.pk),
+            'total': upload.total,
+            'skipped': upload.skipped,
+            'status_url': reverse('dashboard:gallery_bulk_upload_status', kwargs={'upload_id': upload.pk}),
+        }, status=201)
+
+
+class BulkUploadStatusView(PermissionRequiredMixin, View):
+    """Progress of a bulk upload, polled by the gallery page."""
+    permission_required = 'gallery.add_image'
+
+    @method_decorator(MustLogin)
+    def get(self, request, upload_id):
+        upload = get_object_or_404(BulkUpload, pk=upload_id, created_by=request.user)
+        return JsonResponse({
+            'status': upload.status,
+            'total': upload.total,
+            'processed': upload.processed,
+            'failed': upload.failed,
+            'progress': upload.progress(),
+        })
+
+
 @method_decorator(MustLogin, name='dispatch')
 @method_decorator(csrf_exempt, name='dispatch')
 class DeleteGalleryView(PermissionRequiredMixin, View):
@@ -222,4 +278,23 @@ class ViewGalleryDetails(PermissionRequiredMixin, View):
                 'images': images,
             }
         }
-        return JsonResponse(data, status=200)
\ No newline at end of file
+        return JsonResponse(data, status=200)
+
+class GalleryDownloadView(PermissionRequiredMixin, View):
+    """
+    Stream every image of a gallery as one ZIP archive.
+    """
+    permission_required = 'gallery.view_gallery'
+
+    @method_decorator(MustLogin)
+    def get(self, request, gallery_id):
+        gallery = get_object_or_404(Gallery, id=gallery_id)
+        images = gallery.images.only('id', 'image', 'uploaded_at').order_by('order', '-uploaded_at')
+        entries = [
+            entry_for(image.image, name=f'{index:03d}_{os.path.basename(image.image.name)}', modified=image.uploaded_at)
+            for index, image in enumerate(images, start=1) if image.image
+        ]
+        if not entries:
+            messages.warning(request, 'This gallery has no images to download')
+            return redirect('dashboard:gallery')
+        return zip_response(entries, gallery.title)
@@ -0,0 +1,145 @@
+import uuid
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import View
+
+from dashboard.uploads import (
+    TUS_VERSION, UploadError, create_session, delete_parts, parse_checksum, parse_metadata, write_chunk,
+)
+from dashboard.models import Document, UploadSession
+from utag_ug_archiver.utils.decorators import MustLogin
+
+
+def _can_upload(user):
+    return (
+        user.has_perm('dashboard.add_document')
+        or user.has_perm('dashboard.change_document')
+        or user.executive_position == "Secretary"
+    )
+
+
+def _tus_response(status=204, **headers):
+    response = HttpResponse(status=status)
+    response['Tus-Resumable'] = TUS_VERSION
+    response['Cache-Control'] = 'no-store'
+    for name, value in headers.items():
+        response[name.replace('_', '-')] = str(value)
+    return response
+
+
+def _error_response(error):
+    response = JsonResponse({'error': str(error)}, status=error.status)
+    response['Tus-Resumable'] = TUS_VERSION
+    return response
+
+
+def valid_upload_ids(values):
+    """Drop anything that is not a UUID so lookups never raise."""
+    ids = []
+    for value in values:
+        try:
+            ids.append(uuid.UUID(str(value)))
+        except ValueError:
+            continue
+    return ids
+
+
+@method_decorator(MustLogin, name='dispatch')
+class DocumentUploadCreateView(View):
+    """Create a resumable upload (tus creation extension)."""
+
+    def options(self, request, *args, **kwargs):
+        return _tus_response(
+            Tus_Version=TUS_VERSION,
+            Tus_Extension='creation,checksum,termination',
+            Tus_Checksum_Algorithm='sha256',
+            Tus_Max_Size=settings.DOCUMENT_UPLOAD_MAX_SIZE,
+        )
+
+    def post(self, request):
+        if not _can_upload(request.user):
+            return JsonResponse({'error': 'Permission denied'}, status=403)
+        try:
+            length = int(request.headers.get('Upload-Length', ''))
+            metadata = parse_metadata(request.headers.get('Upload-Metadata'))
+        except ValueError:
+            return _error_response(UploadError('Upload-Length header is required'))
+        except UploadError as e:
+            return _error_response(e)
+
+        document = None
+        if metadata.get('document_id', '').isdigit():
+            document = get_object_or_404(Document, pk=metadata['document_id'])
+
+        try:
+            session = create_session(
+                request.user,
+                metadata.get('filename', ''),
+                length,
+                document=document,
+                checksum=metadata.get('checksum', ''),
+            )
+        except UploadError as e:
+            return _error_response(e)
+
+        return _tus_response(
+            status=201,
+            Location=reverse('dashboard:document_upload', args=[session.pk]),
+            Upload_Offset=0,
+            Upload_Chunk_Size=settings.DOCUMENT_UPLOAD_CHUNK_SIZE,
+        )
+
+
+@method_decorator(MustLogin, name='dispatch')
+class DocumentUploadView(View):
+    """Query, continue or cancel a resumable upload."""
+    http_method_names = ['get', 'head', 'patch', 'delete', 'options']
+
+    def get_session(self, request, upload_id):
+        return get_object_or_404(UploadSession, pk=upload_id, created_by=request.user)
+
+    def head(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        return _tus_response(status=200, Upload_Offset=session.offset, Upload_Length=session.size)
+
+    def get(self, request, upload_id):
+        """JSON status, polled by the client while the file is assembled."""
+        session = self.get_session(request, upload_id)
+        return JsonResponse({
+            'id': str(session.pk),
+            'filename': session.filename,
+            'offset': session.offset,
+            'size': session.size,
+            'status': session.status,
+            'file_id': session.file_id,
+            'error': session.error,
+        })
+
+    def patch(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        if request.content_type != 'application/offset+octet-stream':
+            return _error_response(UploadError('Content-Type must be application/offset+octet-stream', status=415))
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
+            return _error_response(UploadError('Upload-Offset and Content-Length headers are required'))
+
+        try:
+            expected_digest = parse_checksum(request.headers.get('Upload-Checksum'))
+            # Read straight from the WSGI stream so the chunk is never buffered by Django
+            session = write_chunk(session.pk, offset, request, length, expected_digest)
+        except UploadError as e:
+            return _error_response(e)
+
+        return _tus_response(Upload_Offset=session.offset)
+
+    def delete(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        delete_parts(session)
+        session.delete()
+        return _tus_response()
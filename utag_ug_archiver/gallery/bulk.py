@@ -0,0 +1,182 @@
+"""Bulk gallery uploads: many files or a ZIP archive in one request.
+
+The request only moves bytes. Every accepted file, or ZIP member, is
+streamed to storage as-is, and the ``Image`` rows are created with one
+``bulk_create``. Their ``order`` values continue from a single ``Max``
+lookup. ``gallery.tasks.process_bulk_upload`` then does the CPU-bound
+work. The originals are decoded and resized on a process pool with one
+worker per core, and ``BulkUpload.processed``/``failed`` are counted as
+results come in, so the dashboard can poll the progress.
+"""
+import itertools
+import logging
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.files import File as DjangoFile
+from django.db import transaction
+from django.db.models import F, Max
+
+from gallery import processing
+from gallery.forms import ALLOWED_EXTENSIONS, MAX_UPLOAD_SIZE
+from gallery.models import BulkUpload, Image
+from website import cache as website_cache
+
+logger = logging.getLogger(__name__)
+
+# Images decoded/encoded at a time per worker; bounds the bytes held in memory
+IN_FLIGHT_PER_WORKER = 2
+UPDATE_BATCH_SIZE = 50
+
+
+def _check(name, size):
+    """Why the entry cannot be part of the batch, or None if it can."""
+    if os.path.splitext(name)[1].lower() not in ALLOWED_EXTENSIONS:
+        return 'not an image'
+    if size > MAX_UPLOAD_SIZE:
+        return 'too large'
+    return None
+
+
+def _archive_entries(zf):
+    """(filename, size, opener) for each file in the ZIP, skipping folders and OS metadata."""
+    with zf:
+        for info in zf.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+                continue
+            yield name, info.file_size, lambda info=info: zf.open(info)
+
+
+def _file_entries(files):
+    for upload in files:
+        yield upload.name, upload.size, lambda upload=upload: upload
+
+
+def entries(files=(), archive=None):
+    """The uploaded files followed by the archive's members.
+
+    The archive is opened right away, so an unreadable one raises
+    ``zipfile.BadZipFile`` before anything is stored.
+    """
+    zf = zipfile.ZipFile(archive) if archive is not None else None
+    return itertools.chain(_file_entries(files), _archive_entries(zf) if zf else ())
+
+
+def ingest(gallery, user, upload_entries):
+    """Store the entries and create their pending ``Image`` rows.
+
+    Returns the ``BulkUpload`` and the ids of the new images.
+
+    Raises ``zipfile.BadZipFile`` for a corrupt archive member. Whatever
+    was stored before an error is deleted again.
+    """
+    field = Image._meta.get_field('image')
+    stored, skipped = [], []
+    try:
+        for name, size, opener in upload_entries:
+            reason = _check(name, size)
+            if reason:
+                skipped.append(f'{name}: {reason}')
+                continue
+            if len(stored) >= settings.GALLERY_BULK_MAX_FILES:
+                skipped.append(f'{name}: more than {settings.GALLERY_BULK_MAX_FILES} files')
+                continue
+            # Streamed in chunks straight from the upload or the ZIP member
+            with opener() as fh:
+                content = DjangoFile(fh, name=name)
+                # Known up front; working it out would read a ZIP member to the end
+                content.size = size
+                path = field.generate_filename(Image(gallery=gallery), name)
+                # Named before saving, so a member that fails mid-read is cleaned up too
+                stored.append(field.storage.get_available_name(path, max_length=field.max_length))
+                stored[-1] = field.storage.save(stored[-1], content, max_length=field.max_length)
+
+        with transaction.atomic():
+            upload = BulkUpload.objects.create(gallery=gallery, created_by=user, total=len(stored), skipped=skipped)
+            last = Image.objects.filter(gallery=gallery).aggregate(last=Max('order'))['last'] or 0
+            # bulk_create skips Image.save, so nothing is queued per image
+            images = Image.objects.bulk_create([
+                Image(gallery=gallery, image=path, order=last + position, status=Image.PENDING)
+                for position, path in enumerate(stored, start=1)
+            ])
+    except BaseException:
+        for path in stored:
+            if field.storage.exists(path):
+                field.storage.delete(path)
+        raise
+    return upload, [image.pk for image in images]
+
+
+def _read(image):
+    with image.image.open('rb') as fh:
+        return fh.read()
+
+
+def _executor(workers):
+    # Celery's prefork children are daemonic and may not start processes of
+    # their own; there Pillow's GIL-free resize still spreads across threads
+    if multiprocessing.current_process().daemon:
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def process(upload, image_ids, workers=None):
+    """Render the batch's pending images across ``workers`` processes."""
+    workers = workers or settings.GALLERY_PROCESS_WORKERS or os.cpu_count() or 1
+    images = iter(Image.objects.filter(pk__in=image_ids, status=Image.PENDING).order_by('pk'))
+    ready, replaced = [], []
+
+    def flush():
+        if ready:
+            Image.objects.bulk_update(ready, ['image', 'thumbnail', 'status'])
+            BulkUpload.objects.filter(pk=upload.pk).update(processed=F('processed') + len(ready))
+            ready.clear()
+        for name in replaced:
+            Image._meta.get_field('image').storage.delete(name)
+        replaced.clear()
+
+    def failed(image, error):
+        logger.warning(f"Bulk upload {upload.pk}: failed to process image {image.pk}: {error}")
+        Image.objects.filter(pk=image.pk).update(status=Image.FAILED)
+        BulkUpload.objects.filter(pk=upload.pk).update(failed=F('failed') + 1)
+
+    with _executor(workers) as pool:
+        pending = {}
+
+        def submit():
+            for image in images:
+                try:
+                    pending[pool.submit(processing.render_bytes, _read(image))] = image
+                    return True
+                except OSError as e:
+                    failed(image, e)
+            return False
+
+        # Keep a bounded number of images in flight instead of reading them all
+        while len(pending) < workers * IN_FLIGHT_PER_WORKER and submit():
+            pass
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                image = pending.pop(future)
+                try:
+                    optimized, thumbnail = future.result()
+                    name = processing.store(image, optimized, thumbnail, save=False)
+                except Exception as e:
+                    failed(image, e)
+                else:
+                    ready.append(image)
+                    if name:
+                        replaced.append(name)
+                submit()
+            if len(ready) >= UPDATE_BATCH_SIZE:
+                flush()
+        flush()
+
+    BulkUpload.objects.filter(pk=upload.pk).update(status=BulkUpload.COMPLETE)
+    # bulk_update sends no post_save; refresh the public gallery pages once
+    website_cache.bump(website_cache.GALLERY)
@@ -53,13 +53,7 @@ class ImageUploadForm(forms.ModelForm):
                 f'Invalid file type. Allowed formats: {", ".join(ALLOWED_EXTENSIONS)}'
             )
         
-        # Validate it's actually an image
-        try:
-            from PIL import Image as PILImage
-            img = PILImage.open(image)
-            img.verify()
-            image.seek(0)  # Reset file pointer
-        except Exception:
-            raise ValidationError('Invalid image file. Please upload a valid image.')
-        
+        # forms.ImageField has already opened and verified the file; decoding
+        # and resizing happen in the background (gallery.processing)
+
         return image
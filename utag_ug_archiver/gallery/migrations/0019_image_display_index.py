@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0018_image_thumbnail_image_order'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['gallery', 'order', '-uploaded_at'], name='gallery_image_display_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0019_image_display_index'),
+    ]
+
+    operations = [
+        # Existing images were processed on upload
+        migrations.AddField(
+            model_name='image',
+            name='status',
+            field=models.CharField(
+                choices=[('pending', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')],
+                default='ready', max_length=10,
+                help_text='Whether the thumbnail and optimized image have been produced',
+            ),
+        ),
+        migrations.AlterField(
+            model_name='image',
+            name='status',
+            field=models.CharField(
+                choices=[('pending', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')],
+                default='pending', max_length=10,
+                help_text='Whether the thumbnail and optimized image have been produced',
+            ),
+        ),
+    ]
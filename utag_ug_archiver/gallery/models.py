@@ -1,9 +1,13 @@
+import uuid
+
 from django.db import models
-from django.db.models import Max
+from django.db.models import Count, OuterRef, Q, Subquery
 from django.core.files.storage import default_storage
 from django.conf import settings
 import os
 
+from utag_ug_archiver.utils.tasks import enqueue
+
 def gallery_image_upload_to(instance, filename):
     """Generate upload path for gallery images."""
     gallery_id = instance.gallery.id if instance.gallery else 'general'
@@ -15,12 +19,28 @@ def gallery_thumbnail_upload_to(instance, filename):
     name, ext = os.path.splitext(filename)
     return f'gallery_images/{gallery_id}/thumbnails/{name}_thumb{ext}'
 
+class GalleryQuerySet(models.QuerySet):
+    def with_cover(self):
+        """Annotate ``image_count`` and the first image's file names in the same query.
+
+        Only processed images count; pending and failed uploads are not shown.
+        """
+        first = Image.objects.filter(gallery=OuterRef('pk'), status=Image.READY).order_by('order', '-uploaded_at')
+        return self.annotate(
+            image_count=Count('images', filter=Q(images__status=Image.READY)),
+            cover_image_name=Subquery(first.values('image')[:1]),
+            cover_thumbnail_name=Subquery(first.values('thumbnail')[:1]),
+        )
+
+
 class Gallery(models.Model):
     title = models.CharField(max_length=255, help_text="Title of the gallery")
     description = models.TextField(blank=True, null=True, help_text="Optional description of the gallery")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Date and time the gallery was created")
     is_active = models.BooleanField(default=True, help_text="Indicates whether the gallery is active")
 
+    objects = GalleryQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = "Galleries"
         ordering = ['-created_at']
@@ -30,22 +50,48 @@ class Gallery(models.Model):
     
     def get_image_count(self):
         """Return the number of images in this gallery."""
+        if hasattr(self, 'image_count'):
+            return self.image_count
         return self.images.count()
     
     def get_cover_image(self):
         """Return the first image as cover, or None."""
         return self.images.first()
 
+    def get_cover_url(self):
+        """Cover thumbnail URL; free when the gallery came from ``with_cover()``."""
+        if hasattr(self, 'cover_image_name'):
+            name = self.cover_thumbnail_name or self.cover_image_name
+            return default_storage.url(name) if name else ''
+        cover = self.get_cover_image()
+        return cover.get_thumbnail_url() if cover else ''
+
 class Image(models.Model):
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Processing'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    )
     gallery = models.ForeignKey(Gallery, related_name='images', on_delete=models.CASCADE, help_text="Gallery this image belongs to")
     image = models.ImageField(upload_to=gallery_image_upload_to, help_text="Upload image file")
     thumbnail = models.ImageField(upload_to=gallery_thumbnail_upload_to, blank=True, null=True, help_text="Auto-generated thumbnail")
     caption = models.CharField(max_length=255, blank=True, null=True, help_text="Optional caption for the image")
     uploaded_at = models.DateTimeField(auto_now_add=True, help_text="Date and time the image was uploaded")
     order = models.PositiveIntegerField(default=0, help_text="Display order within gallery")
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING,
+        help_text="Whether the thumbnail and optimized image have been produced",
+    )
 
     class Meta:
         ordering = ['order', '-uploaded_at']
+        indexes = [
+            # Album pages and cover lookups walk one gallery in display order
+            models.Index(fields=['gallery', 'order', '-uploaded_at'], name='gallery_image_display_idx'),
+        ]
 
     def __str__(self):
         return f"Image in {self.gallery.title} - {self.caption if self.caption else 'No Caption'}"
@@ -61,114 +107,51 @@ class Image(models.Model):
         return self.get_absolute_url()
     
     def save(self, *args, **kwargs):
-        """Override save to generate thumbnail and optimize image."""
+        """Queue the thumbnail and optimization of new uploads (see gallery.processing)."""
         is_new = self.pk is None
         super().save(*args, **kwargs)
-        
-        if is_new and self.image:
-            try:
-                self._generate_thumbnail()
-                self._optimize_image()
-            except Exception as e:
-                # Log error but don't fail the save
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f"Failed to process image {self.id}: {e}")
-    
-    def _generate_thumbnail(self):
-        """Generate a thumbnail for the image."""
-        try:
-            from PIL import Image as PILImage, ImageOps
-        except ImportError:
-            return  # PIL not available
-        
-        if not self.image:
-            return
-        
-        try:
-            # Open the original image
-            img = PILImage.open(self.image.path)
-            
-            # Convert to RGB if necessary
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = PILImage.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Create thumbnail (max 400x400, maintaining aspect ratio)
-            img.thumbnail((400, 400), PILImage.LANCZOS)
-            
-            # Save thumbnail
-            from django.core.files.base import ContentFile
-            from io import BytesIO
-            
-            thumb_io = BytesIO()
-            img.save(thumb_io, format='JPEG', quality=85, optimize=True)
-            thumb_io.seek(0)
-            
-            # Generate thumbnail filename
-            name, ext = os.path.splitext(os.path.basename(self.image.name))
-            thumb_filename = f'{name}_thumb.jpg'
-            
-            # Save thumbnail
-            self.thumbnail.save(thumb_filename, ContentFile(thumb_io.read()), save=False)
-            self.save(update_fields=['thumbnail'])
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Thumbnail generation failed for image {self.id}: {e}")
-    
-    def _optimize_image(self):
-        """Optimize the main image (resize if too large, compress)."""
-        try:
-            from PIL import Image as PILImage, ImageOps
-        except ImportError:
-            return  # PIL not available
-        
-        if not self.image:
-            return
-        
-        try:
-            # Open the original image
-            img = PILImage.open(self.image.path)
-            original_size = img.size
-            
-            # Max dimensions for gallery images (1920x1920 for web)
-            max_dimension = 1920
-            
-            # Resize if image is too large
-            if max(original_size) > max_dimension:
-                img.thumbnail((max_dimension, max_dimension), PILImage.LANCZOS)
-                
-                # Save optimized image
-                from django.core.files.base import ContentFile
-                from io import BytesIO
-                
-                opt_io = BytesIO()
-                
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    background = PILImage.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                img.save(opt_io, format='JPEG', quality=85, optimize=True)
-                opt_io.seek(0)
-                
-                # Save optimized image
-                name, ext = os.path.splitext(os.path.basename(self.image.name))
-                opt_filename = f'{name}_opt.jpg'
-                self.image.save(opt_filename, ContentFile(opt_io.read()), save=False)
-                self.save(update_fields=['image'])
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Image optimization failed for image {self.id}: {e}")
+        if is_new and self.image and self.status == self.PENDING:
+            from gallery.tasks import process_gallery_image
+            enqueue(process_gallery_image, self.pk)
+
+
+class BulkUpload(models.Model):
+    """A batch of images uploaded together (many files or a ZIP archive).
+
+    The files are stored during the request; ``gallery.tasks.process_bulk_upload``
+    then renders them on a process pool and counts its progress here.
+    """
+    PROCESSING = 'processing'
+    COMPLETE = 'complete'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PROCESSING, 'Processing'),
+        (COMPLETE, 'Complete'),
+        (FAILED, 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    gallery = models.ForeignKey(Gallery, on_delete=models.CASCADE, related_name='bulk_uploads')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='gallery_bulk_uploads',
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PROCESSING)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    # Entries left out of the batch (wrong type, too large), for the uploader
+    skipped = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.total} images for {self.gallery.title} ({self.get_status_display()})"
+
+    def progress(self):
+        """Percentage of the images rendered (or given up on)."""
+        if not self.total:
+            return 100
+        return round(100 * (self.processed + self.failed) / self.total)
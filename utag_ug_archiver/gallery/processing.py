@@ -0,0 +1,82 @@
+"""Background processing of uploaded gallery images.
+
+An upload is stored as-is and the ``Image`` row starts out ``pending``.
+``gallery.tasks.process_gallery_image`` then decodes the file once and
+derives both outputs from that decode: the web-sized original (at most
+``MAX_DIMENSION`` px, JPEG) and the ``THUMBNAIL_SIZE`` thumbnail. Both
+are written in a single save, which marks the image ``ready``. Until then
+``get_thumbnail_url`` serves the untouched upload.
+"""
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image as PILImage, ImageOps
+
+MAX_DIMENSION = 1920
+THUMBNAIL_SIZE = (400, 400)
+JPEG_QUALITY = 85
+
+
+def decode(fh):
+    """Decode an image file into an upright RGB image, flattening transparency onto white."""
+    img = ImageOps.exif_transpose(PILImage.open(fh))
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = PILImage.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    return img.convert('RGB') if img.mode != 'RGB' else img
+
+
+def encode(img):
+    out = BytesIO()
+    img.save(out, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+def render(img):
+    """JPEG bytes of the optimized original (None if it can stay as uploaded) and the thumbnail."""
+    optimized = None
+    if max(img.size) > MAX_DIMENSION:
+        img = img.copy()
+        img.thumbnail((MAX_DIMENSION, MAX_DIMENSION), PILImage.LANCZOS)
+        optimized = encode(img)
+    thumb = img.copy()
+    thumb.thumbnail(THUMBNAIL_SIZE, PILImage.LANCZOS)
+    return optimized, encode(thumb)
+
+
+def render_bytes(data):
+    """``render`` for raw file bytes; a plain function so a process pool can run it."""
+    return render(decode(BytesIO(data)))
+
+
+def store(image, optimized, thumbnail, save=True):
+    """Write the rendered files of ``image`` and mark it ready.
+
+    With ``save=False`` the caller saves ``image``, e.g. in a ``bulk_update``,
+    and deletes the returned replaced upload (if any) afterwards.
+    """
+    name, _ = os.path.splitext(os.path.basename(image.image.name))
+    replaced = None
+    if optimized is not None:
+        replaced = image.image.name
+        image.image.save(f'{name}_opt.jpg', ContentFile(optimized), save=False)
+    # gallery_thumbnail_upload_to adds the _thumb suffix
+    image.thumbnail.save(f'{name}.jpg', ContentFile(thumbnail), save=False)
+    image.status = image.READY
+    if not save:
+        return replaced
+    image.save(update_fields=['image', 'thumbnail', 'status'])
+    if replaced:
+        image.image.storage.delete(replaced)
+    return None
+
+
+def process(image):
+    """Write the optimized original and thumbnail of ``image`` and mark it ready."""
+    with image.image.open('rb') as fh:
+        img = decode(fh)
+    store(image, *render(img))
+    return image
@@ -0,0 +1,39 @@
+import logging
+
+from celery import shared_task
+
+from gallery import bulk, processing
+from gallery.models import BulkUpload, Image
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def process_gallery_image(image_id):
+    """Produce the optimized original and thumbnail of an uploaded gallery image"""
+    image = Image.objects.filter(pk=image_id, status=Image.PENDING).first()
+    if image is None:
+        return f"Image {image_id} is not pending"
+    try:
+        processing.process(image)
+    except Exception as e:
+        logger.warning(f"Failed to process image {image_id}: {e}")
+        Image.objects.filter(pk=image_id).update(status=Image.FAILED)
+        return f"Image {image_id} failed: {e}"
+    return f"Image {image_id} ready"
+
+
+@shared_task
+def process_bulk_upload(upload_id, image_ids):
+    """Render the images of a bulk upload on a process pool"""
+    upload = BulkUpload.objects.filter(pk=upload_id, status=BulkUpload.PROCESSING).first()
+    if upload is None:
+        return f"Bulk upload {upload_id} is not processing"
+    try:
+        bulk.process(upload, image_ids)
+    except Exception as e:
+        logger.exception(f"Bulk upload {upload_id} failed: {e}")
+        BulkUpload.objects.filter(pk=upload_id).update(status=BulkUpload.FAILED)
+        return f"Bulk upload {upload_id} failed: {e}"
+    upload.refresh_from_db()
+    return f"Bulk upload {upload_id}: {upload.processed} processed, {upload.failed} failed"
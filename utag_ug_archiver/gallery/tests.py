@@ -1,3 +1,142 @@
-from django.test import TestCase
+import io
+import tempfile
+import zipfile
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image as PILImage
+
+from gallery import bulk
+from gallery.models import BulkUpload, Gallery, Image
+from gallery.tasks import process_gallery_image
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ImageProcessingTests(TestCase):
+    def upload(self, size, mode='RGB', fmt='PNG'):
+        out = io.BytesIO()
+        PILImage.new(mode, size).save(out, format=fmt)
+        return SimpleUploadedFile(f'photo.{fmt.lower()}', out.getvalue())
+
+    def setUp(self):
+        self.gallery = Gallery.objects.create(title='Congress 2023')
+
+    def test_upload_is_queued_not_processed(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            image = Image.objects.create(gallery=self.gallery, image=self.upload((3000, 1500)))
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(image.status, Image.PENDING)
+        self.assertFalse(image.thumbnail)
+        self.assertEqual(image.get_thumbnail_url(), image.get_absolute_url())
+
+    def test_task_writes_optimized_original_and_thumbnail(self):
+        with self.captureOnCommitCallbacks():
+            image = Image.objects.create(gallery=self.gallery, image=self.upload((3000, 1500), mode='RGBA'))
+        upload_name = image.image.name
+
+        process_gallery_image(image.pk)
+
+        image.refresh_from_db()
+        self.assertEqual(image.status, Image.READY)
+        with image.image.open('rb') as fh:
+            self.assertEqual(PILImage.open(fh).size, (1920, 960))
+        with image.thumbnail.open('rb') as fh:
+            self.assertEqual(PILImage.open(fh).size, (400, 200))
+        self.assertFalse(image.image.storage.exists(upload_name))
+        self.assertEqual(process_gallery_image(image.pk), f"Image {image.pk} is not pending")
+
+    def test_small_upload_keeps_its_original(self):
+        with self.captureOnCommitCallbacks():
+            image = Image.objects.create(gallery=self.gallery, image=self.upload((800, 600), fmt='JPEG'))
+        upload_name = image.image.name
+        process_gallery_image(image.pk)
+        image.refresh_from_db()
+        self.assertEqual(image.image.name, upload_name)
+        self.assertTrue(image.thumbnail.name.endswith('_thumb.jpg'))
+
+    def test_undecodable_upload_is_marked_failed(self):
+        with self.captureOnCommitCallbacks():
+            image = Image.objects.create(
+                gallery=self.gallery, image=SimpleUploadedFile('broken.jpg', b'not an image'),
+            )
+        process_gallery_image(image.pk)
+        image.refresh_from_db()
+        self.assertEqual(image.status, Image.FAILED)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BulkUploadTests(TestCase):
+    def png(self, size):
+        out = io.BytesIO()
+        PILImage.new('RGB', size).save(out, format='PNG')
+        return out.getvalue()
+
+    def archive(self):
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, 'w') as zf:
+            zf.writestr('trip/first.png', self.png((2400, 1200)))
+            zf.writestr('trip/second.png', self.png((640, 480)))
+            zf.writestr('trip/notes.txt', b'not an image')
+            zf.writestr('__MACOSX/trip/._first.png', b'metadata')
+        out.seek(0)
+        return out
+
+    def setUp(self):
+        self.gallery = Gallery.objects.create(title='Congress 2023')
+        with self.captureOnCommitCallbacks():
+            Image.objects.create(gallery=self.gallery, image=SimpleUploadedFile('cover.png', self.png((10, 10))), order=7)
+
+    def test_ingest_stores_entries_and_continues_the_order(self):
+        extra = SimpleUploadedFile('extra.png', self.png((100, 100)))
+        with self.captureOnCommitCallbacks() as callbacks:
+            upload, image_ids = bulk.ingest(self.gallery, None, bulk.entries([extra], self.archive()))
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(upload.total, 3)
+        self.assertEqual(upload.skipped, ['notes.txt: not an image'])
+        images = Image.objects.filter(pk__in=image_ids).order_by('order')
+        self.assertEqual([image.order for image in images], [8, 9, 10])
+        self.assertTrue(all(image.status == Image.PENDING for image in images))
+        self.assertTrue(all(image.image.storage.exists(image.image.name) for image in images))
+
+    def test_process_renders_the_batch_and_reports_progress(self):
+        upload, image_ids = bulk.ingest(self.gallery, None, bulk.entries(archive=self.archive()))
+        Image.objects.filter(pk=image_ids[1]).update(image='gallery_images/missing.png')
+
+        bulk.process(upload, image_ids, workers=2)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, BulkUpload.COMPLETE)
+        self.assertEqual((upload.processed, upload.failed, upload.progress()), (1, 1, 100))
+        first, second = Image.objects.filter(pk__in=image_ids).order_by('order')
+        self.assertEqual(first.status, Image.READY)
+        with first.image.open('rb') as fh:
+            self.assertEqual(PILImage.open(fh).size, (1920, 960))
+        self.assertTrue(first.thumbnail)
+        self.assertEqual(second.status, Image.FAILED)
+
+    def stored_files(self):
+        storage = Image._meta.get_field('image').storage
+        _, files = storage.listdir(f'gallery_images/{self.gallery.pk}')
+        return sorted(files)
+
+    def test_bad_archive_is_rejected_before_anything_is_stored(self):
+        before = self.stored_files()
+        extra = SimpleUploadedFile('extra.png', self.png((100, 100)))
+        with self.assertRaises(zipfile.BadZipFile):
+            bulk.ingest(self.gallery, None, bulk.entries([extra], io.BytesIO(b'not a zip')))
+        self.assertFalse(BulkUpload.objects.exists())
+        self.assertEqual(self.stored_files(), before)
+
+    def test_stored_files_are_removed_when_a_member_is_corrupt(self):
+        before = self.stored_files()
+        archive = self.archive()
+        data = bytearray(archive.getvalue())
+        # Corrupt the second member's data, so its CRC check fails on read
+        start = data.index(b'IEND', data.index(b'trip/second.png')) - 8
+        data[start:start + 4] = b'\xff\xff\xff\xff'
+        extra = SimpleUploadedFile('extra.png', self.png((100, 100)))
+        with self.assertRaises(zipfile.BadZipFile):
+            bulk.ingest(self.gallery, None, bulk.entries([extra], io.BytesIO(bytes(data))))
+        self.assertFalse(BulkUpload.objects.exists())
+        self.assertEqual(self.stored_files(), before)
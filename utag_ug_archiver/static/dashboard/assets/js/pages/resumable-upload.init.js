@@ -0,0 +1,183 @@
+/*
+ * Resumable chunked uploads for the document form.
+ *
+ * Files larger than one chunk are sent to the tus-style endpoint in
+ * `data-upload-url` before the form is submitted; the form then only carries
+ * the resulting `upload_ids`. Upload URLs are remembered in localStorage so
+ * a retry after a dropped connection continues from the server's offset.
+ */
+(function () {
+  var form = document.getElementById('documentForm');
+  var input = document.getElementById('files');
+  if (!form || !input || !form.dataset.uploadUrl) {
+    return;
+  }
+
+  var chunkSize = parseInt(form.dataset.chunkSize, 10) || 8 * 1024 * 1024;
+  var csrfToken = form.querySelector('[name=csrfmiddlewaretoken]').value;
+  var progress = document.getElementById('uploadProgress');
+
+  function storageKey(file) {
+    return 'utag-upload:' + [file.name, file.size, file.lastModified].join(':');
+  }
+
+  function b64(text) {
+    return btoa(unescape(encodeURIComponent(text)));
+  }
+
+  function sha256(blob) {
+    if (!window.crypto || !window.crypto.subtle) {
+      return Promise.resolve(null);
+    }
+    return blob.arrayBuffer().then(function (buffer) {
+      return crypto.subtle.digest('SHA-256', buffer);
+    }).then(function (digest) {
+      return btoa(String.fromCharCode.apply(null, new Uint8Array(digest)));
+    });
+  }
+
+  function request(method, url, headers, body) {
+    headers = Object.assign({'X-CSRFToken': csrfToken, 'Tus-Resumable': '1.0.0'}, headers || {});
+    return fetch(url, {method: method, headers: headers, body: body, credentials: 'same-origin'});
+  }
+
+  function createUpload(file) {
+    var metadata = 'filename ' + b64(file.name);
+    return request('POST', form.dataset.uploadUrl, {
+      'Upload-Length': String(file.size),
+      'Upload-Metadata': metadata
+    }).then(function (response) {
+      if (response.status !== 201) {
+        throw new Error('Could not start upload of ' + file.name);
+      }
+      var location = response.headers.get('Location');
+      localStorage.setItem(storageKey(file), location);
+      return location;
+    });
+  }
+
+  function currentOffset(location) {
+    return request('HEAD', location).then(function (response) {
+      if (!response.ok) {
+        return null;
+      }
+      return parseInt(response.headers.get('Upload-Offset'), 10);
+    });
+  }
+
+  function sleep(ms) {
+    return new Promise(function (resolve) {
+      setTimeout(resolve, ms);
+    });
+  }
+
+  // Send one chunk; resolves with the server's new offset
+  function sendChunk(file, location, offset) {
+    var chunk = file.slice(offset, offset + chunkSize);
+    return sha256(chunk).then(function (checksum) {
+      var headers = {
+        'Upload-Offset': String(offset),
+        'Content-Type': 'application/offset+octet-stream'
+      };
+      if (checksum) {
+        headers['Upload-Checksum'] = 'sha256 ' + checksum;
+      }
+      return request('PATCH', location, headers, chunk);
+    }).then(function (response) {
+      if (response.status !== 204) {
+        throw new Error('Chunk rejected with status ' + response.status);
+      }
+      return parseInt(response.headers.get('Upload-Offset'), 10);
+    });
+  }
+
+  // One chunk at a time. A failed chunk is retried from the server's offset
+  // after a back-off, at most MAX_RETRIES times in a row; the retry handler
+  // wraps only the failed chunk, so later failures never stack retries.
+  var MAX_RETRIES = 5;
+
+  function sendChunks(file, location, offset) {
+    var retries = 0;
+
+    function step(offset) {
+      if (offset >= file.size) {
+        return Promise.resolve(location);
+      }
+      return sendChunk(file, location, offset).then(function (next) {
+        retries = 0;
+        if (progress) {
+          progress.textContent = file.name + ': ' + Math.round(next * 100 / file.size) + '%';
+        }
+        return next;
+      }, function (error) {
+        if (retries >= MAX_RETRIES) {
+          throw error;
+        }
+        retries += 1;
+        // Back off, then ask the server where to continue from
+        return sleep(1000 * Math.pow(2, retries - 1)).then(function () {
+          return currentOffset(location);
+        }).then(function (serverOffset) {
+          return serverOffset === null ? offset : serverOffset;
+        }, function () {
+          return offset;
+        });
+      }).then(step);
+    }
+
+    return step(offset);
+  }
+
+  function uploadFile(file) {
+    var saved = localStorage.getItem(storageKey(file));
+    var start = saved ? currentOffset(saved).then(function (offset) {
+      return offset === null ? createUpload(file).then(function (loc) { return [loc, 0]; }) : [saved, offset];
+    }) : createUpload(file).then(function (loc) { return [loc, 0]; });
+
+    return start.then(function (state) {
+      return sendChunks(file, state[0], state[1]);
+    }).then(function (location) {
+      localStorage.removeItem(storageKey(file));
+      return location.replace(/\/$/, '').split('/').pop();
+    });
+  }
+
+  form.addEventListener('submit', function (event) {
+    var large = Array.prototype.filter.call(input.files, function (file) {
+      return file.size > chunkSize;
+    });
+    if (!large.length || form.dataset.uploading) {
+      return;
+    }
+    event.preventDefault();
+    form.dataset.uploading = '1';
+
+    large.reduce(function (chain, file) {
+      return chain.then(function (ids) {
+        return uploadFile(file).then(function (id) {
+          return ids.concat([id]);
+        });
+      });
+    }, Promise.resolve([])).then(function (ids) {
+      ids.forEach(function (id) {
+        var hidden = document.createElement('input');
+        hidden.type = 'hidden';
+        hidden.name = 'upload_ids';
+        hidden.value = id;
+        form.appendChild(hidden);
+      });
+      // Send the remaining small files with the form as before
+      var transfer = new DataTransfer();
+      Array.prototype.forEach.call(input.files, function (file) {
+        if (file.size <= chunkSize) {
+          transfer.items.add(file);
+        }
+      });
+      input.files = transfer.files;
+      form.submit();
+    }).catch(function (error) {
+      delete form.dataset.uploading;
+      alert(error.message + '. Submit again to resume the upload.');
+    });
+  });
+})();
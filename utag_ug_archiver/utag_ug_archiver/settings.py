@@ -73,6 +73,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'website.middleware.PrerenderedPagesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -293,6 +294,52 @@ TINYMCE_DEFAULT_CONFIG = {
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_TASK_ALWAYS_EAGER = _env_bool('CELERY_TASK_ALWAYS_EAGER', default=False)
+# Entries are copied into django_celery_beat's tables when beat starts
+CELERY_BEAT_SCHEDULE = {
+    'expire-upload-sessions': {
+        'task': 'dashboard.tasks.expire_upload_sessions',
+        'schedule': 60 * 60,
+    },
+    'send-event-reminders': {
+        'task': 'dashboard.tasks.send_due_reminders',
+        'schedule': 5 * 60,
+    },
+    # Time-based content (event periods, the homepage gallery sample)
+    'prerender-public-pages': {
+        'task': 'website.tasks.prerender_public_pages',
+        'schedule': 60 * 60,
+    },
+}
+
+# Resumable document uploads
+DOCUMENT_UPLOAD_CHUNK_SIZE = int(os.environ.get('DOCUMENT_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+DOCUMENT_UPLOAD_MAX_SIZE = int(os.environ.get('DOCUMENT_UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024))
+DOCUMENT_UPLOAD_EXPIRY_HOURS = int(os.environ.get('DOCUMENT_UPLOAD_EXPIRY_HOURS', '48'))
+
+# Document previews: first N pages of PDFs rendered to WebP in the background
+DOCUMENT_PREVIEW_PAGES = int(os.environ.get('DOCUMENT_PREVIEW_PAGES', '5'))
+DOCUMENT_PREVIEW_WIDTH = int(os.environ.get('DOCUMENT_PREVIEW_WIDTH', '1000'))
+
+# Event reminders: default schedule (hours before start) and messages per SMTP batch
+EVENT_REMINDER_OFFSETS_HOURS = [int(h) for h in _env_list('EVENT_REMINDER_OFFSETS_HOURS')] or [24, 1]
+EVENT_REMINDER_BATCH_SIZE = int(os.environ.get('EVENT_REMINDER_BATCH_SIZE', '100'))
+# Public pages are cached under per-model version keys (website.cache), so they
+# can live for hours: any relevant change makes the cached copies unreachable
+PUBLIC_PAGE_CACHE_TIMEOUT = int(os.environ.get('PUBLIC_PAGE_CACHE_TIMEOUT', 6 * 60 * 60))
+# Absolute links in emails sent from background tasks
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000').rstrip('/')
+# Serve the public pages as static files rendered ahead of time (website.prerender)
+PRERENDER_PAGES = _env_bool('PRERENDER_PAGES', default=False)
+PRERENDER_ROOT = os.environ.get('PRERENDER_ROOT', os.path.join(BASE_DIR, 'prerendered'))
+# Bulk gallery uploads (gallery.bulk): files per batch, and processes that
+# render them (0 = one per CPU core)
+GALLERY_BULK_MAX_FILES = int(os.environ.get('GALLERY_BULK_MAX_FILES', '500'))
+GALLERY_PROCESS_WORKERS = int(os.environ.get('GALLERY_PROCESS_WORKERS', '0'))
+# Django rejects requests with more files than this (default 100)
+DATA_UPLOAD_MAX_NUMBER_FILES = GALLERY_BULK_MAX_FILES + 10
+# Route the homepage to its async view; only worth it when served through asgi.py
+ASYNC_PUBLIC_VIEWS = _env_bool('ASYNC_PUBLIC_VIEWS', default=False)
 
 # Cache Configuration
 try:
@@ -0,0 +1,25 @@
+import html
+import math
+import re
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 300
+WORDS_PER_MINUTE = 200
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def plain_text(markup):
+    """Visible text of TinyMCE HTML, entities decoded and whitespace collapsed."""
+    # Block tags would otherwise glue neighbouring words together
+    markup = re.sub(r'<(br|/p|/div|/li|/h\d|/tr)\b[^>]*>', ' ', markup or '', flags=re.IGNORECASE)
+    return _WHITESPACE.sub(' ', html.unescape(strip_tags(markup))).strip()
+
+
+def summarize(markup, length=EXCERPT_LENGTH):
+    """Return ``(excerpt, reading_time_minutes)`` for an HTML body."""
+    text = plain_text(markup)
+    minutes = math.ceil(len(text.split()) / WORDS_PER_MINUTE) if text else 0
+    return Truncator(text).chars(length), minutes
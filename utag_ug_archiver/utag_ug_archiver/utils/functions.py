@@ -5,7 +5,6 @@ import random
 import string
 from accounts.models import User
 from accounts.signals import send_email_with_retry
-from utag_ug_archiver.utils.constants import executive_members_position_order, executive_committee_members_position_order
 from django.http import HttpResponseRedirect
 from django.contrib import messages
 from django.contrib.auth.hashers import make_password
@@ -42,14 +41,6 @@ def ensure_staff_id(user):
     
     return user.staff_id
 
-# Create a custom sorting function based on the order
-def executive_members_custom_order(executive):
-    return executive_members_position_order.index(executive.executive_position)
-
-def executive_committee_members_custom_order(executive):
-    return executive_committee_members_position_order.index(executive.executive_position)
-
-
 # Email sending disabled - users now use staff_id as temporary password
 # def send_credentials_email(user, raw_password):
 #         try:
@@ -0,0 +1,19 @@
+def m2m_changed_ids(instance, action, pk_set, reverse, related_name, stash):
+    """Return the pks of the forward-side objects an ``m2m_changed`` touched.
+
+    A forward change touches ``instance`` itself. A reverse change touches
+    ``pk_set``, except ``clear``, whose pks are read through ``related_name``
+    at ``pre_clear`` and kept on ``instance`` under ``stash`` until
+    ``post_clear``. ``pre_*`` actions return nothing. Receivers sharing a
+    sender must use distinct ``stash`` names.
+    """
+    if action == 'pre_clear' and reverse:
+        instance.__dict__[stash] = list(getattr(instance, related_name).values_list('pk', flat=True))
+        return []
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return []
+    if not reverse:
+        return [instance.pk]
+    if action == 'post_clear':
+        return instance.__dict__.pop(stash, [])
+    return list(pk_set)
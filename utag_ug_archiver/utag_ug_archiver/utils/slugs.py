@@ -0,0 +1,42 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+
+def allocate_slugs(model, field, titles, fallback=None):
+    """Return a unique slug for each title using a single prefix query.
+
+    Collisions get ``-1``, ``-2``, ... suffixes as before, both against rows
+    already in the table and between titles of the same batch. Bases are
+    trimmed so the suffix always fits the field's ``max_length``.
+    """
+    max_length = model._meta.get_field(field).max_length
+    fallback = fallback or model._meta.model_name
+    # Leave room for a "-NNNN" suffix
+    bases = [(slugify(title) or fallback)[:max_length - 5].strip('-') or fallback for title in titles]
+    if not bases:
+        return []
+
+    prefixes = reduce(or_, (Q(**{f'{field}__startswith': base}) for base in set(bases)))
+    taken = set(model.objects.filter(prefixes).values_list(field, flat=True))
+
+    slugs = []
+    for base in bases:
+        slug = base
+        if slug in taken:
+            pattern = re.compile(rf'^{re.escape(base)}-(\d+)$')
+            used = {int(m.group(1)) for m in map(pattern.match, taken) if m}
+            num = 1
+            while num in used:
+                num += 1
+            slug = f'{base}-{num}'
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def unique_slug(model, field, title, fallback=None):
+    return allocate_slugs(model, field, [title], fallback)[0]
@@ -0,0 +1,21 @@
+import logging
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(task, *args, **kwargs):
+    """Queue a Celery task once the surrounding transaction commits.
+
+    If the broker cannot be reached (e.g. local development without Redis)
+    the task is run inline so the data still ends up consistent.
+    """
+    def _send():
+        try:
+            task.delay(*args, **kwargs)
+        except Exception as exc:
+            logger.warning(f"Could not queue {task.name} ({exc}); running inline")
+            task.apply(args=args, kwargs=kwargs)
+
+    transaction.on_commit(_send)
@@ -0,0 +1,12 @@
+"""Fixtures shared by the app test modules."""
+from django.contrib.auth import get_user_model
+
+# The default cache is Redis; tests that rely on cached versions use this
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'}}
+
+
+def create_editor():
+    return get_user_model().objects.create_user(
+        email='editor@example.com', password='testpass123',
+        title='Dr.', other_name='Abena', surname='Ofori', gender='Female',
+    )
@@ -0,0 +1,146 @@
+"""Stream ZIP archives straight from storage.
+
+Members are written with ``ZIP_STORED`` (PDFs, Office files and photos are
+already compressed) into a non-seekable sink, so ``zipfile`` emits data
+descriptors instead of seeking back. Only one member is open at a time and
+at most one read block is held in memory, whatever the archive size. Because
+nothing is compressed, the exact archive size can be worked out up front.
+"""
+import os
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.text import slugify
+
+READ_BLOCK_SIZE = 64 * 1024
+
+# Fixed record sizes from the ZIP specification, without zip64 extras
+LOCAL_HEADER_SIZE = 30
+DATA_DESCRIPTOR_SIZE = 16
+CENTRAL_HEADER_SIZE = 46
+END_RECORD_SIZE = 22
+# zipfile writes zip64 extras for members whose size is within this factor of ZIP64_LIMIT
+ZIP64_MARGIN = 1.05
+
+
+@dataclass
+class ZipEntry:
+    name: str
+    storage: object
+    path: str
+    size: int = None
+    modified: datetime = None
+
+    def date_time(self):
+        modified = self.modified or timezone.now()
+        if timezone.is_aware(modified):
+            modified = timezone.localtime(modified)
+        # ZIP timestamps cannot go below 1980
+        return max(modified.timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+
+
+class _Sink:
+    """Write-only file object collecting what ``zipfile`` writes until drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def unique_names(entries):
+    """Rename entries in place so no two share an archive name."""
+    seen = set()
+    for entry in entries:
+        name = entry.name
+        stem, ext = os.path.splitext(name)
+        counter = 1
+        while name in seen:
+            name = f'{stem} ({counter}){ext}'
+            counter += 1
+        seen.add(name)
+        entry.name = name
+    return entries
+
+
+def content_length(entries):
+    """Exact archive size, or None when unknown or zip64 records would be needed."""
+    total = 0
+    for entry in entries:
+        if entry.size is None:
+            return None
+        name_length = len(entry.name.encode('utf-8'))
+        total += LOCAL_HEADER_SIZE + name_length + entry.size + DATA_DESCRIPTOR_SIZE
+        total += CENTRAL_HEADER_SIZE + name_length
+        # zipfile already switches a member to zip64 within 5% of the limit
+        if entry.size * ZIP64_MARGIN > zipfile.ZIP64_LIMIT or total >= zipfile.ZIP64_LIMIT:
+            return None
+    if len(entries) >= zipfile.ZIP_FILECOUNT_LIMIT:
+        return None
+    return total + END_RECORD_SIZE
+
+
+def _write_zip(sink, entries):
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.name, date_time=entry.date_time())
+            info.compress_type = zipfile.ZIP_STORED
+            if entry.size is not None:
+                # Lets zipfile decide up front whether zip64 records are needed
+                info.file_size = entry.size
+            with entry.storage.open(entry.path, 'rb') as source, archive.open(info, 'w') as target:
+                for block in iter(lambda: source.read(READ_BLOCK_SIZE), b''):
+                    target.write(block)
+                    yield
+            yield
+    yield
+
+
+def stream_zip(entries):
+    """Yield the bytes of a ZIP archive containing ``entries``."""
+    sink = _Sink()
+    for _ in _write_zip(sink, entries):
+        data = sink.drain()
+        if data:
+            yield data
+
+
+def entry_for(field_file, name=None, modified=None):
+    """Build a ``ZipEntry`` for a model file field; the size is best effort."""
+    try:
+        size = field_file.storage.size(field_file.name)
+    except Exception:
+        size = None
+    return ZipEntry(
+        name=name or os.path.basename(field_file.name),
+        storage=field_file.storage,
+        path=field_file.name,
+        size=size,
+        modified=modified,
+    )
+
+
+def zip_response(entries, title):
+    """``StreamingHttpResponse`` serving ``entries`` as ``<title>.zip``."""
+    entries = unique_names(list(entries))
+    response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+    length = content_length(entries)
+    if length is not None:
+        response['Content-Length'] = str(length)
+    response['Content-Disposition'] = f'attachment; filename="{slugify(title) or "download"}.zip"'
+    # Let nginx pass the stream through instead of buffering it
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,141 @@
+"""Versioned page caching for the public website.
+
+Every cached page declares the content it depends on, e.g.
+``('news', 'event')``. Each dependency has a version number in the cache,
+and ``website.signals`` bumps it whenever a matching model changes. The
+versions are part of the page's cache key, so a change makes the old
+entries unreachable at once. Pages can therefore be cached for hours and
+still update right away. A version lookup is a single ``get_many`` per
+request. Pages built from several independent parts can cache each part
+with ``get_sections`` instead (``aget_sections`` in async views).
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.middleware.cache import CacheMiddleware
+
+from utag_ug_archiver.utils.tasks import enqueue
+
+VERSION_KEY = 'website:version:{}'
+
+NEWS = 'news'
+EVENTS = 'events'
+CAROUSEL = 'carousel'
+GALLERY = 'gallery'
+EXECUTIVES = 'executives'
+ADS = 'ads'
+
+
+def get_versions(*names):
+    keys = [VERSION_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump(*names):
+    """Invalidate every page depending on ``names``."""
+    stamp = time.time_ns()
+    cache.set_many({VERSION_KEY.format(name): stamp for name in names}, None)
+    if settings.PRERENDER_PAGES:
+        # Refresh the static copies too (see website.prerender)
+        from website.tasks import prerender_public_pages
+        enqueue(prerender_public_pages, list(names))
+
+
+def cache_public_page(*dependencies, timeout=None):
+    """Like ``cache_page``, with the dependencies' versions in the key prefix."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            versions = '.'.join(str(v) for v in get_versions(*dependencies))
+            middleware = CacheMiddleware(
+                lambda req: view_func(req, *args, **kwargs),
+                page_timeout=timeout or settings.PUBLIC_PAGE_CACHE_TIMEOUT,
+                key_prefix=f"website:{'-'.join(dependencies)}:{versions}",
+            )
+            return middleware(request)
+        return wrapper
+    return decorator
+
+
+@dataclass
+class Section:
+    """A cached piece of a page: ``build()`` runs only when its entry is missing."""
+    name: str
+    build: Callable
+    dependencies: tuple = ()
+    timeout: int = None
+
+
+def _section_keys(sections):
+    names = sorted({dep for section in sections for dep in section.dependencies})
+    versions = dict(zip(names, get_versions(*names))) if names else {}
+    return {
+        section.name: 'website:section:{}:{}'.format(
+            section.name, '.'.join(str(versions[dep]) for dep in section.dependencies)
+        )
+        for section in sections
+    }
+
+
+def get_sections(sections):
+    """Return ``{name: value}`` for ``sections`` in two cache round trips.
+
+    Each section's key carries its dependencies' versions, so a change
+    rebuilds only the sections that depend on it.
+    """
+    keys = _section_keys(sections)
+    cached = cache.get_many(list(keys.values()))
+
+    values = {}
+    for section in sections:
+        key = keys[section.name]
+        if key in cached:
+            values[section.name] = cached[key]
+            continue
+        values[section.name] = section.build()
+        cache.set(key, values[section.name], section.timeout or settings.PUBLIC_PAGE_CACHE_TIMEOUT)
+    return values
+
+
+def _build_in_thread(section):
+    # Runs on a worker thread with its own connection; release it like a request would
+    close_old_connections()
+    try:
+        return section.build()
+    finally:
+        close_old_connections()
+
+
+async def aget_sections(sections):
+    """``get_sections`` for async views: missing sections are built concurrently.
+
+    The async ORM of Django 4.2 still sends every query through one shared
+    thread, so awaiting it section by section would not overlap anything.
+    Each builder runs on its own worker thread and database connection instead.
+    """
+    keys = await sync_to_async(_section_keys)(sections)
+    cached = await cache.aget_many(list(keys.values()))
+    missing = [section for section in sections if keys[section.name] not in cached]
+    built = await asyncio.gather(
+        *(sync_to_async(_build_in_thread, thread_sensitive=False)(section) for section in missing)
+    )
+
+    values = {section.name: cached.get(keys[section.name]) for section in sections}
+    for section, value in zip(missing, built):
+        values[section.name] = value
+        await cache.aset(keys[section.name], value, section.timeout or settings.PUBLIC_PAGE_CACHE_TIMEOUT)
+    return values
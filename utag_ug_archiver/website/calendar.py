@@ -0,0 +1,182 @@
+"""Event calendar: date-range JSON and iCalendar feeds.
+
+Both read only ``Event.starts_at``/``ends_at`` (indexed) plus the columns
+they render. Feed validators come from one aggregate over the feed's
+events and the EVENTS version from ``website.cache``: ``Max(updated_at)``
+moves on every edit (tag changes touch ``updated_at`` too, see
+``dashboard.signals``), ``Count`` on deletes, and the EVENTS version on
+any save or delete. The version is a timestamp, so Last-Modified moves on
+deletes as well, like the detail pages' (see ``website.conditional``). A
+polling client is answered with a 304 after one query.
+Rendered VEVENT blocks are cached per event version, so a change
+re-renders only the events that changed.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard.models import Event
+from website.cache import EVENTS, get_versions
+
+# Calendar clients only need recent history
+FEED_HISTORY = timedelta(days=365)
+FEED_CACHE_TTL = 60 * 60 * 24
+MAX_RANGE = timedelta(days=366)
+PRODID = '-//UTAG-UG//Events//EN'
+
+EVENT_FIELDS = (
+    'id', 'title', 'event_slug', 'short_description', 'venue', 'is_online', 'online_link',
+    'status', 'start_time', 'end_time', 'starts_at', 'ends_at', 'updated_at',
+)
+
+
+def published_events(tag_slug=None):
+    events = Event.objects.filter(is_published=True)
+    if tag_slug:
+        events = events.filter(tags__slug=tag_slug)
+    return events
+
+
+def events_in_range(start, end, tag_slug=None):
+    """Published events overlapping ``[start, end)``, ordered by start."""
+    return (
+        published_events(tag_slug)
+        .filter(starts_at__lt=end, ends_at__gte=start)
+        .only(*EVENT_FIELDS)
+        .order_by('starts_at', 'pk')
+    )
+
+
+def event_as_json(event, url):
+    all_day = event.start_time is None
+    return {
+        'id': event.pk,
+        'title': event.title,
+        'start': timezone.localdate(event.starts_at).isoformat() if all_day else event.starts_at.isoformat(),
+        'end': event.ends_at.isoformat(),
+        'allDay': all_day,
+        'url': url,
+        'venue': event.venue,
+        'status': event.status,
+    }
+
+
+def feed_events(tag_slug=None, now=None):
+    now = now or timezone.now()
+    return published_events(tag_slug).filter(ends_at__gte=now - FEED_HISTORY)
+
+
+def feed_validators(tag_slug=None):
+    """Return ``(etag, last_modified)`` for a feed from a single aggregate."""
+    stats = feed_events(tag_slug).aggregate(last_modified=Max('updated_at'), total=Count('pk'))
+    version, = get_versions(EVENTS)
+    changed = datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)
+    last_modified = max(filter(None, [stats['last_modified'], changed]))
+    digest = hashlib.md5(f"{tag_slug or ''}:{stats['total']}:{last_modified.timestamp()}".encode()).hexdigest()
+    return f'"{digest}"', last_modified
+
+
+def _escape(value):
+    return (
+        str(value or '').replace('\\', '\\\\').replace(';', '\\;')
+        .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Fold a content line at 75 octets as RFC 5545 requires."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    return '\r\n '.join(parts)
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_vevent(event, host, url):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:event-{event.pk}@{host}',
+        f'DTSTAMP:{_utc(event.updated_at)}',
+        f'LAST-MODIFIED:{_utc(event.updated_at)}',
+    ]
+    if event.start_time is None:
+        # All-day: DTEND is exclusive
+        end_date = timezone.localdate(event.ends_at) + timedelta(days=1)
+        lines.append(f"DTSTART;VALUE=DATE:{timezone.localdate(event.starts_at).strftime('%Y%m%d')}")
+        lines.append(f"DTEND;VALUE=DATE:{end_date.strftime('%Y%m%d')}")
+    else:
+        lines.append(f'DTSTART:{_utc(event.starts_at)}')
+        lines.append(f'DTEND:{_utc(event.ends_at)}')
+    lines.append(f'SUMMARY:{_escape(event.title)}')
+    if event.short_description:
+        lines.append(f'DESCRIPTION:{_escape(event.short_description)}')
+    location = event.online_link if event.is_online and not event.venue else event.venue
+    if location:
+        lines.append(f'LOCATION:{_escape(location)}')
+    lines.append(f'URL:{url}')
+    if event.status == 'cancelled':
+        lines.append('STATUS:CANCELLED')
+    lines.append('END:VEVENT')
+    return '\r\n'.join(_fold(line) for line in lines)
+
+
+def _vevent_key(event, host):
+    return f'calendar:vevent:{host}:{event.pk}:{event.updated_at.timestamp()}'
+
+
+def render_feed(request, tag_slug=None, title='UTAG-UG Events'):
+    """Build the iCalendar body, re-rendering only events whose version is not cached."""
+    host = request.get_host()
+    events = list(feed_events(tag_slug).only(*EVENT_FIELDS).order_by('starts_at', 'pk'))
+    keys = {event.pk: _vevent_key(event, host) for event in events}
+    cached = cache.get_many(list(keys.values()))
+
+    fresh = {}
+    blocks = []
+    for event in events:
+        block = cached.get(keys[event.pk])
+        if block is None:
+            url = request.build_absolute_uri(reverse('website:events_detail', kwargs={'slug': event.event_slug}))
+            block = fresh[keys[event.pk]] = render_vevent(event, host, url)
+        blocks.append(block)
+    if fresh:
+        cache.set_many(fresh, FEED_CACHE_TTL)
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        _fold(f'X-WR-CALNAME:{_escape(title)}'),
+        *blocks,
+        'END:VCALENDAR',
+    ]
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def cached_feed(request, etag, tag_slug=None, title='UTAG-UG Events'):
+    """Return the feed body for ``etag``, rendering it at most once per version."""
+    version = etag.strip('"')
+    key = f'calendar:feed:{request.get_host()}:{version}'
+    body = cache.get(key)
+    if body is None:
+        body = render_feed(request, tag_slug, title)
+        cache.set(key, body, FEED_CACHE_TTL)
+    return body
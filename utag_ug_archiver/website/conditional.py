@@ -0,0 +1,119 @@
+"""Validators for conditional GETs on the news and event detail pages.
+
+A detail page changes when its row changes (``updated_at``) or when
+something else on the page changes. The page's dependency version from
+``website.cache`` covers the second case, e.g. the related posts. Both go
+into the ETag. The versions are nanosecond timestamps, so Last-Modified is
+simply the later of the two. A revalidation costs one single-row query
+and one cache read, and no template render.
+
+An event page also changes with the clock: registration closes and the
+event goes past due without a save. That state is part of its ETag, and
+Last-Modified moves to the moment it last changed.
+"""
+import datetime
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+from dashboard.models import Event, News
+from website.cache import EVENTS, NEWS, get_versions
+
+
+EVENT_FIELDS = (
+    'seats_taken', 'registration_required', 'registration_url',
+    'registration_deadline', 'start_date', 'end_date',
+)
+
+
+def _validators(request, model, lookup, dependency, fields=(), extra=(), clock=None):
+    # condition() asks for the ETag and Last-Modified separately
+    if not hasattr(request, '_page_validators'):
+        row = model.objects.filter(**lookup).values('pk', 'updated_at', *fields).first()
+        request._page_row = row
+        if row is None:
+            request._page_validators = (None, None)
+        else:
+            version, = get_versions(dependency)
+            state, since = clock(row) if clock else ([], None)
+            parts = [model._meta.label, row['pk'], row['updated_at'].isoformat(), version]
+            parts += [row[field] for field in fields] + list(extra) + state
+            etag = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+            changed = datetime.datetime.fromtimestamp(version / 1e9, tz=datetime.timezone.utc)
+            request._page_validators = (f'"{etag}"', max(filter(None, [row['updated_at'], changed, since])))
+    return request._page_validators
+
+
+def _utc_midnight(day):
+    # Event.is_past_due/is_registration_open compare against timezone.now().date()
+    return datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.timezone.utc)
+
+
+def _event_clock(row):
+    """The event's clock-driven state, and when it last changed."""
+    event = Event(**{field: row[field] for field in EVENT_FIELDS})
+    # Registration closes at the deadline (or when the event starts); the
+    # event is past due the day after it ends
+    end_date = event.end_date or event.start_date
+    transitions = [
+        event.registration_deadline,
+        _utc_midnight(event.start_date),
+        _utc_midnight(end_date + datetime.timedelta(days=1)),
+    ]
+    now = timezone.now()
+    since = max((moment for moment in transitions if moment and moment <= now), default=None)
+    return [event.is_registration_open(), event.is_past_due()], since
+
+
+def news_validators(request, slug):
+    return _validators(request, News, {'news_slug': slug}, NEWS)
+
+
+def event_validators(request, slug):
+    # Flash messages from the registration form must be rendered, not 304'd
+    if list(messages.get_messages(request)):
+        return None, None
+    # The page embeds a CSRF token tied to the visitor's cookie
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    return _validators(
+        request, Event, {'event_slug': slug}, EVENTS,
+        fields=EVENT_FIELDS, extra=(hashlib.md5(csrf_cookie.encode()).hexdigest(),), clock=_event_clock,
+    )
+
+
+def event_cache_control(view_func):
+    """Cache-Control for the event page, its 304s included.
+
+    A page with the native registration form (or a flash message) is only
+    for this visitor; any other event page may be shared briefly.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        row = getattr(request, '_page_row', None)
+        if row is None or (row['registration_required'] and not row['registration_url']):
+            patch_cache_control(response, private=True, max_age=0)
+        else:
+            patch_cache_control(response, public=True, max_age=0, s_maxage=300)
+        return response
+    return wrapper
+
+
+def news_etag(request, slug):
+    return news_validators(request, slug)[0]
+
+
+def news_last_modified(request, slug):
+    return news_validators(request, slug)[1]
+
+
+def event_etag(request, slug):
+    return event_validators(request, slug)[0]
+
+
+def event_last_modified(request, slug):
+    return event_validators(request, slug)[1]
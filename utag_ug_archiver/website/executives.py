@@ -0,0 +1,68 @@
+"""Executive rosters for the public pages and the dashboard.
+
+The position tables in ``utils.constants`` set the display order. They are
+turned into a ``Case``/``When`` rank so the database sorts the roster, and
+only the fields the roster templates read are loaded. The whole committee
+roster is one cached entry under the ``EXECUTIVES`` version, which
+``website.signals`` bumps when any of ``ROSTER_FIELDS`` changes on an
+executive. The officers are the first positions of the committee table, so
+their roster is filtered from the same entry.
+"""
+from django.db.models import Case, IntegerField, Value, When
+
+from accounts.models import User
+from utag_ug_archiver.utils.constants import (
+    executive_committee_members_position_order,
+    executive_members_position_order,
+)
+from website.cache import EXECUTIVES, Section, get_sections
+
+# Everything the public and dashboard roster templates read, including the
+# inputs of User.executive_status and User.expiry_date
+ROSTER_FIELDS = (
+    'title', 'other_name', 'surname', 'email', 'gender', 'phone_number',
+    'executive_position', 'is_active_executive', 'executive_image', 'executive_terms',
+    'date_appointed', 'date_ended', 'fb_profile_url', 'twitter_profile_url', 'linkedin_profile_url',
+    'department',
+)
+
+
+def position_rank(positions):
+    """Annotation ranking ``executive_position`` by its index in ``positions``."""
+    return Case(
+        *[When(executive_position=position, then=Value(rank)) for rank, position in enumerate(positions)],
+        default=Value(len(positions)),
+        output_field=IntegerField(),
+    )
+
+
+def roster_queryset(positions):
+    return (
+        User.objects.filter(executive_position__in=positions, is_active_executive=True)
+        .select_related('department')
+        .only('id', *ROSTER_FIELDS)
+        .annotate(position_rank=position_rank(positions))
+        .order_by('position_rank', 'surname', 'pk')
+    )
+
+
+def _committee_roster():
+    return list(roster_queryset(executive_committee_members_position_order))
+
+
+# Pages that already fetch other sections add this one to the same batch
+ROSTER_SECTION = Section('executive_roster', _committee_roster, (EXECUTIVES,))
+
+
+def officers_of(roster):
+    return [executive for executive in roster if executive.executive_position in executive_members_position_order]
+
+
+def committee_members():
+    """Active executive committee members, in position order."""
+    return get_sections([ROSTER_SECTION])[ROSTER_SECTION.name]
+
+
+def executive_officers():
+    """Active executive officers, in position order."""
+    return officers_of(committee_members())
@@ -0,0 +1,169 @@
+"""Responsive variants of the images shown on the site.
+
+Every image in ``IMAGE_FIELDS`` gets resized copies at ``VARIANT_WIDTHS``
+(never wider than the original) in each format Pillow can encode here.
+AVIF is used when the Pillow build supports it, and WebP always. The copies
+are built in the background by ``website.tasks.build_image_variants``
+whenever one of those fields changes. Their names go into an
+``ImageVariants`` manifest row, which is mirrored in the cache, so the
+``{% responsive_image %}`` tag renders a ``srcset`` with one cache read and
+no storage calls. Until the variants exist the tag falls back to the
+original, so pages rendered in the meantime are invalidated (through the
+owning model's ``IMAGE_DEPENDENCIES``) once the manifest is written.
+"""
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image as PILImage, ImageOps
+
+from accounts.models import User
+from dashboard.models import CarouselSlide, Event, News
+from website.cache import CAROUSEL, EVENTS, EXECUTIVES, NEWS
+from website.models import ImageVariants
+
+logger = logging.getLogger(__name__)
+
+# Model -> image fields with responsive variants
+IMAGE_FIELDS = {
+    Event: ('featured_image',),
+    News: ('featured_image',),
+    CarouselSlide: ('image',),
+    User: ('executive_image', 'profile_pic'),
+}
+
+# Model -> cached pages showing its images
+IMAGE_DEPENDENCIES = {
+    Event: (EVENTS,),
+    News: (NEWS,),
+    CarouselSlide: (CAROUSEL,),
+    User: (EXECUTIVES,),
+}
+
+VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+# Best first: browsers take the first <source> they support
+VARIANT_FORMATS = {
+    'avif': {'format': 'AVIF', 'quality': 60},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+}
+
+MANIFEST_CACHE_KEY = 'website:image-variants:{}'
+# Sources without a manifest yet are re-checked this often
+MISSING_TIMEOUT = 5 * 60
+
+
+def supported_formats():
+    PILImage.init()
+    return [fmt for fmt, options in VARIANT_FORMATS.items() if options['format'] in PILImage.SAVE]
+
+
+def variant_name(source, width, fmt):
+    root, _ = os.path.splitext(source)
+    return f'variants/{root}/{width}w.{fmt}'
+
+
+def _cache_key(source):
+    # Storage names can be longer than memcached keys allow
+    return MANIFEST_CACHE_KEY.format(hashlib.md5(source.encode()).hexdigest())
+
+
+def _manifest_data(row):
+    return {'width': row.width, 'height': row.height, 'variants': row.variants}
+
+
+def get_manifest(source):
+    """The manifest of ``source`` as a dict, or None if it has no variants yet."""
+    if not source:
+        return None
+    key = _cache_key(source)
+    manifest = cache.get(key)
+    if manifest is None:
+        row = ImageVariants.objects.filter(source=source).first()
+        manifest = _manifest_data(row) if row else {}
+        cache.set(key, manifest, None if row else MISSING_TIMEOUT)
+    return manifest or None
+
+
+def _decode(source):
+    with default_storage.open(source, 'rb') as fh:
+        img = PILImage.open(fh)
+        img = ImageOps.exif_transpose(img)
+        img.load()
+    if img.mode not in ('RGB', 'RGBA'):
+        transparent = 'A' in img.getbands() or 'transparency' in img.info
+        img = img.convert('RGBA' if transparent else 'RGB')
+    return img
+
+
+def _replace(name, data):
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(data))
+
+
+def build(source):
+    """Decode ``source`` once, write its variants and record them; returns the manifest row."""
+    img = _decode(source)
+    width, height = img.size
+    widths = [w for w in VARIANT_WIDTHS if w < width] + [min(width, VARIANT_WIDTHS[-1])]
+    old = ImageVariants.objects.filter(source=source).first()
+
+    variants = {fmt: [] for fmt in supported_formats()}
+    # Largest first, each resized from the previous one rather than the original
+    resized = img
+    for target in sorted(set(widths), reverse=True):
+        resized = resized.resize((target, max(1, round(height * target / width))), PILImage.LANCZOS)
+        for fmt in variants:
+            out = BytesIO()
+            resized.save(out, **VARIANT_FORMATS[fmt])
+            variants[fmt].insert(0, [target, _replace(variant_name(source, target, fmt), out.getvalue())])
+
+    row, _ = ImageVariants.objects.update_or_create(
+        source=source, defaults={'width': width, 'height': height, 'variants': variants},
+    )
+    if old:
+        # Widths or formats that are no longer produced
+        _delete_files(_names(old.variants) - _names(variants))
+    cache.set(_cache_key(source), _manifest_data(row), None)
+    return row
+
+
+def _names(variants):
+    return {name for entries in variants.values() for _, name in entries}
+
+
+def _delete_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Could not delete image variant {name}: {e}")
+
+
+def drop(source):
+    """Delete the variants and manifest of ``source``."""
+    row = ImageVariants.objects.filter(source=source).first()
+    if row:
+        _delete_files(_names(row.variants))
+        row.delete()
+    cache.delete(_cache_key(source))
+
+
+def referenced_sources():
+    """Storage names of every image in ``IMAGE_FIELDS``."""
+    sources = set()
+    for model, fields in IMAGE_FIELDS.items():
+        for field in fields:
+            sources.update(
+                model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+                .values_list(field, flat=True)
+            )
+    return sources
+
+
+def srcset(manifest, fmt):
+    return ', '.join(f'{default_storage.url(name)} {width}w' for width, name in manifest['variants'].get(fmt, []))
@@ -0,0 +1,95 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncRequestFactory, RequestFactory
+
+from website import cache as website_cache
+from website.views import AsyncIndexView, IndexView
+
+SECTION_DEPENDENCIES = (
+    website_cache.EVENTS, website_cache.NEWS, website_cache.EXECUTIVES,
+    website_cache.CAROUSEL, website_cache.GALLERY,
+)
+
+
+def _percentile(timings, percent):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare homepage latency (p50/p99) and throughput of the sync IndexView '
+        'against AsyncIndexView, with the given number of requests in flight.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Invalidate the homepage sections before every request, so each one hits the database',
+        )
+
+    def _prepare(self, request, cold):
+        request.user = AnonymousUser()
+        if cold:
+            website_cache.bump(*SECTION_DEPENDENCIES)
+        return request
+
+    def run_sync(self, total, concurrency, cold):
+        view = IndexView.as_view()
+        factory = RequestFactory()
+
+        def one(_):
+            started = time.perf_counter()
+            response = view(self._prepare(factory.get('/'), cold))
+            assert response.status_code == 200, response.status_code
+            elapsed = time.perf_counter() - started
+            connections.close_all()
+            return elapsed
+
+        # A thread per request in flight, like gthread workers
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            timings = list(pool.map(one, range(total)))
+        return timings, time.perf_counter() - started
+
+    async def run_async(self, total, concurrency, cold):
+        view = AsyncIndexView.as_view()
+        factory = AsyncRequestFactory()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with slots:
+                started = time.perf_counter()
+                response = await view(self._prepare(factory.get('/'), cold))
+                assert response.status_code == 200, response.status_code
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(one() for _ in range(total)))
+        return timings, time.perf_counter() - started
+
+    def report(self, label, timings, duration):
+        self.stdout.write(
+            f"{label:<6} p50 {statistics.median(timings) * 1000:8.1f} ms   "
+            f"p99 {_percentile(timings, 99) * 1000:8.1f} ms   "
+            f"{len(timings) / duration:8.1f} req/s"
+        )
+
+    def handle(self, *args, **options):
+        total, concurrency, cold = options['requests'], options['concurrency'], options['cold']
+        self.stdout.write(
+            f"{total} requests, {concurrency} in flight, {'cold' if cold else 'warm'} section cache"
+        )
+        # Warm up imports, templates and (unless cold) the section cache
+        self.run_sync(1, 1, cold)
+        self.report('sync', *self.run_sync(total, concurrency, cold))
+        self.report('async', *asyncio.run(self.run_async(total, concurrency, cold)))
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from website import images
+from website.cache import bump
+from website.models import ImageVariants
+
+
+class Command(BaseCommand):
+    help = 'Build the responsive WebP/AVIF variants of the site images that have none yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild the variants of every image')
+        parser.add_argument('--prune', action='store_true', help='Delete the variants of images no longer in use')
+
+    def handle(self, *args, **options):
+        sources = images.referenced_sources()
+        done = set() if options['force'] else set(ImageVariants.objects.values_list('source', flat=True))
+        built = failed = 0
+        for source in sorted(sources - done):
+            try:
+                images.build(source)
+                built += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{source}: {e}")
+        if built:
+            bump(*{dependency for dependencies in images.IMAGE_DEPENDENCIES.values() for dependency in dependencies})
+
+        pruned = 0
+        if options['prune']:
+            for source in ImageVariants.objects.exclude(source__in=sources).values_list('source', flat=True):
+                images.drop(source)
+                pruned += 1
+        self.stdout.write(self.style.SUCCESS(f"Done. {built} built, {failed} failed, {pruned} pruned."))
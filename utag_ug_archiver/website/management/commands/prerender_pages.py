@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from website import prerender
+
+
+class Command(BaseCommand):
+    help = 'Render the public pages to static HTML under PRERENDER_ROOT for PrerenderedPagesMiddleware to serve.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('pages', nargs='*', help='URL names to render, e.g. website:news (default: all)')
+
+    def handle(self, *args, **options):
+        pages = options['pages'] or list(prerender.PAGES)
+        unknown = set(pages) - set(prerender.PAGES)
+        if unknown:
+            raise CommandError(f"Not a pre-rendered page: {', '.join(sorted(unknown))}")
+        written = 0
+        for page in pages:
+            path = prerender.render_page(page)
+            if path:
+                written += 1
+                self.stdout.write(f"{page} -> {path}")
+        self.stdout.write(self.style.SUCCESS(f"Done. {written} of {len(pages)} pages rendered."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from website import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the public site search index from the published News and Events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(search.MODELS), help='Only rebuild this kind (default: all)')
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else list(search.MODELS)
+        total = 0
+        for kind in kinds:
+            count = search.rebuild_all(kind)
+            total += count
+            self.stdout.write(f"{kind}: {count} indexed")
+        self.stdout.write(self.style.SUCCESS(f"Done. {total} items indexed."))
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class PrerenderedPagesMiddleware(WhiteNoiseMiddleware):
+    """Serve pages written by ``website.prerender`` to anonymous visitors.
+
+    WhiteNoise does the serving: ETag/Last-Modified, 304s, gzip negotiation.
+    The directory is re-checked on every request (one ``stat``) so
+    re-rendered pages are picked up without a restart. Anyone with a
+    session cookie, and any request with a query string, goes to Django.
+    The middleware below this one never sees these responses, so the
+    clickjacking header that ``XFrameOptionsMiddleware`` would add is set
+    here.
+    """
+
+    def __init__(self, get_response=None):
+        if not settings.PRERENDER_PAGES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        WhiteNoise.__init__(self, application=None, autorefresh=True, max_age=0, index_file=True)
+        self.use_finders = False
+        self.add_files(settings.PRERENDER_ROOT)
+
+    def __call__(self, request):
+        if (
+            request.method in ('GET', 'HEAD')
+            and not request.META.get('QUERY_STRING')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        ):
+            static_file = self.find_file(request.path_info)
+            if static_file is not None:
+                response = self.serve(static_file, request)
+                response.headers.setdefault('X-Frame-Options', getattr(settings, 'X_FRAME_OPTIONS', 'DENY').upper())
+                return response
+        return self.get_response(request)
+
+    def immutable_file_test(self, path, url):
+        return False
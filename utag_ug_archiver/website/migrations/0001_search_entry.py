@@ -0,0 +1,80 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:47
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    """GIN index on PostgreSQL, FTS5 mirror table on SQLite, nothing elsewhere."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS website_searchentry_gin "
+            "ON website_searchentry USING GIN (search_vector)"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS website_searchentry_fts "
+            "USING fts5(title, tags, summary, body, tokenize='porter unicode61')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS website_searchentry_gin")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS website_searchentry_fts")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("news", "News"), ("event", "Event")], max_length=10
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("title", models.CharField(max_length=255)),
+                ("summary", models.TextField(blank=True, default="")),
+                ("body", models.TextField(blank=True, default="")),
+                ("tags", models.TextField(blank=True, default="")),
+                ("url", models.CharField(max_length=255)),
+                ("published_at", models.DateTimeField()),
+                (
+                    "search_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        editable=False, null=True
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Search entries",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="searchentry",
+            constraint=models.UniqueConstraint(
+                fields=("kind", "object_id"), name="website_searchentry_unique"
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,3 +1,47 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
-# Create your models here.
+
+class SearchEntry(models.Model):
+    """One published News or Event item in the public site search (see ``website.search``)."""
+    KIND_CHOICES = (
+        ('news', 'News'),
+        ('event', 'Event'),
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    # Event short description and venue
+    summary = models.TextField(blank=True, default='')
+    # Plain text of the HTML body
+    body = models.TextField(blank=True, default='')
+    tags = models.TextField(blank=True, default='')
+    url = models.CharField(max_length=255)
+    published_at = models.DateTimeField()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='website_searchentry_unique'),
+        ]
+        verbose_name_plural = 'Search entries'
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
+
+
+class ImageVariants(models.Model):
+    """Manifest of the resized WebP/AVIF copies of one stored image (see ``website.images``)."""
+    # Storage name of the original, e.g. news_images/budget.jpg
+    source = models.CharField(max_length=255, unique=True)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    # {format: [[width, storage name], ...]}, narrowest first
+    variants = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Image variants'
+
+    def __str__(self):
+        return self.source
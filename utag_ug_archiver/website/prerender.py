@@ -0,0 +1,109 @@
+"""Static pre-rendering of the public pages.
+
+With ``PRERENDER_PAGES`` on, the pages in ``PAGES`` are rendered to
+``PRERENDER_ROOT/<path>/index.html`` (plus a gzipped copy) and
+``website.middleware.PrerenderedPagesMiddleware`` serves them through
+WhiteNoise to anonymous visitors. Those requests never reach a view, the
+session or the database. ``website.cache.bump`` queues a re-render of the
+pages that depend on what changed; ``prerender_pages`` renders them all.
+
+Only pages that are the same for every visitor qualify. The contact page
+embeds a CSRF token and the event detail page a registration form, so
+both stay dynamic. Listing pages are pre-rendered without query strings;
+later cursor pages and filters are still served by Django.
+"""
+import gzip
+import inspect
+import logging
+import os
+import tempfile
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from website.cache import CAROUSEL, EVENTS, EXECUTIVES, GALLERY, NEWS
+
+logger = logging.getLogger(__name__)
+
+# URL name -> dependencies; ads are fetched separately from adverts.views.ad_slot
+PAGES = {
+    'website:index': (EVENTS, NEWS, EXECUTIVES, CAROUSEL, GALLERY),
+    'website:about_us': (),
+    'website:executive_officers': (EXECUTIVES,),
+    'website:executive_committee_members': (EXECUTIVES,),
+    'website:news': (NEWS,),
+    'website:events': (EVENTS,),
+    'website:gallery': (GALLERY,),
+}
+
+
+def pages_for(names=None):
+    """URL names of the pages affected by ``names``; all pages when None."""
+    if names is None:
+        return list(PAGES)
+    return [page for page, dependencies in PAGES.items() if set(dependencies) & set(names)]
+
+
+def output_path(url):
+    return os.path.join(settings.PRERENDER_ROOT, url.strip('/'), 'index.html')
+
+
+def _write_atomic(path, data):
+    # Readers see either the old file or the new one, never a partial write
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.prerender-')
+    with os.fdopen(fd, 'wb') as fh:
+        fh.write(data)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _request(url):
+    site = urlsplit(settings.SITE_URL)
+    factory = RequestFactory(
+        HTTP_HOST=site.netloc, SERVER_PORT=site.port or (443 if site.scheme == 'https' else 80),
+        **{'wsgi.url_scheme': site.scheme},
+    )
+    request = factory.get(url)
+    request.user = AnonymousUser()
+    return request
+
+
+async def _awaited(response):
+    return await response
+
+
+def render_page(page):
+    """Render one page to disk; returns its path, or None when it failed."""
+    url = reverse(page)
+    request = _request(url)
+    match = resolve(url)
+    response = match.func(request, *match.args, **match.kwargs)
+    if inspect.isawaitable(response):
+        # An async view (ASYNC_PUBLIC_VIEWS)
+        response = async_to_sync(_awaited)(response)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        logger.warning(f"Pre-render of {url} returned {response.status_code}; keeping the old copy")
+        return None
+
+    path = output_path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_atomic(path + '.gz', gzip.compress(response.content))
+    _write_atomic(path, response.content)
+    return path
+
+
+def render_pages(names=None):
+    """Re-render the pages depending on ``names``; returns how many were written."""
+    written = 0
+    for page in pages_for(names):
+        try:
+            written += render_page(page) is not None
+        except Exception as e:
+            logger.error(f"Pre-render of {page} failed: {e}")
+    return written
@@ -0,0 +1,175 @@
+"""Public site search over published News and Events.
+
+Each published item has one ``SearchEntry`` row holding its title, tags,
+summary and plain-text body. On PostgreSQL a weighted ``tsvector`` is
+stored in ``search_vector`` (GIN indexed): title A, tags B, summary C,
+body D. On SQLite a mirror row goes into the ``website_searchentry_fts``
+FTS5 table. Any other backend falls back to ``icontains``. Signals in
+``website.signals`` queue a re-index whenever an item, its tags or a tag
+name change, and unpublished or deleted items are dropped from the index.
+"""
+from django.db import connection
+from django.db.models import F, Q
+from django.urls import reverse
+
+from dashboard.models import Event, News
+from dashboard.search import MARK_START, MARK_STOP, SEARCH_CONFIG, fts_query, render_highlight
+from utag_ug_archiver.utils.excerpts import plain_text
+from website.models import SearchEntry
+
+FTS_TABLE = 'website_searchentry_fts'
+
+MODELS = {
+    'news': News,
+    'event': Event,
+}
+
+
+def fts_available():
+    return connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+
+
+def _entry_fields(kind, item):
+    tags = ', '.join(item.tags.values_list('name', flat=True))
+    if kind == 'news':
+        return {
+            'title': item.title,
+            'summary': '',
+            'body': plain_text(item.content),
+            'tags': tags,
+            'url': reverse('website:news_detail', kwargs={'slug': item.news_slug}),
+            'published_at': item.created_at,
+        }
+    return {
+        'title': item.title,
+        'summary': ' '.join(filter(None, [item.short_description, item.venue])),
+        'body': plain_text(item.description),
+        'tags': tags,
+        'url': reverse('website:events_detail', kwargs={'slug': item.event_slug}),
+        'published_at': item.starts_at or item.created_at,
+    }
+
+
+def index_item(kind, item_id):
+    """Add, refresh or drop the entry of one News/Event item."""
+    item = MODELS[kind].objects.filter(pk=item_id, is_published=True).first()
+    if item is None:
+        unindex_item(kind, item_id)
+        return None
+
+    fields = _entry_fields(kind, item)
+    entry, _ = SearchEntry.objects.update_or_create(kind=kind, object_id=item_id, defaults=fields)
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchVector
+
+        SearchEntry.objects.filter(pk=entry.pk).update(search_vector=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('tags', weight='B', config=SEARCH_CONFIG)
+            + SearchVector('summary', weight='C', config=SEARCH_CONFIG)
+            + SearchVector('body', weight='D', config=SEARCH_CONFIG)
+        ))
+    elif fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [entry.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, tags, summary, body) VALUES (%s, %s, %s, %s, %s)',
+                [entry.pk, entry.title, entry.tags, entry.summary, entry.body],
+            )
+    return entry
+
+
+def unindex_item(kind, item_id):
+    entry_ids = list(SearchEntry.objects.filter(kind=kind, object_id=item_id).values_list('pk', flat=True))
+    if not entry_ids:
+        return
+    if fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [entry_ids[0]])
+    SearchEntry.objects.filter(pk__in=entry_ids).delete()
+
+
+def _search_postgres(entries, query, offset, limit):
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    results = list(
+        entries.filter(search_vector=search_query)
+        .defer('body', 'search_vector')
+        .annotate(
+            search_rank=SearchRank(F('search_vector'), search_query),
+            search_highlight=SearchHeadline(
+                'body', search_query, config=SEARCH_CONFIG,
+                start_sel=MARK_START, stop_sel=MARK_STOP, max_fragments=2,
+            ),
+        )
+        .order_by('-search_rank', '-published_at')[offset:offset + limit]
+    )
+    for entry in results:
+        entry.search_highlight = render_highlight(entry.search_highlight)
+    return results
+
+
+def _search_sqlite(entries, query, offset, limit):
+    entries_sql, entries_params = entries.values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, bm25({FTS_TABLE}, 10.0, 6.0, 3.0, 1.0) AS rank, '
+            f"snippet({FTS_TABLE}, -1, %s, %s, '…', 24) "
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({entries_sql}) '
+            'ORDER BY rank LIMIT %s OFFSET %s',
+            [MARK_START, MARK_STOP, fts_query(query), *entries_params, limit, offset],
+        )
+        rows = cursor.fetchall()
+
+    by_id = SearchEntry.objects.defer('body').in_bulk([row[0] for row in rows])
+    results = []
+    for pk, rank, snippet in rows:
+        entry = by_id.get(pk)
+        if entry is None:
+            continue
+        # bm25() is lower-is-better; flip it so callers can treat rank uniformly
+        entry.search_rank = -rank
+        entry.search_highlight = render_highlight(snippet)
+        results.append(entry)
+    return results
+
+
+def _search_fallback(entries, query, offset, limit):
+    lookup = Q()
+    for field in ('title', 'tags', 'summary', 'body'):
+        lookup |= Q(**{f'{field}__icontains': query})
+    results = list(entries.filter(lookup).defer('body').order_by('-published_at')[offset:offset + limit])
+    for entry in results:
+        entry.search_rank = 0
+        entry.search_highlight = ''
+    return results
+
+
+def search(query, kind=None, offset=0, limit=10):
+    """Ranked ``SearchEntry`` results for ``query``, optionally of one kind.
+
+    Each result carries ``search_rank`` and a safe ``search_highlight``.
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+    entries = SearchEntry.objects.all()
+    if kind in MODELS:
+        entries = entries.filter(kind=kind)
+    if connection.vendor == 'postgresql':
+        return _search_postgres(entries, query, offset, limit)
+    if fts_available():
+        return _search_sqlite(entries, query, offset, limit)
+    return _search_fallback(entries, query, offset, limit)
+
+
+def rebuild_all(kind):
+    """Re-index every item of ``kind`` and drop stale entries; returns how many are indexed."""
+    model = MODELS[kind]
+    item_ids = list(model.objects.filter(is_published=True).values_list('pk', flat=True))
+    stale = SearchEntry.objects.filter(kind=kind).exclude(object_id__in=item_ids)
+    for object_id in list(stale.values_list('object_id', flat=True)):
+        unindex_item(kind, object_id)
+    for item_id in item_ids:
+        index_item(kind, item_id)
+    return len(item_ids)
@@ -0,0 +1,131 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Department, User
+from adverts.models import Ad, AdSlot
+from dashboard.models import CarouselSlide, Event, News, Tag
+from gallery.models import Gallery, Image
+from utag_ug_archiver.utils.signals import m2m_changed_ids
+from utag_ug_archiver.utils.tasks import enqueue
+from website import images, search
+from website.cache import ADS, CAROUSEL, EVENTS, EXECUTIVES, GALLERY, NEWS, bump
+from website.executives import ROSTER_FIELDS
+from website.tasks import build_image_variants, index_search_entry
+
+# Model -> page dependencies invalidated when one of its rows changes
+MODEL_DEPENDENCIES = {
+    News: (NEWS,),
+    Event: (EVENTS,),
+    CarouselSlide: (CAROUSEL,),
+    Gallery: (GALLERY,),
+    Image: (GALLERY,),
+    Ad: (ADS,),
+    AdSlot: (ADS,),
+    # The roster shows each executive's department name
+    Department: (EXECUTIVES,),
+}
+
+# Fields shown on the rosters; a change to any of them invalidates EXECUTIVES
+EXECUTIVE_FIELDS = ROSTER_FIELDS
+
+
+def bump_for_instance(sender, **kwargs):
+    bump(*MODEL_DEPENDENCIES[sender])
+
+
+def bump_for_tags(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump(NEWS if sender is News.tags.through else EVENTS)
+
+
+for model in MODEL_DEPENDENCIES:
+    post_save.connect(bump_for_instance, sender=model, dispatch_uid=f'website_cache_save_{model.__name__}')
+    post_delete.connect(bump_for_instance, sender=model, dispatch_uid=f'website_cache_delete_{model.__name__}')
+m2m_changed.connect(bump_for_tags, sender=News.tags.through, dispatch_uid='website_cache_news_tags')
+m2m_changed.connect(bump_for_tags, sender=Event.tags.through, dispatch_uid='website_cache_event_tags')
+
+
+def _is_executive(values):
+    return bool(values.get('is_active_executive') and values.get('executive_position'))
+
+
+@receiver(pre_save, sender=User)
+def remember_executive_fields(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login; skip the lookup for those
+    if update_fields is not None and not set(update_fields) & set(EXECUTIVE_FIELDS):
+        instance._executive_before = None
+        return
+    if instance.pk is None:
+        instance._executive_before = {}
+        return
+    instance._executive_before = User.objects.filter(pk=instance.pk).values(*EXECUTIVE_FIELDS).first() or {}
+
+
+@receiver(post_save, sender=User)
+def bump_executives_on_save(sender, instance, **kwargs):
+    before = instance.__dict__.pop('_executive_before', None)
+    if before is None:
+        return
+    # values() gives foreign keys as ids, so compare against attname
+    after = {field: getattr(instance, User._meta.get_field(field).attname) for field in EXECUTIVE_FIELDS}
+    after['executive_image'] = instance.executive_image.name if instance.executive_image else None
+    before = {**before, 'executive_image': before.get('executive_image') or None}
+    # Only executives (before or after) appear on public pages
+    if (_is_executive(before) or _is_executive(after)) and before != after:
+        bump(EXECUTIVES)
+
+
+@receiver(post_delete, sender=User)
+def bump_executives_on_delete(sender, instance, **kwargs):
+    if instance.is_active_executive and instance.executive_position:
+        bump(EXECUTIVES)
+
+
+def _search_kind(sender):
+    return 'news' if sender in (News, News.tags.through) else 'event'
+
+
+def index_for_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        enqueue(index_search_entry, _search_kind(sender), instance.pk)
+
+
+def unindex_for_search(sender, instance, **kwargs):
+    search.unindex_item(_search_kind(sender), instance.pk)
+
+
+def index_for_search_on_tags(sender, instance, action, pk_set, reverse, **kwargs):
+    kind = _search_kind(sender)
+    for item_id in m2m_changed_ids(instance, action, pk_set, reverse, f'{kind}_set', '_cleared_search_ids'):
+        enqueue(index_search_entry, kind, item_id)
+
+for model in (News, Event):
+    post_save.connect(index_for_search, sender=model, dispatch_uid=f'website_search_save_{model.__name__}')
+    post_delete.connect(unindex_for_search, sender=model, dispatch_uid=f'website_search_delete_{model.__name__}')
+    m2m_changed.connect(index_for_search_on_tags, sender=model.tags.through,
+                        dispatch_uid=f'website_search_tags_{model.__name__}')
+
+
+@receiver(post_save, sender=Tag)
+def reindex_renamed_tag(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    for kind, related_name in (('news', 'news_set'), ('event', 'event_set')):
+        for item_id in getattr(instance, related_name).values_list('pk', flat=True):
+            enqueue(index_search_entry, kind, item_id)
+
+
+def queue_image_variants(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Logins save last_login only; the manifest lookup is a cache read otherwise
+    if raw:
+        return
+    for field in images.IMAGE_FIELDS[sender]:
+        if update_fields is not None and field not in update_fields:
+            continue
+        source = getattr(instance, field).name
+        if source and images.get_manifest(source) is None:
+            enqueue(build_image_variants, source, list(images.IMAGE_DEPENDENCIES[sender]))
+
+
+for model in images.IMAGE_FIELDS:
+    post_save.connect(queue_image_variants, sender=model, dispatch_uid=f'website_image_variants_{model.__name__}')
@@ -0,0 +1,31 @@
+from celery import shared_task
+from django.conf import settings
+
+from website import images, prerender, search
+from website.cache import bump
+
+
+@shared_task
+def prerender_public_pages(names=None):
+    """Re-render the static copies of the public pages depending on names"""
+    if not settings.PRERENDER_PAGES:
+        return "Pre-rendering is disabled"
+    written = prerender.render_pages(names)
+    return f"{written} public pages pre-rendered"
+
+
+@shared_task
+def index_search_entry(kind, item_id):
+    """Refresh the public search entry of one News/Event item"""
+    entry = search.index_item(kind, item_id)
+    return f"{kind} {item_id} {'indexed' if entry else 'removed from search'}"
+
+
+@shared_task
+def build_image_variants(source, dependencies=()):
+    """Build the responsive WebP/AVIF variants of one stored image"""
+    row = images.build(source)
+    if dependencies:
+        # Pages rendered meanwhile show the original; re-render them with the srcset
+        bump(*dependencies)
+    return f"{source}: {sum(len(entries) for entries in row.variants.values())} variants"
@@ -0,0 +1,29 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from website import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(field, sizes='100vw', **attrs):
+    """Render an ImageField as a <picture> with AVIF/WebP srcsets from its manifest.
+
+    Usage: {% responsive_image news.featured_image sizes="(max-width: 768px) 100vw, 400px" alt=news.title loading="lazy" %}
+    Extra keyword arguments become <img> attributes. Without variants yet,
+    or without an image, this renders the original (or nothing).
+    """
+    if not field:
+        return ''
+    img = format_html('<img src="{}"{} />', field.url, flatatt(attrs))
+    manifest = images.get_manifest(field.name)
+    if manifest is None:
+        return img
+    sources = format_html_join('', '<source type="image/{}" srcset="{}" sizes="{}" />', (
+        (fmt, images.srcset(manifest, fmt), sizes)
+        for fmt in images.VARIANT_FORMATS
+        if manifest['variants'].get(fmt)
+    ))
+    return format_html('<picture>{}{}</picture>', sources, img)
@@ -1,3 +1,431 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image as PILImage
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.contrib.auth.models import AnonymousUser
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Department
+from adverts.models import Ad, AdSlot
+from dashboard.models import Event, News, Tag
+from gallery.models import Gallery, Image
+from utag_ug_archiver.utils.constants import executive_committee_members_position_order
+from utag_ug_archiver.utils.testing import LOCMEM_CACHE, create_editor
+from website import cache as website_cache, executives, images, prerender, search
+from website.pagination import encode_cursor
+from website.tasks import build_image_variants
+from website.views import AsyncIndexView, IndexView, _homepage_gallery_sample
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class VersionedPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_editor()
+
+    def test_page_is_served_from_cache_until_news_changes(self):
+        url = reverse('website:news')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        News.objects.create(title='Budget statement', content='<p>x</p>', author=self.user, is_published=True)
+
+        self.assertContains(self.client.get(url), 'Budget statement')
+
+    def test_only_executive_changes_bump_executives(self):
+        before = website_cache.get_versions(website_cache.EXECUTIVES)
+        self.user.phone_number = '0200000000'
+        self.user.save()
+        self.assertEqual(website_cache.get_versions(website_cache.EXECUTIVES), before)
+
+        self.user.executive_position = 'Secretary'
+        self.user.is_active_executive = True
+        self.user.save()
+        self.assertNotEqual(website_cache.get_versions(website_cache.EXECUTIVES), before)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExecutiveRosterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # The position tables hold the exact stored values (some with non-breaking spaces)
+        positions = executive_committee_members_position_order
+        self.president, self.treasurer, self.past_president, self.cbas = (positions[i] for i in (0, 3, 5, 6))
+        for n, position in enumerate([self.cbas, self.treasurer, self.president, self.past_president]):
+            get_user_model().objects.create_user(
+                email=f'exec{n}@example.com', password='testpass123',
+                title='Dr.', other_name='Ama', surname=f'Mensah{n}', gender='Female',
+                executive_position=position, is_active_executive=True,
+            )
+
+    def test_roster_is_ordered_by_position_and_cached(self):
+        with self.assertNumQueries(1):
+            roster = executives.committee_members()
+        self.assertEqual(
+            [e.executive_position for e in roster], [self.president, self.treasurer, self.past_president, self.cbas],
+        )
+        with self.assertNumQueries(0):
+            officers = executives.executive_officers()
+        self.assertEqual([e.executive_position for e in officers], [self.president, self.treasurer])
+
+    def test_executive_field_change_rebuilds_the_roster(self):
+        executives.committee_members()
+        treasurer = get_user_model().objects.get(executive_position=self.treasurer)
+        treasurer.is_active_executive = False
+        treasurer.save()
+        self.assertNotIn(self.treasurer, [e.executive_position for e in executives.committee_members()])
+
+    def test_rendering_the_cached_roster_runs_no_queries(self):
+        department = Department.objects.create(name='Geography')
+        get_user_model().objects.filter(executive_position=self.president).update(department=department)
+        roster = executives.committee_members()
+
+        with self.assertNumQueries(0):
+            html = ''.join(
+                render_to_string(template, {'executive_officers': roster, 'executives': roster})
+                for template in (
+                    'includes/modals/details/executive_details.html',
+                    'includes/modals/update/edit_e_member.html',
+                    'website_pages/executive_committee_members-v2.html',
+                )
+            )
+        self.assertIn('Geography', html)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class HomepageSectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='president@example.com', password='testpass123',
+            title='Prof.', other_name='Kwame', surname='Asante', gender='Male',
+            executive_position='President', is_active_executive=True,
+        )
+
+    def test_news_change_rebuilds_only_the_news_section(self):
+        url = reverse('website:index')
+        self.assertContains(self.client.get(url), 'Asante')
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        News.objects.create(title='Congress report', content='<p>x</p>', author=self.user, is_published=True)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertContains(response, 'Congress report')
+        self.assertContains(response, 'Asante')
+
+    def test_gallery_sample_draws_from_cached_id_pool(self):
+        gallery = Gallery.objects.create(title='Congress 2023')
+        Image.objects.bulk_create(
+            Image(gallery=gallery, image=f'gallery_images/{i}.jpg', status=Image.READY) for i in range(6)
+        )
+        # Not processed (yet), so never sampled
+        Image.objects.bulk_create(
+            Image(gallery=gallery, image=f'gallery_images/raw{i}.jpg', status=status)
+            for i, status in enumerate([Image.PENDING, Image.FAILED] * 10)
+        )
+        website_cache.bump(website_cache.GALLERY)
+
+        with self.assertNumQueries(2):
+            _homepage_gallery_sample()
+        with self.assertNumQueries(1):
+            sample = _homepage_gallery_sample()
+        self.assertEqual(len({image.pk for image in sample}), 4)
+        self.assertTrue(all(image.status == Image.READY for image in sample))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AsyncHomepageTests(TransactionTestCase):
+    # Sections are built on worker threads with their own connections,
+    # so the rows must be committed for them to see it
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='president@example.com', password='testpass123',
+            title='Prof.', other_name='Kwame', surname='Asante', gender='Male',
+            executive_position='President', is_active_executive=True,
+        )
+        # bulk_create: no post_save, so nothing is queued for the absent broker
+        News.objects.bulk_create([News(
+            title='Congress report', news_slug='congress-report', content='<p>x</p>', author=self.user, is_published=True,
+        )])
+
+    async def test_async_view_builds_and_caches_the_sections(self):
+        request = AsyncRequestFactory().get('/')
+        request.user = AnonymousUser()
+        response = await AsyncIndexView.as_view()(request)
+        self.assertContains(response, 'Congress report')
+        self.assertContains(response, 'Asante')
+
+        sections = await website_cache.aget_sections(IndexView.sections)
+        self.assertEqual([news.title for news in sections['published_news']], ['Congress report'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class GalleryListingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.gallery = Gallery.objects.create(title='Congress 2023')
+        Image.objects.bulk_create(
+            Image(gallery=self.gallery, image=f'gallery_images/{i}.jpg', order=i, status=Image.READY)
+            for i in range(30)
+        )
+        # Pending and failed uploads are neither counted, listed nor used as the cover
+        Image.objects.bulk_create([
+            Image(gallery=self.gallery, image='gallery_images/raw.jpg', order=0, status=Image.PENDING),
+            Image(gallery=self.gallery, image='gallery_images/broken.jpg', order=0, status=Image.FAILED),
+        ])
+        Gallery.objects.create(title='Empty album')
+        Image.objects.create(gallery=Gallery.objects.create(title='Still processing'), image='gallery_images/new.jpg')
+
+    def test_listing_annotates_count_and_cover(self):
+        # paginator count and the annotated page; ads load separately
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('website:gallery'))
+        galleries = list(response.context['galleries_page'].object_list)
+        self.assertEqual([g.title for g in galleries], ['Congress 2023'])
+        self.assertEqual(galleries[0].get_image_count(), 30)
+        self.assertTrue(galleries[0].get_cover_url().endswith('gallery_images/0.jpg'))
+
+    def test_album_images_are_paged(self):
+        url = reverse('website:gallery_images', kwargs={'gallery_id': self.gallery.pk})
+        first = self.client.get(url).json()
+        self.assertEqual(len(first['images']), 24)
+        self.assertEqual(first['next_page'], 2)
+
+        second = self.client.get(url, {'page': 2}).json()
+        self.assertEqual(len(second['images']), 6)
+        self.assertIsNone(second['next_page'])
+
+        beyond = self.client.get(url, {'page': '9' * 20})
+        self.assertEqual(beyond.status_code, 200)
+        self.assertEqual(beyond.json()['images'], [])
+
+        self.gallery.is_active = False
+        self.gallery.save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class KeysetListingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = create_editor()
+        News.objects.bulk_create(
+            News(title=f'Item {i}', news_slug=f'item-{i}', content='<p>Body</p>', author=user, is_published=True)
+            for i in range(15)
+        )
+
+    def titles(self, response):
+        return [news.title for news in response.context['news_page'].object_list]
+
+    def test_cursors_walk_forward_and_back(self):
+        url = reverse('website:news')
+        first = self.client.get(url)
+        page = first.context['news_page']
+        self.assertEqual(len(page.object_list), 12)
+        self.assertEqual(page.total, 15)
+        self.assertFalse(page.has_previous)
+
+        second = self.client.get(url, {'after': page.next_cursor})
+        self.assertEqual(self.titles(second), [f'Item {i}' for i in (2, 1, 0)])
+        self.assertFalse(second.context['news_page'].has_next)
+
+        back = self.client.get(url, {'before': second.context['news_page'].previous_cursor})
+        self.assertEqual(self.titles(back), self.titles(first))
+        self.assertFalse(back.context['news_page'].has_previous)
+
+    def test_malformed_cursor_shows_first_page(self):
+        response = self.client.get(reverse('website:news'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(response)[0], 'Item 14')
+
+    def test_cursor_with_unparseable_values_shows_first_page(self):
+        response = self.client.get(reverse('website:news'), {'after': encode_cursor(['yesterday', 3])})
+        self.assertEqual(self.titles(response)[0], 'Item 14')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ConditionalDetailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = create_editor()
+        self.news = News.objects.create(title='Budget statement', content='<p>x</p>', author=user, is_published=True)
+        self.url = reverse('website:news_detail', kwargs={'slug': self.news.news_slug})
+
+    def test_unchanged_page_revalidates_with_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('s-maxage=300', response['Cache-Control'])
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+
+        self.news.title = 'Budget statement (revised)'
+        self.news.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_event_page_changes_when_registration_closes(self):
+        deadline = timezone.now() + datetime.timedelta(days=1)
+        event = Event.objects.create(
+            title='Delegates Congress', short_description='Congress', description='<p>Congress</p>',
+            created_by=self.news.author, start_date=deadline.date() + datetime.timedelta(days=7),
+            is_published=True, registration_required=True, registration_url='https://example.com/register',
+            registration_deadline=deadline,
+        )
+        url = reverse('website:events_detail', kwargs={'slug': event.event_slug})
+        response = self.client.get(url)
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertIn('s-maxage=300', revalidated['Cache-Control'])
+
+        with mock.patch('django.utils.timezone.now', return_value=deadline + datetime.timedelta(minutes=1)):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PRERENDER_PAGES=True, PRERENDER_ROOT=tempfile.mkdtemp())
+class PrerenderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_only_affected_pages_are_rerendered(self):
+        self.assertEqual(sorted(prerender.pages_for([website_cache.NEWS])), ['website:index', 'website:news'])
+        self.assertEqual(prerender.pages_for([website_cache.ADS]), [])
+
+    def test_anonymous_visitors_get_the_static_copy(self):
+        call_command('prerender_pages', 'website:about_us', stdout=io.StringIO())
+        with open(prerender.output_path(reverse('website:about_us')), 'ab') as fh:
+            fh.write(b'<!-- static copy -->')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('website:about_us'))
+        self.assertIn(b'<!-- static copy -->', b''.join(response.streaming_content))
+
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = 'abc'
+        dynamic = self.client.get(reverse('website:about_us'))
+        self.assertNotContains(dynamic, '<!-- static copy -->')
+        # Same clickjacking protection as the page served by Django
+        self.assertEqual(response['X-Frame-Options'], dynamic['X-Frame-Options'])
+
+    def test_ads_are_loaded_per_view_not_frozen_into_the_copy(self):
+        ad = Ad.objects.create(slot=AdSlot.objects.create(key='header', name='Header'), title='Book fair')
+        call_command('prerender_pages', 'website:about_us', stdout=io.StringIO())
+        with open(prerender.output_path(reverse('website:about_us')), 'rb') as fh:
+            html = fh.read().decode()
+        self.assertIn(reverse('adverts:slot', args=['header']), html)
+        self.assertNotIn('Book fair', html)
+
+        for _ in range(2):
+            self.assertContains(self.client.get(reverse('adverts:slot', args=['header'])), 'Book fair')
+        ad.refresh_from_db()
+        self.assertEqual(ad.impressions, 2)
+        self.assertEqual(self.client.get(reverse('adverts:slot', args=['footer'])).status_code, 204)
+
+
+class SiteSearchTests(TestCase):
+    def setUp(self):
+        self.user = create_editor()
+
+    def news(self, title, content, is_published=True):
+        item = News.objects.create(title=title, content=content, author=self.user, is_published=is_published)
+        search.index_item('news', item.pk)
+        return item
+
+    def results(self, query):
+        response = self.client.get(reverse('website:search_api'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_title_matches_rank_first_and_are_highlighted(self):
+        self.news('Welfare fund report', '<p>Contributions rose this year.</p>')
+        self.news('Budget statement', '<p>The <b>welfare</b> of members was discussed.</p>')
+        self.news('Draft welfare notice', '<p>Not yet out.</p>', is_published=False)
+
+        results = self.results('welfare')
+        self.assertEqual([r['title'] for r in results], ['Welfare fund report', 'Budget statement'])
+        self.assertIn('<mark>welfare</mark>', results[1]['highlight'])
+        self.assertNotIn('<b>', results[1]['highlight'])
+
+    def test_tags_and_unpublishing_update_the_index(self):
+        item = self.news('Budget statement', '<p>Figures.</p>')
+        item.tags.add(Tag.objects.create(name='Finance'))
+        search.index_item('news', item.pk)
+        self.assertEqual(self.results('finance')[0]['tags'], ['Finance'])
+
+        News.objects.filter(pk=item.pk).update(is_published=False)
+        search.index_item('news', item.pk)
+        self.assertEqual(self.results('finance'), [])
+
+    def test_search_page_renders_results(self):
+        self.news('Welfare fund report', '<p>Contributions rose.</p>')
+        response = self.client.get(reverse('website:search'), {'q': 'welfare'})
+        self.assertContains(response, 'Welfare fund report')
+        self.assertContains(self.client.get(reverse('website:search'), {'q': '"unbalanced'}), 'No news or events match')
+
+    def test_huge_page_numbers_are_clamped(self):
+        self.news('Welfare fund report', '<p>Contributions rose.</p>')
+        response = self.client.get(reverse('website:search_api'), {'q': 'welfare', 'page': '9' * 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['page'], 1000)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, MEDIA_ROOT=tempfile.mkdtemp())
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        out = io.BytesIO()
+        PILImage.new('RGB', (1000, 500), 'navy').save(out, format='JPEG')
+        self.source = default_storage.save('news_images/hall.jpg', ContentFile(out.getvalue()))
+        self.template = Template('{% load responsive_images %}{% responsive_image field alt="Hall" loading="lazy" %}')
+
+    def render(self):
+        return self.template.render(Context({'field': News(featured_image=self.source).featured_image}))
+
+    def test_original_until_variants_exist(self):
+        html = self.render()
+        self.assertNotIn('<picture>', html)
+        self.assertIn(f'src="/media/{self.source}"', html)
+
+        row = images.build(self.source)
+        self.assertEqual([width for width, _ in row.variants['webp']], [320, 640, 960, 1000])
+
+        with self.assertNumQueries(0):
+            html = self.render()
+        first = images.variant_name(self.source, 320, 'webp')
+        self.assertIn(f'<source type="image/webp" srcset="/media/{first} 320w, ', html)
+        self.assertIn('alt="Hall" loading="lazy"', html)
+
+    def test_drop_deletes_the_files(self):
+        row = images.build(self.source)
+        name = row.variants['webp'][0][1]
+        images.drop(self.source)
+        self.assertFalse(default_storage.exists(name))
+        self.assertIsNone(images.get_manifest(self.source))
+
+    def test_building_variants_invalidates_the_owners_pages(self):
+        before = website_cache.get_versions(website_cache.NEWS, website_cache.EVENTS)
+        build_image_variants(self.source, [website_cache.NEWS])
+        after = website_cache.get_versions(website_cache.NEWS, website_cache.EVENTS)
+        self.assertNotEqual(after[0], before[0])
+        self.assertEqual(after[1], before[1])
@@ -1,18 +1,30 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from django.shortcuts import redirect
 app_name = 'website'
+
+# Under ASGI the homepage builds its uncached sections concurrently
+IndexView = views.AsyncIndexView if settings.ASYNC_PUBLIC_VIEWS else views.IndexView
+
 urlpatterns = [
-    path('', views.IndexView.as_view(), name='index'),
+    path('', IndexView.as_view(), name='index'),
     path('about/', views.AboutView.as_view(), name='about_us'),
     path('contact/', views.ContactView.as_view(), name='contact_us'),
     path('events/', views.EventsView.as_view(), name='events'),
+    path('events/calendar/', views.EventsCalendarView.as_view(), name='events_calendar'),
+    path('events/calendar.ics', views.EventsFeedView.as_view(), name='events_feed'),
+    path('events/tags/<slug:tag_slug>/calendar.ics', views.EventsFeedView.as_view(), name='events_tag_feed'),
     path('events/<str:slug>/UG-UTAG', views.EventsDetailView.as_view(), name='events_detail'),
+    path('events/<str:slug>/register/', views.EventRegistrationView.as_view(), name='event_register'),
     path('news/', views.NewsView.as_view(), name='news'),
     path('news/<str:slug>/UG-UTAG', views.NewsDetailView.as_view(), name='news_detail'),
     path('executive_officers/', views.ExecutiveOfficersView.as_view(), name='executive_officers'),
     path('executive_committee_members/', views.ExecutiveCommitteeMembersView.as_view(), name='executive_committee_members'),
     path('gallery/', views.GalleryView.as_view(), name='gallery'),
+    path('gallery/<int:gallery_id>/images/', views.GalleryImagesView.as_view(), name='gallery_images'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('search/results.json', views.SearchApiView.as_view(), name='search_api'),
     # Legacy click endpoint: redirect to adverts app click view for backward compatibility
     path('add_click/<int:pk>/', lambda request, pk: redirect('adverts:click', pk=pk), name='add_click'),
 ]
\ No newline at end of file
@@ -1,91 +1,115 @@
 import random
-from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from datetime import datetime, time
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.shortcuts import redirect, render, get_object_or_404
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
 from django.views import View
-from django.views.decorators.cache import cache_page
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.utils.decorators import method_decorator
-from dashboard.models import CarouselSlide, Event, News
-from accounts.models import User
+from dashboard.models import CarouselSlide, Event, News, Tag
 from gallery.models import Gallery, Image
-from utag_ug_archiver.utils.functions import executive_members_custom_order, executive_committee_members_custom_order
-from utag_ug_archiver.utils.constants import executive_members_position_order, executive_committee_members_position_order
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from dashboard.registrations import RegistrationClosed, register
+from dashboard.related import related_to
+from website import calendar, conditional, search
+from website.executives import ROSTER_SECTION, committee_members, executive_officers, officers_of
+from website.cache import (
+    CAROUSEL, EVENTS, EXECUTIVES, GALLERY, NEWS, Section, aget_sections, cache_public_page, get_sections,
+)
+from website.models import SearchEntry
+from website.pagination import keyset_page
+
+def _homepage_events():
+    return list(
+        Event.objects.filter(is_published=True)
+        .only('id', 'title', 'event_slug', 'excerpt', 'start_date', 'end_date',
+              'venue', 'featured_image', 'created_at')
+        .order_by('-start_date')[:5]
+    )
+
+
+def _homepage_news():
+    return list(
+        News.objects.filter(is_published=True)
+        .only('id', 'title', 'news_slug', 'excerpt', 'featured_image', 'created_at')
+        .order_by('-created_at')[:5]
+    )
+
+
+def _homepage_carousel():
+    return list(
+        CarouselSlide.objects.filter(is_published=True)
+        .only('id', 'title', 'description', 'image', 'order')
+        .order_by('order')
+    )
+
+
+def _gallery_image_ids():
+    # Rebuilt only when the GALLERY version changes
+    return list(
+        Image.objects.filter(gallery__is_active=True, status=Image.READY).order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def _homepage_gallery_sample(count=4):
+    pool = Section('gallery_image_ids', _gallery_image_ids, (GALLERY,))
+    ids = get_sections([pool])[pool.name]
+    if len(ids) < count:
+        return []
+    ids = random.sample(ids, count)
+    images = Image.objects.filter(gallery__is_active=True, status=Image.READY).select_related('gallery').only(
+        'id', 'image', 'caption', 'gallery__id', 'gallery__title'
+    ).in_bulk(ids)
+    return [images[pk] for pk in ids if pk in images]
+
 
-@method_decorator(cache_page(60 * 15), name='dispatch')  # Cache for 15 minutes
 class IndexView(View):
     """
-    Optimized homepage view with performance enhancements:
-    - Uses select_related/only() to minimize database queries
-    - Limits queryset results early to reduce memory usage
-    - Only fetches required fields to reduce data transfer
-    - Template conditionally renders sections only when data exists
-    - Cached for 15 minutes to reduce database load
+    Homepage composed of independently cached sections:
+    - Each section is cached under its own dependency versions (see
+      website.cache.get_sections), so publishing news rebuilds the news
+      section only; events, executives and the carousel stay cached
+    - The gallery sample expires after a few minutes so it keeps rotating;
+      it is drawn from a cached id pool, so a refresh is one pk lookup
+    - Ads are loaded by the browser from the render_ad_slot placeholders
     """
     template_name = 'website_pages/index-v2.html'
-    
+    sections = [
+        Section('published_events', _homepage_events, (EVENTS,)),
+        Section('published_news', _homepage_news, (NEWS,)),
+        ROSTER_SECTION,
+        Section('carousel_slides', _homepage_carousel, (CAROUSEL,)),
+        Section('gallery_images', _homepage_gallery_sample, (GALLERY,), timeout=5 * 60),
+    ]
+
     def get(self, request):
-        # Optimize queries with select_related and prefetch_related
-        # Only fetch what's needed, limit results early
-        published_events = Event.objects.filter(
-            is_published=True
-        ).select_related(
-            'created_by'
-        ).only(
-            'id', 'title', 'event_slug', 'description', 'start_date', 'end_date', 
-            'venue', 'featured_image', 'created_at'
-        ).order_by('-start_date')[:5]
-        
-        published_news = News.objects.filter(
-            is_published=True
-        ).select_related(
-            'created_by'
-        ).only(
-            'id', 'title', 'news_slug', 'content', 'featured_image', 'created_at'
-        ).order_by('-created_at')[:5]
+        context = get_sections(self.sections)
+        # The homepage shows the officers out of the shared committee roster
+        context['executives'] = officers_of(context.pop(ROSTER_SECTION.name))
+        return render(request, self.template_name, context)
+
+
+class AsyncIndexView(IndexView):
+    """
+    IndexView for ASGI (ASYNC_PUBLIC_VIEWS): the sections missing from the
+    cache are built at the same time rather than one after another
+    """
+    async def get(self, request):
+        context = await aget_sections(self.sections)
+        context['executives'] = officers_of(context.pop(ROSTER_SECTION.name))
+        # Rendering touches the session, the ads and request.user, all sync
+        return await sync_to_async(render)(request, self.template_name, context)
 
-        # Get executives with optimized query
-        executives = User.objects.filter(
-            executive_position__in=executive_members_position_order, 
-            is_active_executive=True
-        ).only(
-            'id', 'other_name', 'surname', 'title', 'executive_position', 
-            'executive_image', 'bio', 'email', 'fb_profile_url', 
-            'twitter_profile_url', 'linkedin_profile_url'
-        )
-        
-        # Sort the executives based on the custom order
-        executives = sorted(executives, key=executive_members_custom_order)
-        
-        # Get 4 gallery images for the homepage - optimized query
-        gallery_images = []
-        all_images = Image.objects.filter(
-            gallery__is_active=True
-        ).select_related('gallery').only(
-            'id', 'image', 'caption', 'gallery__id', 'gallery__title'
-        )
-        
-        image_count = all_images.count()
-        if image_count >= 4:
-            # Use random.sample for better performance than converting to list first
-            gallery_images = random.sample(list(all_images), 4)
-        
-        carousel_slides = CarouselSlide.objects.filter(
-            is_published=True
-        ).only(
-            'id', 'title', 'image', 'order', 'link_url'
-        ).order_by('order')
 
-        context = {
-            'published_events': published_events,
-            'published_news': published_news,
-            'executives': executives,
-            'carousel_slides': carousel_slides,
-            'gallery_images': gallery_images,
-        }
-        return render(request, self.template_name, context)
-    
-    
-    
 class AboutView(View):
     template_name = 'website_pages/about-v2.html'
     
@@ -99,54 +123,83 @@ class ContactView(View):
         return render(request, self.template_name)
     
 
+def _cached_total(name, queryset, dependency, timeout=None):
+    section = Section(name, queryset.count, (dependency,), timeout)
+    return get_sections([section])[name]
+
+
+# Upcoming/past filters move with the clock, so this one expires sooner
+@method_decorator(cache_public_page(EVENTS, timeout=15 * 60), name='dispatch')
 class EventsView(View):
     template_name = 'website_pages/events-v2.html'
+    paginate_by = 12
+    # ?when= filters, evaluated in SQL against Event.starts_at/ends_at;
+    # each ordering ends with the pk so it can serve as a keyset cursor
+    periods = {
+        'upcoming': ('Upcoming', ('starts_at', 'pk')),
+        'ongoing': ('Happening now', ('ends_at', 'pk')),
+        'past': ('Past', ('-starts_at', '-pk')),
+    }
+    ordering = ('-created_at', '-pk')
 
     def get(self, request):
-        event_list = Event.objects.filter(is_published=True).order_by('-created_at')
-        page = request.GET.get('page', 1)
-        paginator = Paginator(event_list, 12)
-        try:
-            events_page = paginator.page(page)
-        except PageNotAnInteger:
-            events_page = paginator.page(1)
-        except EmptyPage:
-            events_page = paginator.page(paginator.num_pages)
+        event_list = Event.objects.filter(is_published=True).defer('description')
+        when = request.GET.get('when')
+        ordering = self.ordering
+        if when in self.periods:
+            event_list = getattr(event_list, when)()
+            ordering = self.periods[when][1]
+        else:
+            when = ''
+
+        total = _cached_total(f'events_total:{when or "all"}', event_list, EVENTS, timeout=15 * 60)
+        events_page = keyset_page(
+            event_list, ordering, self.paginate_by,
+            after=request.GET.get('after'), before=request.GET.get('before'), total=total,
+        )
 
         context = {
             'events_page': events_page,
-            'paginator': paginator,
+            'when': when,
+            'periods': [(key, label) for key, (label, _) in self.periods.items()],
         }
         return render(request, self.template_name, context)
 
     
+@method_decorator(cache_public_page(NEWS), name='dispatch')
 class NewsView(View):
     template_name = 'website_pages/news-v2.html'
+    paginate_by = 12
+    ordering = ('-created_at', '-pk')
 
     def get(self, request):
-        news_list = News.objects.filter(is_published=True).order_by('-created_at')
-        page = request.GET.get('page', 1)
-        paginator = Paginator(news_list, 12)
-        try:
-            news_page = paginator.page(page)
-        except PageNotAnInteger:
-            news_page = paginator.page(1)
-        except EmptyPage:
-            news_page = paginator.page(paginator.num_pages)
+        news_list = News.objects.filter(is_published=True).defer('content')
+        total = _cached_total('news_total', news_list, NEWS)
+        news_page = keyset_page(
+            news_list, self.ordering, self.paginate_by,
+            after=request.GET.get('after'), before=request.GET.get('before'), total=total,
+        )
 
         context = {
             'news_page': news_page,
-            'paginator': paginator,
         }
         return render(request, self.template_name, context)
 
+# Browsers revalidate every time (a 304 when unchanged); a local proxy may
+# reuse the page briefly. The order matters: the headers wrap the 304 too.
+@method_decorator(cache_control(public=True, max_age=0, s_maxage=300), name='dispatch')
+@method_decorator(condition(etag_func=conditional.news_etag, last_modified_func=conditional.news_last_modified), name='dispatch')
+@method_decorator(cache_public_page(NEWS), name='dispatch')
 class NewsDetailView(View):
     template_name = 'website_pages/news_detail-v2.html'
     
     def get(self, request, *args, **kwargs):
         news_slug = kwargs.get('slug')
         news = get_object_or_404(News, news_slug=news_slug)
-        latest_news = News.objects.filter(is_published=True).exclude(id=news.id).order_by('-created_at')[:3]
+        latest_news = related_to(news)
+        if not latest_news:
+            # No tagged matches yet: fall back to the latest posts
+            latest_news = News.objects.filter(is_published=True).exclude(id=news.id).defer('content').order_by('-created_at')[:3]
         context = {
             'news': news,
             'latest_news': latest_news
@@ -154,6 +207,8 @@ class NewsDetailView(View):
         return render(request, self.template_name, context)
 
 
+@method_decorator(conditional.event_cache_control, name='dispatch')
+@method_decorator(condition(etag_func=conditional.event_etag, last_modified_func=conditional.event_last_modified), name='dispatch')
 class EventsDetailView(View):
     template_name = 'website_pages/events_detail-v2.html'
     
@@ -162,63 +217,267 @@ class EventsDetailView(View):
         event = get_object_or_404(Event, event_slug=event_slug)
         context = {
             'event': event,
+            'related_events': related_to(event),
         }
         return render(request, self.template_name, context)
 
+
+class EventRegistrationView(View):
+    """Native registration form on the event detail page."""
+
+    def post(self, request, slug):
+        event = get_object_or_404(Event, event_slug=slug, is_published=True)
+        name = request.POST.get('name', '').strip()
+        email = request.POST.get('email', '').strip()
+        try:
+            validate_email(email)
+        except ValidationError:
+            email = ''
+        if not name or not email:
+            messages.error(request, 'Please provide your name and a valid email address.')
+            return redirect('website:events_detail', slug=slug)
+
+        try:
+            registration, created = register(
+                event,
+                name=name,
+                email=email,
+                department=request.POST.get('department', ''),
+                special_requests=request.POST.get('special_requests', ''),
+                user=request.user,
+            )
+        except RegistrationClosed:
+            messages.error(request, 'Registration is closed for this event.')
+            return redirect('website:events_detail', slug=slug)
+
+        if not created:
+            messages.info(request, f'{registration.email} is already registered ({registration.get_status_display().lower()}).')
+        elif registration.status == 'confirmed':
+            messages.success(request, 'You are registered. See you there!')
+        else:
+            messages.warning(request, 'The event is full. You have been added to the waitlist.')
+        return redirect('website:events_detail', slug=slug)
+
+
+def _parse_range_bound(value):
+    """Accept an ISO date or datetime; naive values use the site time zone."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value[:10])
+        if day is None:
+            return None
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class EventsCalendarView(View):
+    """Published events overlapping ?start=&end= (ISO dates), optionally for ?tag=."""
+
+    def get(self, request):
+        start = _parse_range_bound(request.GET.get('start'))
+        end = _parse_range_bound(request.GET.get('end'))
+        if start is None or end is None or end <= start:
+            return JsonResponse({'error': 'start and end must be ISO dates with start before end'}, status=400)
+        if end - start > calendar.MAX_RANGE:
+            return JsonResponse({'error': 'Date range is limited to one year'}, status=400)
+
+        events = calendar.events_in_range(start, end, request.GET.get('tag'))
+        data = [
+            calendar.event_as_json(event, reverse('website:events_detail', kwargs={'slug': event.event_slug}))
+            for event in events
+        ]
+        response = JsonResponse({'events': data})
+        patch_cache_control(response, public=True, max_age=300)
+        return response
+
+
+class EventsFeedView(View):
+    """iCalendar feed of published events, site-wide or for one tag."""
+
+    def get(self, request, tag_slug=None):
+        title = 'UTAG-UG Events'
+        if tag_slug:
+            # An unknown tag is a 404, never a 304
+            tag = get_object_or_404(Tag, slug=tag_slug)
+            title = f'{title}: {tag.name}'
+        # Validate before rendering so a revalidating client costs one aggregate
+        etag, last_modified = calendar.feed_validators(tag_slug)
+        last_modified_ts = int(last_modified.timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+        if response is None:
+            body = calendar.cached_feed(request, etag, tag_slug, title)
+            response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+            response['Content-Disposition'] = f'inline; filename="{tag_slug or "events"}.ics"'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified_ts)
+        # Let clients and proxies reuse it briefly, then revalidate
+        patch_cache_control(response, public=True, max_age=300)
+        return response
+
     
+@method_decorator(cache_public_page(EXECUTIVES), name='dispatch')
 class ExecutiveOfficersView(View):
     template_name = 'website_pages/executive_officers-v2.html'
     
     def get(self, request):
-        # Get all executives
-        executives = User.objects.filter(executive_position__in=executive_members_position_order, is_active_executive=True)
-
-        # Sort the executives based on the custom order
-        executives = sorted(executives, key=executive_members_custom_order)
         context = {
-            'executives': executives,
+            'executives': executive_officers(),
         }
         return render(request, self.template_name, context)
         
+@method_decorator(cache_public_page(EXECUTIVES), name='dispatch')
 class ExecutiveCommitteeMembersView(View):
     template_name = 'website_pages/executive_committee_members-v2.html'
     
     def get(self, request):
-        # Get all executives and include the committee members
-        executives = User.objects.filter(executive_position__in=executive_committee_members_position_order, is_active_executive=True)
-        # Sort the executives based on the custom order
-        executives = sorted(executives, key=executive_committee_members_custom_order)
         context = {
-            'executives': executives,
+            'executives': committee_members(),
         }
         return render(request, self.template_name, context)
     
-@method_decorator(cache_page(60 * 10), name='dispatch')  # Cache for 10 minutes
+@method_decorator(cache_public_page(GALLERY), name='dispatch')
 class GalleryView(View):
+    """
+    Paginated album listing. Image counts and covers come from one annotated
+    query (Gallery.objects.with_cover()); an album's images are fetched page
+    by page from GalleryImagesView when it is opened.
+    """
     template_name = 'website_pages/gallery-v2.html'
+    paginate_by = 12
 
     def get(self, request):
-        """
-        Optimized gallery view with performance enhancements.
-        Fetch only active galleries with optimized queries.
-        """
-        # Optimize queries - only fetch active galleries with images
         galleries = Gallery.objects.filter(
             is_active=True
-        ).prefetch_related(
-            'images'
+        ).with_cover().filter(
+            image_count__gt=0
         ).only(
             'id', 'title', 'description', 'created_at'
-        ).order_by('-created_at')
-        
-        # Only include galleries that have at least one image
-        galleries = [g for g in galleries if g.images.exists()]
-            
+        ).order_by('-created_at', '-pk')
+
+        page = request.GET.get('page', 1)
+        paginator = Paginator(galleries, self.paginate_by)
+        try:
+            galleries_page = paginator.page(page)
+        except PageNotAnInteger:
+            galleries_page = paginator.page(1)
+        except EmptyPage:
+            galleries_page = paginator.page(paginator.num_pages)
+
         context = {
-            'galleries': galleries,
+            'galleries_page': galleries_page,
         }
         return render(request, self.template_name, context)
-        
-    
+
+
+@method_decorator(cache_public_page(GALLERY), name='dispatch')
+class GalleryImagesView(View):
+    """One page of an active album's images as JSON, in display order."""
+    paginate_by = 24
+
+    def get(self, request, gallery_id):
+        page = _page_number(request)
+        offset = (page - 1) * self.paginate_by
+        # One extra row tells whether there is a next page without a COUNT
+        images = list(
+            Image.objects.filter(gallery_id=gallery_id, gallery__is_active=True, status=Image.READY)
+            .only('id', 'image', 'thumbnail', 'caption')
+            .order_by('order', '-uploaded_at', 'pk')[offset:offset + self.paginate_by + 1]
+        )
+        if not images and page == 1:
+            return JsonResponse({'error': 'Gallery not found'}, status=404)
+
+        has_next = len(images) > self.paginate_by
+        data = [
+            {
+                'id': image.pk,
+                'url': image.get_absolute_url(),
+                'thumbnail_url': image.get_thumbnail_url(),
+                'caption': image.caption or '',
+            }
+            for image in images[:self.paginate_by]
+        ]
+        response = JsonResponse({
+            'images': data,
+            'page': page,
+            'next_page': page + 1 if has_next and page < MAX_PAGE else None,
+        })
+        patch_cache_control(response, public=True, max_age=300)
+        return response
+
+
+# Deeper offset pages are clamped; far past any real result and the
+# database's integer range
+MAX_PAGE = 1000
+
+
+def _page_number(request):
+    """The ``page`` query parameter as an int between 1 and ``MAX_PAGE``."""
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        return 1
+    return min(max(page, 1), MAX_PAGE)
+
+
+def _search_results(request, per_page):
+    """Parse ``q``/``kind``/``page`` and run one page of the site search."""
+    query = request.GET.get('q', '').strip()[:200]
+    kind = request.GET.get('kind')
+    if kind not in search.MODELS:
+        kind = None
+    page = _page_number(request)
+    # One extra result tells whether there is a next page without a COUNT
+    results = search.search(query, kind=kind, offset=(page - 1) * per_page, limit=per_page + 1)
+    return {
+        'query': query,
+        'kind': kind,
+        'page': page,
+        'results': results[:per_page],
+        'next_page': page + 1 if len(results) > per_page and page < MAX_PAGE else None,
+        'previous_page': page - 1 if page > 1 else None,
+    }
+
+
+class SearchView(View):
+    """Ranked site search over published news and events."""
+    paginate_by = 10
+
+    def get(self, request):
+        context = _search_results(request, self.paginate_by)
+        context['kinds'] = SearchEntry.KIND_CHOICES
+        return render(request, 'website_pages/search-v2.html', context)
+
+
+class SearchApiView(View):
+    """The site search as JSON, with highlighted snippets."""
+    paginate_by = 10
+
+    def get(self, request):
+        context = _search_results(request, self.paginate_by)
+        data = [
+            {
+                'kind': entry.kind,
+                'title': entry.title,
+                'url': entry.url,
+                'highlight': str(entry.search_highlight),
+                'tags': [tag for tag in entry.tags.split(', ') if tag],
+                'published_at': entry.published_at.isoformat(),
+            }
+            for entry in context['results']
+        ]
+        response = JsonResponse({
+            'query': context['query'],
+            'results': data,
+            'page': context['page'],
+            'next_page': context['next_page'],
+        })
+        patch_cache_control(response, public=True, max_age=60)
+        return response
+
+
 class AddClick(View):
     pass